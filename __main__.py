@@ -0,0 +1,11 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: Entry point of python -m blue_crow_sports, see analysis.main
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+from blue_crow_sports.analysis import main
+
+main()
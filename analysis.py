@@ -21,278 +21,247 @@ Author: @sijielim
 ## 6. Sideway movements are not well-captured
 
 
-import json
+import argparse
 import os
 
 import pandas as pd
-import plotly.express as px
 from dotenv import load_dotenv
 
-from blue_crow_sports.utils import (explode_data,
-                                    extract_home_away_player_trackobj,
-                                    get_team_name, mt_to_sec,
-                                    player_match_stat_template,
-                                    player_stat_template,
-                                    summarise_distance_time)
-
-load_dotenv("blue_crow_sports/.env")
-
-ROOT = os.getenv("ROOT")
-IN_DATA_DIR = os.path.join(ROOT, "opendata", "data")
-INPUT_JSON_PATH = os.path.join(IN_DATA_DIR, "matches.json")
-OUT_DATA_DIR = os.path.join(ROOT, "blue_crow_sports", "plotly")
-os.makedirs(OUT_DATA_DIR, exist_ok=True)
-
-# Threshold number of frames to consider as continous movement
-FRAME_RATE_SMOOTHING_THRESHOLD = 1
-TIME_PER_FRAME_RATE = 0.10
-
-file_df = pd.read_json(INPUT_JSON_PATH)
-
-all_player_stat_summary_df = pd.DataFrame()
-for match_metadata in file_df.values.tolist():
-    print(f"Processing {match_metadata}")
-    # match_metadata = file_df.values.tolist()[0]
-    match_status, match_dt, home_team, away_team, match_id = match_metadata
-    home_team = home_team["short_name"]
-    away_team = away_team["short_name"]
-
-    match_data_dir = os.path.join(IN_DATA_DIR, "matches", str(match_id))
-    match_data_json_path = os.path.join(match_data_dir, "match_data.json")
-    match_structured_data_json_path = os.path.join(match_data_dir, "structured_data.json")
-
-    with open(match_data_json_path, "r") as f:
-        match_info_dict = json.load(f)
-    match_struc_data_df = pd.read_json(match_structured_data_json_path)
-    match_struc_data_df[["possession_player_trackobj", "possession_homeaway"]] = pd.json_normalize(match_struc_data_df["possession"])
-    match_struc_data_df.drop(["possession"], axis=1, inplace=True)
-    match_struc_data_df["possession_homeaway"] = match_struc_data_df["possession_homeaway"].apply(lambda x: x.replace(" ", "_") if x else x)
-
-    match_struc_data_df[~match_struc_data_df["possession_player_trackobj"].isna()]["possession_player_trackobj"].value_counts()
-
-    ## There are certain frames where the group is None. Drop those rows where time == None
-    match_struc_data_df = match_struc_data_df[~match_struc_data_df["time"].isna()]
-    match_struc_data_df = match_struc_data_df.reset_index(drop=True)
-
-    match_struc_data_df["time_seconds"] = match_struc_data_df["time"].apply(mt_to_sec)
-    match_struc_data_df["data_length"] = match_struc_data_df["data"].apply(lambda x: len(x))
-    match_struc_data_df["player_trackobj_captured"] = [[]] * len(match_struc_data_df)
-
-    home_player_trackobj_list, away_player_trackobj_list, player_mapping_list = extract_home_away_player_trackobj(match_info=match_info_dict)
-
-    ## Explode the data column into individual column for each player using the trackable object id
-    for idx, track_list in enumerate(match_struc_data_df["data"]):
-        match_explode_data_df = explode_data(df=match_struc_data_df,
-                                            match_info=match_info_dict,
-                                            row_idx=idx, track_list=track_list)
-    match_explode_data_df["num_player_captured"] = match_explode_data_df["player_trackobj_captured"].apply(lambda x: len(x))
-    match_explode_data_df = match_explode_data_df.reindex(
-        sorted(match_explode_data_df.columns), axis=1)
-
-    ## There are some duplicated rows in the data. We will remove those rows
-    # match_explode_data_df[match_explode_data_df["time"].duplicated()]
-    # match_explode_data_df[match_explode_data_df["time"] == "45:00.00"]
-
-    ## Summarise the distance travelled by each player from frame to frame
-    match_player_stats_data_df = summarise_distance_time(
-        df=match_explode_data_df,
-        frame_rate_smoothing_threshold=FRAME_RATE_SMOOTHING_THRESHOLD,
-        time_per_frame_rate=TIME_PER_FRAME_RATE)
-    match_player_stats_data_df = match_player_stats_data_df.reindex(
-        sorted(match_player_stats_data_df.columns), axis=1)
-
-    ## Calculate:
-    ## 1. Distance: Total, Onball, Offball
-    ## 2. Distance when team in possession: Total, Onball, Offball
-    ## 3. Distance when team NOT in possession: Total, Offball
-
-    player_match_stat = dict(player_match_stat_template)
-    stat_summary_df = pd.DataFrame()
-
-    for player_idx, (home_player_trackobj, away_player_trackobj) in enumerate(
-        zip(home_player_trackobj_list, away_player_trackobj_list)):
-
-        player_match_stat["home_team"][home_player_trackobj] = player_stat_template
-        player_match_stat["away_team"][away_player_trackobj] = player_stat_template
-
-        for team_pos, player_trackobj in zip(["home_team", "away_team"], [home_player_trackobj, away_player_trackobj]):
-            if f"{player_trackobj}_dist" in match_player_stats_data_df.columns:
-                # print(f"Process player_trackobj: {player_trackobj}")
-
-                ## Filter for subset where player is in view
-                player_match_stat_df = match_player_stats_data_df[
-                    ~match_player_stats_data_df[f"{player_trackobj}_dist"].isna()]
-
-                ############################################################
-
-                ## 1a. Distance travelled: Total
-
-                dist = player_match_stat_df[f"{player_trackobj}_dist"].sum()
-                time = player_match_stat_df[f"{player_trackobj}_time"].sum()
-
-                player_match_stat[team_pos][player_trackobj]["dist"] = dist
-                player_match_stat[team_pos][player_trackobj]["time"] = time
-                player_match_stat[team_pos][player_trackobj]["speed"] = dist / time
-
-                ## 1b, c. Distance travelled: Onball, Offball
-                player_match_stat_df[f"{player_trackobj}_onball"] = player_match_stat_df["possession_player_trackobj"].apply(
-                    lambda x, player_trackobj=player_trackobj: 1 if x == player_trackobj else 0)
-
-                #### Onball movement
-                player_match_stat_df[f"{player_trackobj}_dist_onball"] = player_match_stat_df[f"{player_trackobj}_onball"] * player_match_stat_df[f"{player_trackobj}_dist"]
-                player_match_stat_df[f"{player_trackobj}_time_onball"] = player_match_stat_df[f"{player_trackobj}_onball"] * player_match_stat_df[f"{player_trackobj}_time"]
-
-                dist_onball = player_match_stat_df[f"{player_trackobj}_dist_onball"].sum()
-                time_onball = player_match_stat_df[f"{player_trackobj}_time_onball"].sum()
-
-                player_match_stat[team_pos][player_trackobj]["dist_onball"] = dist_onball
-                player_match_stat[team_pos][player_trackobj]["time_onball"] = time_onball
-                player_match_stat[team_pos][player_trackobj]["speed_onball"] = dist_onball / time_onball
-
-                #### Offball movement
-                player_match_stat_df[f"{player_trackobj}_dist_offball"] = player_match_stat_df[f"{player_trackobj}_dist"] - player_match_stat_df[f"{player_trackobj}_dist_onball"].fillna(0)
-                player_match_stat_df[f"{player_trackobj}_time_offball"] = player_match_stat_df[f"{player_trackobj}_time"] - player_match_stat_df[f"{player_trackobj}_time_onball"].fillna(0)
-
-                dist_offball = player_match_stat_df[f"{player_trackobj}_dist_offball"].sum()
-                time_offball = player_match_stat_df[f"{player_trackobj}_time_offball"].sum()
-
-                player_match_stat[team_pos][player_trackobj]["dist_offball"] = dist_offball
-                player_match_stat[team_pos][player_trackobj]["time_offball"] = time_offball
-                player_match_stat[team_pos][player_trackobj]["speed_offball"] = dist_offball / time_offball
-
-                #### Counter check
-                assert abs(dist - dist_onball - dist_offball) <= 1, f"Distance for {player_trackobj} doesn't tally: {dist_onball} vs {dist_offball} vs {dist}"
-                assert abs(time - time_onball - time_offball) <= 1, f"Time for {player_trackobj} doesn't tally: {time_onball} vs {time_offball} vs {time}"
-                # print(f"Player: {player_trackobj}. Dist: {dist}. Time {time}. Speed {dist/time}")
-
-                ############################################################
-
-                ## Distance travelled when the player's team is in possession
-                player_match_stat_df[f"{team_pos}_possession"] = player_match_stat_df["possession_homeaway"].apply(
-                    lambda x, team_pos=team_pos: 1 if x == team_pos else 0)
-                player_match_stat_df[f"{player_trackobj}_{team_pos}"] = player_match_stat_df[f"{player_trackobj}_homeaway"].apply(
-                    lambda x, team_pos=team_pos: 1 if x == team_pos else 0)
-
-                ## 2a. Distance travelled while team in posession: Total
-                player_match_stat_df[f"{player_trackobj}_dist_teampos"] = player_match_stat_df[f"{team_pos}_possession"] * \
-                    player_match_stat_df[f"{player_trackobj}_{team_pos}"] * player_match_stat_df[f"{player_trackobj}_dist"]
-
-                player_match_stat_df[f"{player_trackobj}_time_teampos"] = player_match_stat_df[f"{team_pos}_possession"] * \
-                    player_match_stat_df[f"{player_trackobj}_{team_pos}"] * player_match_stat_df[f"{player_trackobj}_time"]
-
-                dist_teampos = player_match_stat_df[f"{player_trackobj}_dist_teampos"].sum()
-                time_teampos = player_match_stat_df[f"{player_trackobj}_time_teampos"].sum()
-
-                player_match_stat[team_pos][player_trackobj]["dist_teampos"] = dist_teampos
-                player_match_stat[team_pos][player_trackobj]["time_teampos"] = time_teampos
-                player_match_stat[team_pos][player_trackobj]["speed_teampos"] = dist_teampos / time_teampos
-
-                ## 2b, c. Distance travelled while team in posession: Onball, Offball
-                for metric in ["dist", "time"]:
-                    player_match_stat_df[f"{player_trackobj}_{metric}_teampos_onball"] = player_match_stat_df[
-                        [f"{team_pos}_possession", f"{player_trackobj}_{team_pos}", f"{player_trackobj}_onball", f"{player_trackobj}_{metric}"]
-                    ].prod(axis=1)
-
-                    player_match_stat_df[f"{player_trackobj}_{metric}_teampos_offball"] = player_match_stat_df[f"{player_trackobj}_{metric}_teampos"] - \
-                        player_match_stat_df[f"{player_trackobj}_{metric}_teampos_onball"].fillna(0)
-
-                dist_teampos_onball = player_match_stat_df[f"{player_trackobj}_dist_teampos_onball"].sum()
-                time_teampos_onball = player_match_stat_df[f"{player_trackobj}_time_teampos_onball"].sum()
-
-                player_match_stat[team_pos][player_trackobj]["dist_teampos_onball"] = dist_teampos_onball
-                player_match_stat[team_pos][player_trackobj]["time_teampos_onball"] = time_teampos_onball
-                player_match_stat[team_pos][player_trackobj]["speed_teampos_onball"] = dist_teampos_onball / time_teampos_onball
-
-                dist_teampos_offball = player_match_stat_df[f"{player_trackobj}_dist_teampos_offball"].sum()
-                time_teampos_offball = player_match_stat_df[f"{player_trackobj}_time_teampos_offball"].sum()
-
-                player_match_stat[team_pos][player_trackobj]["dist_teampos_offball"] = dist_teampos_offball
-                player_match_stat[team_pos][player_trackobj]["time_teampos_offball"] = time_teampos_offball
-                player_match_stat[team_pos][player_trackobj]["speed_teampos_offball"] = dist_teampos_offball / time_teampos_offball
-
-                #### Counter check
-                dist_diff = abs(dist_teampos - dist_teampos_onball - dist_teampos_offball)
-                time_diff = abs(time_teampos - time_teampos_onball - time_teampos_offball)
-
-                assert dist_diff <= 1 , f"Distance in possession for {player_trackobj} doesn't tally: {dist_diff}. {dist_teampos_onball} vs {dist_teampos_offball} vs {dist_teampos}"
-                assert time_diff <= 1, f"Time in possession for {player_trackobj} doesn't tally: {time_diff}. {time_teampos_onball} vs {time_teampos_offball} vs {time_teampos}"
-
-                # ####################################################################################
-
-                ## 3. Calculate distance travelled when the player's team is NOT in possession
-                #### Note: Under this scenario, player can only be offball
-
-                dist_teamnopos = dist - dist_teampos
-                time_teamnopos = time - time_teampos
-                player_match_stat[team_pos][player_trackobj]["dist_teamnopos"] = dist_teamnopos
-                player_match_stat[team_pos][player_trackobj]["time_teamnopos"] = time_teamnopos
-                player_match_stat[team_pos][player_trackobj]["speed_teamnopos"] = dist_teamnopos / time_teamnopos
-
-                player_match_stat[team_pos][player_trackobj]["dist_teamnopos_offball"] = dist_teamnopos
-                player_match_stat[team_pos][player_trackobj]["time_teamnopos_offball"] = time_teamnopos
-                player_match_stat[team_pos][player_trackobj]["speed_teamnopos_offball"] = dist_teamnopos / time_teamnopos
-
-                assert  abs(dist - dist_teamnopos - dist_teampos) <= 1e-1, f"Distance when team not in posession is wrong. {player_trackobj}: {dist} {dist_teamnopos} + {dist_teampos}"
-                assert  abs(time - time_teamnopos - time_teampos) <= 1e-1, f"Time when team not in posession is wrong. {player_trackobj}: {time} {time_teamnopos} + {time_teampos}"
-                # ############################################################
-
-                player_summarised_stat_df = pd.DataFrame(player_match_stat[team_pos][player_trackobj], index=[player_trackobj])
-                player_summarised_stat_df["team"] = team_pos
-                stat_summary_df = pd.concat([stat_summary_df, player_summarised_stat_df], axis=0)
-    stat_summary_df.sort_values(["speed"], ascending=False, inplace=True)
-
-    player_map_df = pd.DataFrame(player_mapping_list, columns=["track_id", "name", "player_id"])
-    player_map_df.set_index("track_id", inplace=True)
-    player_stats_summary_df = stat_summary_df.merge(player_map_df, left_index=True, right_index=True)
-
-    player_stats_summary_df["team"] = player_stats_summary_df["team"].apply(get_team_name, match_info=match_info_dict)
-
-    all_player_stat_summary_df = pd.concat([all_player_stat_summary_df, player_stats_summary_df], axis=0).reset_index(drop=True)
-    print(f"*" * 50)
-
-##################### SUMMARISE #####################
-
-## Summarise the all_player_stat_summary_df as some players can be found in multiple matches
-charts_to_plot_list = []
-col_set = []
-for idx, col in enumerate(player_stat_template.keys()):
-    if idx % 3 == 0 and idx > 0:
-        charts_to_plot_list.append(col_set)
-        col_set = []
-    col_set.append(col)
-
-## NOTE: As some players played 2 matches, we will find the average distance they covered across the 2 matches
-## The code below is to account for such cases
-dedup_player_stat_summary_df = all_player_stat_summary_df.groupby(["player_id", "name", "team"]).sum().reset_index()
-match_per_player_df = all_player_stat_summary_df.groupby(["player_id", "name", "team"])["dist"].count().reset_index()
-match_per_player_df.rename(columns={"dist": "match_count"}, inplace=True)
-
-dedup_player_stat_summary_df = dedup_player_stat_summary_df.merge(match_per_player_df, how="inner", on=["player_id", "name", "team"])
-
-for col_set in charts_to_plot_list:
-    dist, time, speed = col_set
-    dedup_player_stat_summary_df[dist] = dedup_player_stat_summary_df[dist] / dedup_player_stat_summary_df["match_count"]
-    dedup_player_stat_summary_df[time] = dedup_player_stat_summary_df[time] / dedup_player_stat_summary_df["match_count"]
-    dedup_player_stat_summary_df[speed] = dedup_player_stat_summary_df[dist] / dedup_player_stat_summary_df[time]
-
-
-##################### VISUALISATION #####################
-for col_set in charts_to_plot_list:
-    x, z, y = col_set
-    fig = px.scatter(dedup_player_stat_summary_df,
-                     x=x, y=y, size=z, color="team",
-                     title=f"{y} (y-axis) vs {x} (x-axis)",
-                     text="name", symbol="match_count",
-                     hover_data={
-                        "name": True, "player_id": True, "team": True,
-                        x:":.2f", y:":.2f", z:":.2f",
-                        "match_count": True
-                     })
-    fig.update_traces(textposition='middle right', textfont={"size": 8})
-    fig.update_layout(hoverlabel={"bgcolor": "white",
-                                  "font_size": 12})
-    fig.write_html(os.path.join(OUT_DATA_DIR, f"{y}-vs-{x}.html"))
-    fig.show()
+from blue_crow_sports.pipeline import run_matches
+from blue_crow_sports.profiling import (clear_profile_dir, profile_stage,
+                                        start_profiling, stop_profiling,
+                                        write_profile_report)
+from blue_crow_sports.season_store import summarise_season, update_season_store
+from blue_crow_sports.utils import player_stat_template
+
+ENV_PATH = os.path.join("blue_crow_sports", ".env")
+OUTPUT_FORMAT_LIST = ["csv", "json", "parquet"]
+
+## Settings of run_pipeline. The directories that are None are put under ROOT by default_config
+pipeline_config_template = {
+    # Directory with opendata/ (the SkillCorner open data) and blue_crow_sports/. Defaults to the ROOT env var
+    "root": None,
+    # Threshold number of frames to consider as continous movement
+    "frame_rate_smoothing_threshold": 1,
+    "time_per_frame_rate": 0.10,
+    # Number of worker processes to spread the matches and charts across
+    "num_workers": os.cpu_count(),
+    # Number of frames to stream from structured_data.json (or the cache) at a time, which bounds the memory of a match. None loads the whole file
+    "chunk_size": 6000,
+    # Directory to cache the exploded tracking data of each match in. "" disables the cache
+    "cache_dir": None,
+    # Layout of the tracking data: "wide" (one column per player and metric) or "long" (one row per frame and player)
+    "layout": "wide",
+    # Whether to check that the onball / offball and team in possession / not in possession splits of every player add up to the totals
+    "check_tally": False,
+    # Whether to add the share of time each player spent in the defence / midfield / attack line
+    "tactical_lines": False,
+    # Whether to add the distance, time and speed of each player while an opponent is within 3 metres
+    "proximity": False,
+    # Whether to explode the tracking data into compact dtypes (float32 coordinates, Int32 track ids, categorical home/away)
+    "compact_dtypes": False,
+    # Directory of the per-match player stat store, so that only new or changed matches are processed. "" reprocesses every match
+    "store_dir": None,
+    # Directory to write the stage profiling report to. None disables the profiling
+    "profile_dir": None,
+    # Whether to keep a cProfile dump of the slowest stage in profile_dir
+    "profile_cprofile": False,
+    # Directory to write the charts to
+    "out_dir": None,
+    # Output of the charts: "directory" (one file per chart sharing one plotly-{version}.min.js), "dashboard" (a single page),
+    # "inline" or None to skip the charts (and the plotly import)
+    "report_mode": "directory",
+    # Whether to open every chart in the browser. Keep False for headless runs
+    "show_charts": False,
+}
+
+def default_config(root: str=None,
+                   env_path: str=ENV_PATH,
+                   **config_kwargs):
+    """
+    Settings of run_pipeline: pipeline_config_template updated with config_kwargs,
+    with the directories that are not set put under root
+
+    Input:
+        root: Directory with opendata/ and blue_crow_sports/. Defaults to the ROOT env var, loaded from env_path
+        env_path: .env file to load ROOT from
+        config_kwargs: Keys of pipeline_config_template to override
+
+    Returns:
+        Dictionary with the keys of pipeline_config_template
+    """
+    unknown_key_list = sorted(set(config_kwargs) - set(pipeline_config_template))
+    if unknown_key_list:
+        raise KeyError(f"Unknown settings: {unknown_key_list}")
+    config = {**pipeline_config_template, **config_kwargs}
+    if root is None:
+        load_dotenv(env_path)
+        root = os.getenv("ROOT")
+    if root is None:
+        raise ValueError(f"root is not set and ROOT is not in the environment or {env_path}")
+    config["root"] = root
+    for key, dir_name in [("cache_dir", "cache"), ("store_dir", "season_store"), ("out_dir", "plotly")]:
+        if config[key] is None:
+            config[key] = os.path.join(root, "blue_crow_sports", dir_name)
+    return config
+
+def select_matches(in_data_dir: str,
+                   match_ids: list=None):
+    """
+    Rows of matches.json of the matches in match_ids (all of them if None), in the order of matches.json
+
+    Returns:
+        List of the match metadata rows (status, date_time, home_team, away_team, id)
+    """
+    file_df = pd.read_json(os.path.join(in_data_dir, "matches.json"))
+    if match_ids is not None:
+        match_id_set = {int(match_id) for match_id in match_ids}
+        missing_match_id_list = sorted(match_id_set - set(file_df["id"].astype(int)))
+        if missing_match_id_list:
+            raise ValueError(f"Matches not in matches.json: {missing_match_id_list}")
+        file_df = file_df[file_df["id"].astype(int).isin(match_id_set)]
+    return file_df.values.tolist()
+
+def run_pipeline(match_ids: list=None,
+                 config: dict=None):
+    """
+    Process the matches into the per-match and season player stats and render the charts
+
+    Input:
+        match_ids: Ids of the matches in matches.json to process. None processes all of them
+        config: Output of default_config. None uses default_config()
+
+    Note: The season store always holds the matches of the last full run, so it is only used
+    when match_ids is None. A subset of matches is processed with run_matches (and the cache)
+
+    Returns:
+        (per-match player stats, season player stats from summarise_season)
+    """
+    if config is None:
+        config = default_config()
+    in_data_dir = os.path.join(config["root"], "opendata", "data")
+    profile_dir = config["profile_dir"]
+    if profile_dir:
+        start_profiling(profile_dir, cprofile=config["profile_cprofile"])
+        clear_profile_dir(profile_dir)
+
+    match_metadata_list = select_matches(in_data_dir, match_ids)
+    run_kwargs = {"num_workers": config["num_workers"], "chunk_size": config["chunk_size"],
+                  "cache_dir": config["cache_dir"] or None, "layout": config["layout"],
+                  "check_tally": config["check_tally"],
+                  "tactical_lines": config["tactical_lines"], "proximity": config["proximity"],
+                  "compact_dtypes": config["compact_dtypes"],
+                  "profile_dir": profile_dir, "profile_cprofile": config["profile_cprofile"]}
+    if config["store_dir"] and match_ids is None:
+        all_player_stat_summary_df = update_season_store(store_dir=config["store_dir"],
+                                                         match_metadata_list=match_metadata_list,
+                                                         in_data_dir=in_data_dir,
+                                                         frame_rate_smoothing_threshold=config["frame_rate_smoothing_threshold"],
+                                                         time_per_frame_rate=config["time_per_frame_rate"],
+                                                         **run_kwargs)
+    else:
+        all_player_stat_summary_df = run_matches(match_metadata_list=match_metadata_list,
+                                                 in_data_dir=in_data_dir,
+                                                 frame_rate_smoothing_threshold=config["frame_rate_smoothing_threshold"],
+                                                 time_per_frame_rate=config["time_per_frame_rate"],
+                                                 **run_kwargs)
+
+    ##################### SUMMARISE #####################
+
+    ## NOTE: As some players played 2 matches, we will find the average distance they covered across the 2 matches
+    with profile_stage("dedup", num_frames=len(all_player_stat_summary_df)) as stage_record:
+        dedup_player_stat_summary_df = summarise_season(all_player_stat_summary_df)
+        stage_record["df"] = dedup_player_stat_summary_df
+
+    ##################### VISUALISATION #####################
+    if config["report_mode"]:
+        ## Imported here so that a stats-only run does not pay for importing plotly
+        from blue_crow_sports.report import render_report
+
+        with profile_stage("plot_writing"):
+            render_report(dedup_player_stat_summary_df, config["out_dir"], list(player_stat_template),
+                          mode=config["report_mode"], num_workers=config["num_workers"], show=config["show_charts"])
+
+    if profile_dir:
+        write_profile_report(profile_dir)
+        stop_profiling()
+    return all_player_stat_summary_df, dedup_player_stat_summary_df
+
+def write_stats(stat_summary_df: pd.DataFrame,
+                path: str,
+                output_format: str="csv"):
+    """
+    Write a player stat summary as csv, json (one record per row) or parquet
+    """
+    if output_format == "csv":
+        stat_summary_df.to_csv(path, index=False)
+    elif output_format == "json":
+        stat_summary_df.to_json(path, orient="records", indent=2)
+    elif output_format == "parquet":
+        stat_summary_df.to_parquet(path, index=False)
+    else:
+        raise ValueError(f"output_format must be one of {OUTPUT_FORMAT_LIST}, got {output_format}")
+
+def optional_dir(value: str):
+    """
+    argparse type of the directories that can be turned off with "none"
+    """
+    return "" if value.lower() == "none" else value
+
+def main(argv: list=None):
+    parser = argparse.ArgumentParser(prog="python -m blue_crow_sports",
+                                     description="Player distance, speed and possession stats of the SkillCorner open data")
+    parser.add_argument("--root", default=None, help="Directory with opendata/ and blue_crow_sports/. Defaults to ROOT in the env or .env")
+    parser.add_argument("--env-path", default=ENV_PATH)
+    parser.add_argument("--match-ids", nargs="+", type=int, default=None, help="Matches to process. Defaults to every match in matches.json")
+    parser.add_argument("--smoothing-threshold", type=int, default=pipeline_config_template["frame_rate_smoothing_threshold"])
+    parser.add_argument("--time-per-frame", type=float, default=pipeline_config_template["time_per_frame_rate"])
+    parser.add_argument("--num-workers", type=int, default=pipeline_config_template["num_workers"])
+    parser.add_argument("--chunk-size", type=int, default=pipeline_config_template["chunk_size"], help="0 loads the whole file")
+    parser.add_argument("--cache-dir", type=optional_dir, default=None, help='"none" disables the cache')
+    parser.add_argument("--store-dir", type=optional_dir, default=None, help='"none" disables the season store')
+    parser.add_argument("--layout", choices=["wide", "long"], default=pipeline_config_template["layout"])
+    parser.add_argument("--check-tally", action="store_true", help="Check that the stat splits of every player add up to the totals")
+    parser.add_argument("--tactical-lines", action="store_true")
+    parser.add_argument("--proximity", action="store_true")
+    parser.add_argument("--compact-dtypes", action="store_true", help="Explode into float32 / Int32 / categorical columns")
+    parser.add_argument("--profile-dir", default=None)
+    parser.add_argument("--profile-cprofile", action="store_true")
+    parser.add_argument("--out-dir", default=None, help="Directory to write the charts to")
+    parser.add_argument("--report-mode", choices=["directory", "dashboard", "inline", "none"],
+                        default=pipeline_config_template["report_mode"])
+    parser.add_argument("--show", action="store_true", help="Open every chart in the browser")
+    parser.add_argument("--stats-dir", default=None, help="Directory to write player_stats and season_stats to")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMAT_LIST, default="csv")
+    args = parser.parse_args(argv)
+
+    config = default_config(root=args.root, env_path=args.env_path,
+                            frame_rate_smoothing_threshold=args.smoothing_threshold,
+                            time_per_frame_rate=args.time_per_frame,
+                            num_workers=args.num_workers,
+                            chunk_size=args.chunk_size or None,
+                            cache_dir=args.cache_dir,
+                            store_dir=args.store_dir,
+                            layout=args.layout,
+                            check_tally=args.check_tally,
+                            tactical_lines=args.tactical_lines,
+                            proximity=args.proximity,
+                            compact_dtypes=args.compact_dtypes,
+                            profile_dir=args.profile_dir,
+                            profile_cprofile=args.profile_cprofile,
+                            out_dir=args.out_dir,
+                            report_mode=None if args.report_mode == "none" else args.report_mode,
+                            show_charts=args.show)
+    all_player_stat_summary_df, dedup_player_stat_summary_df = run_pipeline(args.match_ids, config)
+
+    if args.stats_dir:
+        os.makedirs(args.stats_dir, exist_ok=True)
+        for name, stat_summary_df in [("player_stats", all_player_stat_summary_df),
+                                      ("season_stats", dedup_player_stat_summary_df)]:
+            write_stats(stat_summary_df, os.path.join(args.stats_dir, f"{name}.{args.output_format}"), args.output_format)
+
+if __name__ == "__main__":
+    main()
 
 
 ##################### CHARTS (WORKINGS) #####################
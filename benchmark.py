@@ -0,0 +1,296 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is the benchmark suite of the analysis pipeline for the SkillCorner dataset found in the repo.
+The stages are timed on synthetic matches (see synthetic.py) at the scale of a half, a match and a season,
+and the results are saved as JSON so that runs can be compared over time
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+
+Usage:
+    python -m blue_crow_sports.benchmark --scale half match --repeat 3 --results-dir ~/benchmark_results
+    python -m blue_crow_sports.benchmark --scale half --num-objects 15 --churn 0.01 --missing-ball 0.3 --time-none 0.05
+    python -m blue_crow_sports.benchmark --compare ~/benchmark_results/benchmark-A.json ~/benchmark_results/benchmark-B.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.clock import build_clock_index, parse_match_clock
+from blue_crow_sports.pipeline import (explode_structured_data,
+                                       prepare_structured_data, run_matches)
+from blue_crow_sports.synthetic import (synthetic_match_template,
+                                        write_synthetic_season)
+from blue_crow_sports.trajectory import build_trajectory_index
+from blue_crow_sports.utils import (explode_data, explode_data_batch,
+                                    mt_to_sec, summarise_distance_time,
+                                    summarise_distance_time_vectorised)
+
+## reference: Whether to also time the original row-by-row explode_data and summarise_distance_time,
+## which are too slow to run at the larger scales
+benchmark_scale_template = {
+    "half": {"num_matches": 1, "num_periods": 1, "reference": True},
+    "match": {"num_matches": 1, "num_periods": 2, "reference": False},
+    "season": {"num_matches": 9, "num_periods": 2, "reference": False},
+}
+
+## Default directory of the saved runs. Outside of the package so that a run does not leave files in the repo
+RESULTS_DIR = os.path.join(tempfile.gettempdir(), "blue_crow_sports_benchmark")
+
+def time_function(func,
+                  repeat: int=3,
+                  setup=None):
+    """
+    Time func over repeat runs. If set, setup() is called before every run outside of the timing
+    and its output is passed to func
+
+    Returns:
+        List of the wall times in seconds
+    """
+    wall_time_list = []
+    for _ in range(repeat):
+        func_input = setup() if setup else None
+        start_time = time.perf_counter()
+        if setup:
+            func(func_input)
+        else:
+            func()
+        wall_time_list.append(time.perf_counter() - start_time)
+    return wall_time_list
+
+def explode_data_reference(match_struc_data_df: pd.DataFrame,
+                           match_info: dict):
+    """
+    Explode every frame with the original row-by-row explode_data, the same as analysis.py used to
+    """
+    for row_idx, track_list in zip(match_struc_data_df.index, match_struc_data_df["data"]):
+        match_struc_data_df = explode_data(df=match_struc_data_df, match_info=match_info,
+                                           row_idx=row_idx, track_list=track_list)
+    return match_struc_data_df
+
+def benchmark_match(match_data_dir: str,
+                    time_per_frame_rate: float,
+                    frame_rate_smoothing_threshold: int=1,
+                    repeat: int=3,
+                    reference: bool=False):
+    """
+    Time the stages of the pipeline on a single match
+
+    Returns:
+        Dictionary of the benchmark name to (number of frames, list of wall times)
+    """
+    with open(os.path.join(match_data_dir, "match_data.json"), "r") as f:
+        match_info_dict = json.load(f)
+    match_struc_data_df = pd.read_json(os.path.join(match_data_dir, "structured_data.json"))
+    prepared_df = prepare_structured_data(match_struc_data_df.copy())
+    match_explode_data_df = explode_structured_data(match_struc_data_df.copy(), match_info_dict)
+    num_frames = len(prepared_df)
+
+    benchmark_dict = {}
+    benchmark_dict["mt_to_sec"] = (num_frames, time_function(
+        lambda: prepared_df["time"].apply(mt_to_sec), repeat=repeat))
+    benchmark_dict["parse_match_clock"] = (num_frames, time_function(
+        lambda: parse_match_clock(prepared_df["time"]), repeat=repeat))
+    benchmark_dict["build_clock_index"] = (num_frames, time_function(
+        lambda: build_clock_index(prepared_df, time_per_frame_rate), repeat=repeat))
+    benchmark_dict["explode_data_batch"] = (num_frames, time_function(
+        lambda df: explode_data_batch(df, match_info_dict), repeat=repeat, setup=prepared_df.copy))
+    benchmark_dict["explode_data_batch_compact"] = (num_frames, time_function(
+        lambda df: explode_data_batch(df, match_info_dict, compact_dtypes=True), repeat=repeat, setup=prepared_df.copy))
+    benchmark_dict["summarise_distance_time_vectorised"] = (num_frames, time_function(
+        lambda: summarise_distance_time_vectorised(match_explode_data_df, frame_rate_smoothing_threshold, time_per_frame_rate),
+        repeat=repeat))
+    benchmark_dict["build_trajectory_index"] = (num_frames, time_function(
+        lambda: build_trajectory_index(match_explode_data_df, match_info_dict), repeat=repeat))
+    if reference:
+        benchmark_dict["explode_data"] = (num_frames, time_function(
+            lambda df: explode_data_reference(df, match_info_dict), repeat=1, setup=prepared_df.copy))
+        benchmark_dict["summarise_distance_time"] = (num_frames, time_function(
+            lambda: summarise_distance_time(match_explode_data_df, frame_rate_smoothing_threshold, time_per_frame_rate),
+            repeat=1))
+    return benchmark_dict
+
+def run_benchmark(scale_list: list=["half", "match"],
+                  repeat: int=3,
+                  data_dir: str=None,
+                  frame_rate: int=10,
+                  period_minutes: float=45,
+                  seed: int=0,
+                  reference: bool=True,
+                  synthetic_match_kwargs: dict=None,
+                  **run_kwargs):
+    """
+    Run the benchmark suite
+
+    Input:
+        scale_list: Keys of benchmark_scale_template to run
+        repeat: Number of timed runs of each benchmark
+        data_dir: Directory to write the synthetic matches to, so that they can be reused by later runs.
+            None writes them to a temporary directory
+        frame_rate: Number of frames per second of the synthetic matches
+        period_minutes: Length of each period of the synthetic matches in minutes
+        seed: Seed of the synthetic matches
+        reference: Whether to time the original row-by-row functions at the scales that allow it
+        synthetic_match_kwargs: Overrides of synthetic_match_template (track_id_churn_rate, missing_ball_rate, ...).
+            num_periods comes from the scale, frame_rate and period_minutes from the arguments above
+        run_kwargs: Other arguments for pipeline.run_matches (num_workers, chunk_size, cache_dir, layout)
+
+    Returns:
+        Dictionary with the environment, the settings and one row per (scale, benchmark) under "results"
+    """
+    time_per_frame_rate = 1 / frame_rate
+    synthetic_match_kwargs = {**(synthetic_match_kwargs or {}), "frame_rate": frame_rate, "period_minutes": period_minutes}
+    result_list = []
+    with contextlib.ExitStack() as stack:
+        if data_dir is None:
+            data_dir = stack.enter_context(tempfile.TemporaryDirectory())
+
+        for scale in scale_list:
+            scale_dict = benchmark_scale_template[scale]
+            in_data_dir = os.path.join(data_dir, scale)
+            print(f"Generating {scale} ({scale_dict['num_matches']} matches) in {in_data_dir}")
+            match_metadata_list = write_synthetic_season(in_data_dir, num_matches=scale_dict["num_matches"], seed=seed,
+                                                         **synthetic_match_kwargs, num_periods=scale_dict["num_periods"])
+            match_metadata_list = [list(match_metadata.values()) for match_metadata in match_metadata_list]
+
+            benchmark_dict = benchmark_match(os.path.join(in_data_dir, "matches", str(match_metadata_list[0][-1])),
+                                             time_per_frame_rate=time_per_frame_rate, repeat=repeat,
+                                             reference=reference and scale_dict["reference"])
+            ## The matches of a scale only differ in their time == None frames
+            num_frames = benchmark_dict["mt_to_sec"][0] * len(match_metadata_list)
+            ## Full per-match aggregation, from the JSON files to the player stat summary
+            with contextlib.redirect_stdout(io.StringIO()):
+                benchmark_dict["run_matches"] = (num_frames, time_function(
+                    lambda: run_matches(match_metadata_list, in_data_dir, time_per_frame_rate=time_per_frame_rate, **run_kwargs),
+                    repeat=repeat))
+
+            for benchmark, (num_frames, wall_time_list) in benchmark_dict.items():
+                result_list.append({
+                    "scale": scale,
+                    "benchmark": benchmark,
+                    "num_matches": scale_dict["num_matches"] if benchmark == "run_matches" else 1,
+                    "num_frames": num_frames,
+                    "repeat": len(wall_time_list),
+                    "min_s": min(wall_time_list),
+                    "median_s": float(np.median(wall_time_list)),
+                    "frames_per_s": num_frames / min(wall_time_list),
+                })
+                print(f"{scale:>8} {benchmark:<36} {min(wall_time_list):10.4f} s {num_frames / min(wall_time_list):14.0f} frames/s")
+
+    return {
+        "environment": benchmark_environment(),
+        "settings": {"scale_list": scale_list, "repeat": repeat, "frame_rate": frame_rate,
+                     "period_minutes": period_minutes, "seed": seed,
+                     "reference": reference, "synthetic_match_kwargs": synthetic_match_kwargs, "run_kwargs": run_kwargs},
+        "results": result_list,
+    }
+
+def benchmark_environment():
+    """
+    Environment of the benchmark run, so that results from different machines or commits are not mixed up
+    """
+    try:
+        git_commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        git_commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def save_benchmark_results(benchmark_result_dict: dict,
+                           results_dir: str=RESULTS_DIR):
+    """
+    Save the output of run_benchmark as {results_dir}/benchmark-{timestamp}.json
+
+    Returns:
+        Path to the saved file
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    timestamp = datetime.fromisoformat(benchmark_result_dict["environment"]["timestamp"]).strftime("%Y%m%d-%H%M%S")
+    results_path = os.path.join(results_dir, f"benchmark-{timestamp}.json")
+    with open(results_path, "w") as f:
+        json.dump(benchmark_result_dict, f, indent=2)
+    return results_path
+
+def compare_benchmark_results(baseline_path: str,
+                              current_path: str):
+    """
+    Compare two saved benchmark runs
+
+    Returns:
+        DataFrame with one row per (scale, benchmark) with the min wall time of both runs and the speedup
+    """
+    result_df_list = []
+    for path in [baseline_path, current_path]:
+        with open(path, "r") as f:
+            result_df_list.append(pd.DataFrame(json.load(f)["results"]).set_index(["scale", "benchmark"])["min_s"])
+    compare_df = pd.concat(result_df_list, axis=1, keys=["baseline_s", "current_s"])
+    compare_df["speedup"] = compare_df["baseline_s"] / compare_df["current_s"]
+    return compare_df.reset_index()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic SkillCorner matches")
+    parser.add_argument("--scale", nargs="+", default=["half", "match"], choices=list(benchmark_scale_template))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=None, help="Directory to keep the synthetic matches in between runs")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help=f"Directory to save the run to. Defaults to {RESULTS_DIR}")
+    parser.add_argument("--frame-rate", type=int, default=10)
+    parser.add_argument("--period-minutes", type=float, default=45)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--num-objects", type=int, default=None,
+                        help="Number of tracked objects per frame (both teams and the ball). "
+                             f"Defaults to {2 * synthetic_match_template['num_players'] + 1}")
+    parser.add_argument("--churn", type=float, default=None,
+                        help=f"Track id churn rate. Defaults to {synthetic_match_template['track_id_churn_rate']}")
+    parser.add_argument("--missing-ball", type=float, default=None,
+                        help=f"Rate of frames without the ball. Defaults to {synthetic_match_template['missing_ball_rate']}")
+    parser.add_argument("--time-none", type=float, default=None,
+                        help=f"Rate of frames with time == None. Defaults to {synthetic_match_template['time_none_rate']}")
+    parser.add_argument("--no-reference", action="store_true", help="Skip the original row-by-row functions")
+    parser.add_argument("--num-workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Compare two saved runs instead")
+    args = parser.parse_args()
+
+    if args.compare:
+        print(compare_benchmark_results(*args.compare).to_string(index=False))
+        return
+
+    synthetic_match_kwargs = {}
+    if args.num_objects is not None:
+        ## Every team has the same number of players, so an even num_objects is rounded down
+        synthetic_match_kwargs["num_players"] = (args.num_objects - 1) // 2
+    if args.churn is not None:
+        synthetic_match_kwargs["track_id_churn_rate"] = args.churn
+    if args.missing_ball is not None:
+        synthetic_match_kwargs["missing_ball_rate"] = args.missing_ball
+    if args.time_none is not None:
+        synthetic_match_kwargs["time_none_rate"] = args.time_none
+
+    benchmark_result_dict = run_benchmark(scale_list=args.scale, repeat=args.repeat, data_dir=args.data_dir,
+                                          frame_rate=args.frame_rate, period_minutes=args.period_minutes, seed=args.seed,
+                                          reference=not args.no_reference, synthetic_match_kwargs=synthetic_match_kwargs,
+                                          num_workers=args.num_workers, chunk_size=args.chunk_size)
+    print(f"Saved to {save_benchmark_results(benchmark_result_dict, args.results_dir)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for caching the exploded tracking data of the SkillCorner dataset found in the repo
+on disk as Parquet, so that a match only has to be parsed and exploded once
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from blue_crow_sports.utils import HOMEAWAY_DTYPE
+
+## Bump this whenever the output of the explode stage changes so that the old cache files are not used
+EXPLODE_CACHE_VERSION = 3
+
+def source_fingerprint(path_list: list):
+    """
+    Fingerprint the source files of a match using their size and mtime
+
+    Returns:
+        Dictionary of the file name to its fingerprint
+    """
+    fingerprint_dict = {}
+    for path in path_list:
+        stat = os.stat(path)
+        fingerprint_dict[os.path.basename(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return fingerprint_dict
+
+def compact_explode_data(df: pd.DataFrame):
+    """
+    Convert the exploded tracking data to compact dtypes (the same as explode_data_batch with compact_dtypes):
+        1. {trackobj}_x, {trackobj}_y: float32
+        2. {trackobj}_track_id: nullable Int32
+        3. {trackobj}_homeaway, possession_homeaway: HOMEAWAY_DTYPE categorical
+        4. The raw "data" and player_trackobj_captured lists are dropped as everything in them has been exploded
+    """
+    compact_df = df.drop(columns=["data", "player_trackobj_captured"], errors="ignore")
+    compact_col_dict = {}
+    for col in compact_df.columns:
+        if col.endswith("_x") or col.endswith("_y"):
+            compact_col_dict[col] = compact_df[col].astype(np.float32)
+        elif col.endswith("_track_id"):
+            compact_col_dict[col] = compact_df[col].astype("Int32")
+        elif col.endswith("homeaway"):
+            compact_col_dict[col] = compact_df[col].astype(object).astype(HOMEAWAY_DTYPE)
+        elif col == "possession_player_trackobj":
+            compact_col_dict[col] = compact_df[col].astype(np.float32)
+        elif col in ["num_player_captured", "data_length"]:
+            compact_col_dict[col] = compact_df[col].astype(np.int16)
+    compact_df = compact_df.assign(**compact_col_dict)
+    return compact_df
+
+def explode_cache_paths(cache_dir: str,
+                        match_id: int):
+    """
+    Directory of the Parquet parts and the metadata file for a match
+    """
+    return (os.path.join(cache_dir, str(match_id)),
+            os.path.join(cache_dir, f"{match_id}.json"))
+
+def explode_cache_part_paths(cache_dir: str,
+                             match_id: int,
+                             fingerprint: dict):
+    """
+    Paths to the Parquet parts of a match in the cache, in frame order
+
+    Returns:
+        List of the paths, or None if there is no cache for the match or
+        it was written from different source files or a different EXPLODE_CACHE_VERSION
+    """
+    part_dir, meta_path = explode_cache_paths(cache_dir, match_id)
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path, "r") as f:
+        meta_dict = json.load(f)
+    if meta_dict.get("version") != EXPLODE_CACHE_VERSION or meta_dict.get("sources") != fingerprint:
+        return None
+
+    part_path_list = [os.path.join(part_dir, f"part-{part_idx:05d}.parquet") for part_idx in range(meta_dict["num_parts"])]
+    if not all(os.path.exists(part_path) for part_path in part_path_list):
+        return None
+    return part_path_list
+
+def read_explode_cache(cache_dir: str,
+                       match_id: int,
+                       fingerprint: dict):
+    """
+    Read the exploded tracking data of a match from the cache.
+    The parts are memory-mapped when they are read
+
+    Returns:
+        The cached DataFrame, or None if the cache is missing or out of date (see explode_cache_part_paths)
+    """
+    part_path_list = explode_cache_part_paths(cache_dir, match_id, fingerprint)
+    if part_path_list is None:
+        return None
+    if len(part_path_list) == 1:
+        return pd.read_parquet(part_path_list[0], memory_map=True)
+
+    ## The parts only have the players in view in their frames, so the dtypes are restored after the concat
+    df = pd.concat([pd.read_parquet(part_path, memory_map=True) for part_path in part_path_list], axis=0, ignore_index=True)
+    return compact_explode_data(df.reindex(sorted(df.columns), axis=1))
+
+def iter_explode_cache(cache_dir: str,
+                       match_id: int,
+                       fingerprint: dict,
+                       chunk_size: int=6000):
+    """
+    Read the exploded tracking data of a match from the cache chunk_size frames at a time,
+    whatever the size of the parts it was written in
+
+    Returns:
+        Generator of the compacted chunks, or None if the cache is missing or out of date
+    """
+    part_path_list = explode_cache_part_paths(cache_dir, match_id, fingerprint)
+    if part_path_list is None:
+        return None
+
+    def chunk_iter():
+        for part_path in part_path_list:
+            for batch in pq.ParquetFile(part_path, memory_map=True).iter_batches(batch_size=chunk_size):
+                yield compact_explode_data(batch.to_pandas())
+    return chunk_iter()
+
+def clear_explode_cache(cache_dir: str,
+                        match_id: int):
+    """
+    Remove the cache of a match before it is rewritten. The metadata goes first, so that a crash
+    while the parts are being written never leaves a half written cache behind that looks complete
+    """
+    part_dir, meta_path = explode_cache_paths(cache_dir, match_id)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    if os.path.exists(part_dir):
+        shutil.rmtree(part_dir)
+    os.makedirs(part_dir)
+
+def write_explode_cache_part(df: pd.DataFrame,
+                             cache_dir: str,
+                             match_id: int,
+                             part_idx: int):
+    """
+    Write a part (a chunk of frames) of the compacted exploded tracking data of a match to the cache
+    """
+    part_dir, _ = explode_cache_paths(cache_dir, match_id)
+    df.to_parquet(os.path.join(part_dir, f"part-{part_idx:05d}.parquet"), index=False)
+
+def write_explode_cache_meta(cache_dir: str,
+                             match_id: int,
+                             fingerprint: dict,
+                             num_parts: int):
+    """
+    Mark the cache of a match as complete once all its num_parts parts are written
+    """
+    _, meta_path = explode_cache_paths(cache_dir, match_id)
+    with open(meta_path, "w") as f:
+        json.dump({"version": EXPLODE_CACHE_VERSION, "sources": fingerprint, "num_parts": num_parts}, f)
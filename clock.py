@@ -0,0 +1,158 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for parsing the match clock (XX:XX.XX) of the SkillCorner dataset found in the repo
+for all the frames at once, and for indexing the contiguous segments, gaps and duplicated timestamps of each period
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.utils import mt_to_sec
+
+DIGIT_OFFSET = ord("0")
+
+def parse_fixed_width_clock(char_arr: np.ndarray):
+    """
+    Parse match times that all have the same width (e.g. "45:00.00") into seconds.
+    The times are given as a (frames x characters) matrix of their bytes and the digits are read by position
+
+    Returns:
+        Array of seconds, or None if any of the times is not in the XX:XX.XX format
+    """
+    width = char_arr.shape[1]
+    num_min_digits = width - len(":SS.cc")
+    if num_min_digits < 1:
+        return None
+    digit_arr = char_arr.astype(np.int64) - DIGIT_OFFSET
+
+    digit_col_list = list(range(num_min_digits)) + [width - 5, width - 4, width - 2, width - 1]
+    if (char_arr[:, num_min_digits] != ord(":")).any() or (char_arr[:, width - 3] != ord(".")).any() or \
+        ((digit_arr[:, digit_col_list] < 0) | (digit_arr[:, digit_col_list] > 9)).any():
+        return None
+
+    mins = np.zeros(len(char_arr), dtype=np.int64)
+    for col in range(num_min_digits):
+        mins = mins * 10 + digit_arr[:, col]
+    secs = digit_arr[:, width - 5] * 10 + digit_arr[:, width - 4]
+    micro = digit_arr[:, width - 2] * 10 + digit_arr[:, width - 1]
+    ## Same operations in the same order as mt_to_sec so that the seconds are bitwise identical
+    return mins.astype(float) * 60 + secs.astype(float) + micro.astype(float) / 100
+
+def parse_match_clock(time_series: pd.Series):
+    """
+    Vectorised version of time_series.apply(mt_to_sec). The times are converted to a single
+    fixed-width byte array, grouped by their width (usually there is only one) and every group
+    is parsed in one go with parse_fixed_width_clock.
+    Anything that is not in the XX:XX.XX format falls back to mt_to_sec
+
+    Input:
+        time_series: Series of match times in the format XX:XX.XX. None / NaN gives NaN
+
+    Returns:
+        Series of seconds with the same index as time_series
+    """
+    seconds_arr = np.full(len(time_series), np.nan)
+    time_obj_arr = time_series.to_numpy(dtype=object)
+    has_time_flag = pd.notna(time_obj_arr)
+    if not has_time_flag.any():
+        return pd.Series(seconds_arr, index=time_series.index)
+
+    time_obj_arr = time_obj_arr[has_time_flag]
+    has_time_idx = np.flatnonzero(has_time_flag)
+    try:
+        time_arr = time_obj_arr.astype(bytes)
+    except (UnicodeEncodeError, TypeError):
+        seconds_arr[has_time_idx] = [mt_to_sec(match_time) for match_time in time_obj_arr]
+        return pd.Series(seconds_arr, index=time_series.index)
+
+    ## The shorter times are padded with null bytes at the end
+    char_arr = time_arr.view(np.uint8).reshape(len(time_arr), time_arr.dtype.itemsize)
+    width_arr = (char_arr != 0).sum(axis=1)
+    for width in np.unique(width_arr):
+        width_flag = width_arr == width
+        width_seconds_arr = parse_fixed_width_clock(char_arr[width_flag, :width])
+        if width_seconds_arr is None:
+            width_seconds_arr = [mt_to_sec(match_time) for match_time in time_obj_arr[width_flag]]
+        seconds_arr[has_time_idx[width_flag]] = width_seconds_arr
+    return pd.Series(seconds_arr, index=time_series.index)
+
+def build_clock_index(df: pd.DataFrame,
+                      time_per_frame_rate: float=0.10,
+                      tolerance: float=None):
+    """
+    Index the clock of every period once so that the later stages do not have to scan for gaps themselves.
+    Within a period, consecutive frames are in the same segment if the clock moves on by
+    time_per_frame_rate (within tolerance). A frame with the same time as the frame before it is a duplicate
+    (e.g. the repeated 45:00.00 rows) and any other jump in the clock starts a new segment
+
+    Input:
+        df: DataFrame with the period and time_seconds columns, in frame order
+        time_per_frame_rate: Number of seconds for each frame
+        tolerance: Allowed difference from time_per_frame_rate. Defaults to half a frame
+
+    Returns:
+        Dictionary with:
+            1. segment_id: Array with the segment of every row. Segments never span two periods
+            2. duplicate: Boolean array, True for the rows whose time is the same as the row before in the period
+            3. segments: DataFrame with one row per segment (period, start_row, end_row (exclusive),
+               start_seconds, end_seconds, num_frames)
+            4. gaps: DataFrame with one row per break between two segments of a period
+               (period, row, prev_seconds, seconds, gap_seconds). Duplicates have gap_seconds == 0
+    """
+    if tolerance is None:
+        tolerance = time_per_frame_rate / 2
+    period_arr = df["period"].to_numpy()
+    seconds_arr = df["time_seconds"].to_numpy(dtype=float)
+    num_rows = len(df)
+
+    new_period_flag = np.ones(num_rows, dtype=bool)
+    new_period_flag[1:] = period_arr[1:] != period_arr[:-1]
+    diff_arr = np.full(num_rows, np.nan)
+    diff_arr[1:] = seconds_arr[1:] - seconds_arr[:-1]
+
+    contiguous_flag = np.abs(diff_arr - time_per_frame_rate) <= tolerance
+    break_flag = ~new_period_flag & ~contiguous_flag
+    duplicate_flag = ~new_period_flag & (diff_arr == 0)
+    segment_id_arr = np.cumsum(new_period_flag | break_flag) - 1
+
+    start_row_arr = np.flatnonzero(new_period_flag | break_flag)
+    end_row_arr = np.append(start_row_arr[1:], num_rows)
+    segments_df = pd.DataFrame({
+        "period": period_arr[start_row_arr],
+        "start_row": start_row_arr,
+        "end_row": end_row_arr,
+        "start_seconds": seconds_arr[start_row_arr],
+        "end_seconds": seconds_arr[end_row_arr - 1],
+        "num_frames": end_row_arr - start_row_arr,
+    })
+
+    gap_row_arr = np.flatnonzero(break_flag)
+    gaps_df = pd.DataFrame({
+        "period": period_arr[gap_row_arr],
+        "row": gap_row_arr,
+        "prev_seconds": seconds_arr[gap_row_arr - 1],
+        "seconds": seconds_arr[gap_row_arr],
+        "gap_seconds": diff_arr[gap_row_arr],
+    })
+    return {"segment_id": segment_id_arr,
+            "duplicate": duplicate_flag,
+            "segments": segments_df,
+            "gaps": gaps_df}
+
+def same_segment_flag(clock_index: dict,
+                      window: int):
+    """
+    Whether each row and the row window frames after it are in the same clock segment,
+    i.e. the window [row, row + window] has no gap, duplicate or period break in it
+
+    Returns:
+        Boolean array with one entry per row (False where row + window is past the end)
+    """
+    segment_id_arr = clock_index["segment_id"]
+    same_flag = np.zeros(len(segment_id_arr), dtype=bool)
+    if window < len(segment_id_arr):
+        same_flag[:len(segment_id_arr) - window] = segment_id_arr[:len(segment_id_arr) - window] == segment_id_arr[window:]
+    return same_flag
@@ -0,0 +1,297 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for the long-format (one row per frame and trackable object) representation of the
+tracking data of the SkillCorner dataset found in the repo
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.profiling import profiled
+from blue_crow_sports.proximity import summarise_pressure_long
+from blue_crow_sports.quickness import summarise_quickness_long
+from blue_crow_sports.tactical import summarise_lines_long
+from blue_crow_sports.utils import (aggregate_player_stats,
+                                    extract_home_away_player_trackobj)
+
+FRAME_COL_LIST = ["time", "time_seconds", "possession_player_trackobj", "possession_homeaway"]
+
+def frame_keys(df: pd.DataFrame):
+    """
+    Columns that identify a frame: (match_id,) period, frame
+    """
+    return (["match_id"] if "match_id" in df.columns else []) + ["period", "frame"]
+
+def build_frames_table(match_struc_data_df: pd.DataFrame,
+                       match_id: int=None):
+    """
+    Build the frame-level table from the prepared structured data
+
+    Returns:
+        DataFrame with one row per frame, the FRAME_COL_LIST columns, row_idx (the position of the
+        frame in match_struc_data_df) and frame_pos (the position of the frame within its period)
+    """
+    frames_df = match_struc_data_df[["period", "frame"] + FRAME_COL_LIST].reset_index(drop=True)
+    frames_df["possession_homeaway"] = frames_df["possession_homeaway"].astype("category")
+    frames_df["row_idx"] = np.arange(len(frames_df), dtype=np.int32)
+    frames_df["frame_pos"] = frames_df.groupby("period").cumcount().astype(np.int32)
+    if match_id is not None:
+        frames_df.insert(0, "match_id", match_id)
+    return frames_df
+
+def build_tracks_table(frames_df: pd.DataFrame,
+                       row_idx: np.ndarray,
+                       trackobj: np.ndarray,
+                       x: np.ndarray,
+                       y: np.ndarray,
+                       track_id: np.ndarray,
+                       match_info: dict):
+    """
+    Build the typed long-format tracking table from flat arrays with one entry per tracked object per frame.
+    If an object is tracked more than once in a frame, the last one is kept (the same as explode_data)
+    """
+    home_player_trackobj_list, away_player_trackobj_list, _ = extract_home_away_player_trackobj(match_info)
+    tracks_df = pd.DataFrame({
+        "row_idx": np.asarray(row_idx, dtype=np.int32),
+        "trackable_object": np.asarray(trackobj, dtype=np.int32),
+        "x": np.asarray(x, dtype=np.float32),
+        "y": np.asarray(y, dtype=np.float32),
+        "track_id": pd.array(track_id, dtype="Int32"),
+    })
+    tracks_df = tracks_df.drop_duplicates(["row_idx", "trackable_object"], keep="last")
+
+    home_away_series = pd.Series(
+        ["home_team"] * len(home_player_trackobj_list) + ["away_team"] * len(away_player_trackobj_list),
+        index=home_player_trackobj_list + away_player_trackobj_list)
+    tracks_df["homeaway"] = pd.Categorical(tracks_df["trackable_object"].map(home_away_series),
+                                           categories=["home_team", "away_team"])
+
+    key_col_list = frame_keys(frames_df)
+    frame_ref_df = frames_df[key_col_list + ["frame_pos"]].iloc[tracks_df["row_idx"].to_numpy()]
+    for col in key_col_list + ["frame_pos"]:
+        tracks_df[col] = frame_ref_df[col].to_numpy()
+    tracks_df = tracks_df.set_index(key_col_list + ["trackable_object"]).sort_index()
+    return tracks_df
+
+@profiled("explode_data")
+def to_long_format(match_struc_data_df: pd.DataFrame,
+                   match_info: dict,
+                   match_id: int=None):
+    """
+    Convert the prepared structured data (output of pipeline.prepare_structured_data) straight into
+    the long format, walking the "data" lists once. Only the objects with a trackable object
+    (players and the ball) are kept
+
+    Input:
+        match_struc_data_df: Prepared structured data with the "data" column
+        match_info: Match information loaded from match_data.json
+        match_id: If set, match_id is added to the index so that several matches can be stacked
+
+    Returns:
+        frames_df: Frame-level table (see build_frames_table)
+        tracks_df: Table indexed by ((match_id,) period, frame, trackable_object) with the
+            x, y (float32), track_id (Int32), homeaway (categorical) and frame_pos columns
+    """
+    frames_df = build_frames_table(match_struc_data_df, match_id=match_id)
+
+    row_idx_list, trackobj_list, x_list, y_list, track_id_list = [], [], [], [], []
+    for row_idx, track_list in enumerate(match_struc_data_df["data"]):
+        for tracked in track_list:
+            player_trackobj = tracked.get("trackable_object")
+            if not player_trackobj:
+                continue
+            row_idx_list.append(row_idx)
+            trackobj_list.append(player_trackobj)
+            x_list.append(tracked.get("x"))
+            y_list.append(tracked.get("y"))
+            track_id_list.append(tracked.get("track_id"))
+
+    tracks_df = build_tracks_table(frames_df, row_idx_list, trackobj_list,
+                                   np.array(x_list, dtype=float), np.array(y_list, dtype=float),
+                                   track_id_list, match_info)
+    return frames_df, tracks_df
+
+def wide_to_long(match_explode_data_df: pd.DataFrame,
+                 match_info: dict,
+                 match_id: int=None):
+    """
+    Convert the wide output of explode_data_batch (or the explode cache) into the long format.
+    A player is in a frame if its {trackobj}_homeaway is set and the ball if its x is set
+
+    Returns:
+        Same as to_long_format
+    """
+    frames_df = build_frames_table(match_explode_data_df, match_id=match_id)
+    trackobj_list = [int(col[:-len("_x")]) for col in match_explode_data_df.columns
+                     if col.endswith("_x") and col[:-len("_x")].isdigit()]
+
+    x_arr = match_explode_data_df[[f"{trackobj}_x" for trackobj in trackobj_list]].to_numpy(dtype=float, na_value=np.nan)
+    y_arr = match_explode_data_df[[f"{trackobj}_y" for trackobj in trackobj_list]].to_numpy(dtype=float, na_value=np.nan)
+    track_id_arr = match_explode_data_df[[f"{trackobj}_track_id" for trackobj in trackobj_list]].to_numpy(dtype=float, na_value=np.nan)
+    in_frame_arr = ~np.isnan(x_arr)
+    for slot, trackobj in enumerate(trackobj_list):
+        home_away_series = match_explode_data_df[f"{trackobj}_homeaway"]
+        if home_away_series.notna().any():
+            in_frame_arr[:, slot] = home_away_series.notna().to_numpy()
+
+    row_idx, slot = np.nonzero(in_frame_arr)
+    track_id = pd.array(track_id_arr[row_idx, slot], dtype="Float64").astype("Int32")
+    tracks_df = build_tracks_table(frames_df, row_idx, np.array(trackobj_list, dtype=np.int64)[slot],
+                                   x_arr[row_idx, slot], y_arr[row_idx, slot], track_id, match_info)
+    return frames_df, tracks_df
+
+def long_to_wide(frames_df: pd.DataFrame,
+                 tracks_df: pd.DataFrame):
+    """
+    Thin adapter to get back the wide view ({trackobj}_x, {trackobj}_y, {trackobj}_track_id,
+    {trackobj}_homeaway and {trackobj}_dist / {trackobj}_time if calculated) for plotting
+    """
+    key_col_list = frame_keys(frames_df)
+    value_col_list = [col for col in ["x", "y", "track_id", "homeaway", "dist", "time"] if col in tracks_df.columns]
+    wide_df = tracks_df[value_col_list].unstack("trackable_object")
+    wide_df.columns = [f"{trackobj}_{col}" for col, trackobj in wide_df.columns]
+    wide_df = frames_df.set_index(key_col_list).join(wide_df).reset_index()
+    return wide_df.reindex(sorted(wide_df.columns), axis=1)
+
+@profiled("summarise_distance_time")
+def summarise_distance_time_long(frames_df: pd.DataFrame,
+                                 tracks_df: pd.DataFrame,
+                                 frame_rate_smoothing_threshold: int=10,
+                                 time_per_frame_rate: float=0.10):
+    """
+    Long-format version of summarise_distance_time. Every player row is matched with the row of the
+    same player frame_rate_smoothing_threshold frames ahead in the same period with a sorted search,
+    and the track_id continuity and time gap rules are applied as boolean masks
+
+    Returns:
+        Copy of tracks_df with the dist and time columns (NaN where they were not calculated)
+    """
+    key_col_list = frame_keys(frames_df)
+    tracks_df = tracks_df.copy()
+    num_rows = len(tracks_df)
+    level_df = tracks_df.index.to_frame(index=False)
+
+    ## Encode (match, trackable object, period, frame_pos) into one sortable integer
+    group_code = level_df.groupby(key_col_list[:-1] + ["trackable_object"], sort=False).ngroup().to_numpy(dtype=np.int64)
+    frame_pos = tracks_df["frame_pos"].to_numpy(dtype=np.int64)
+    row_key = group_code * (int(frames_df["frame_pos"].max()) + frame_rate_smoothing_threshold + 1) + frame_pos
+    order = np.argsort(row_key, kind="stable")
+    sorted_row_key = row_key[order]
+
+    forward_pos = np.searchsorted(sorted_row_key, row_key + frame_rate_smoothing_threshold)
+    forward_pos = np.minimum(forward_pos, num_rows - 1)
+    forward_found_flag = sorted_row_key[forward_pos] == row_key + frame_rate_smoothing_threshold
+    forward_row = order[forward_pos]
+
+    time_seconds = frames_df.set_index(key_col_list)["time_seconds"].reindex(
+        pd.MultiIndex.from_frame(level_df[key_col_list])).to_numpy(dtype=float)
+    track_id = tracks_df["track_id"].to_numpy(dtype=float, na_value=np.nan)
+    x = tracks_df["x"].to_numpy(dtype=float)
+    y = tracks_df["y"].to_numpy(dtype=float)
+
+    track_id_same_flag = track_id == track_id[forward_row]
+    time_smoothing_same_flag = time_seconds + frame_rate_smoothing_threshold * time_per_frame_rate <= time_seconds[forward_row]
+    valid_flag = forward_found_flag & tracks_df["homeaway"].notna().to_numpy() & \
+        level_df["period"].isin([1, 2]).to_numpy() & (track_id_same_flag | time_smoothing_same_flag)
+
+    distance = np.sqrt((x - x[forward_row]) ** 2 + (y - y[forward_row]) ** 2) / frame_rate_smoothing_threshold
+    tracks_df["dist"] = np.where(valid_flag, distance, np.nan)
+    tracks_df["time"] = np.where(valid_flag, time_per_frame_rate, np.nan)
+    return tracks_df
+
+@profiled("player_aggregation")
+def summarise_player_stats_long(frames_df: pd.DataFrame,
+                                tracks_df: pd.DataFrame):
+    """
+    Summarise the output of summarise_distance_time_long into the keys of player_stat_template
+    for every player with one grouped pass
+
+    Returns:
+        DataFrame indexed by ((match_id,) trackable object) with the player_stat_template stats and team
+    """
+    key_col_list = frame_keys(frames_df)
+    player_tracks_df = tracks_df[tracks_df["dist"].notna()]
+    level_df = player_tracks_df.index.to_frame(index=False)
+    possession_df = frames_df.set_index(key_col_list)[["possession_player_trackobj", "possession_homeaway"]].reindex(
+        pd.MultiIndex.from_frame(level_df[key_col_list]))
+
+    group_col_list = key_col_list[:-2] + ["trackable_object"]
+    onball = (possession_df["possession_player_trackobj"].to_numpy() == level_df["trackable_object"].to_numpy())
+    teampos = (possession_df["possession_homeaway"].astype(object).to_numpy() ==
+               player_tracks_df["homeaway"].astype(object).to_numpy())
+    stat_summary_df = aggregate_player_stats(level_df[group_col_list],
+                                             dist=player_tracks_df["dist"].to_numpy(),
+                                             time=player_tracks_df["time"].to_numpy(),
+                                             onball=onball, teampos=teampos)
+    stat_summary_df["team"] = player_tracks_df["homeaway"].astype(object).groupby(
+        [level_df[col].to_numpy() for col in group_col_list]).first()
+    if len(group_col_list) == 1:
+        stat_summary_df.index.name = None
+    return stat_summary_df
+
+def summarise_long_stats(frames_df: pd.DataFrame,
+                         tracks_df: pd.DataFrame,
+                         match_info: dict,
+                         time_per_frame_rate: float=0.10,
+                         tactical_lines: bool=False,
+                         proximity: bool=False,
+                         direction_series: pd.Series=None,
+                         quickness_carry: dict=None):
+    """
+    All the per-player stats of a match from the output of summarise_distance_time_long:
+    the player_stat_template and player_quickness_template stats, the
+    player_line_template stats if tactical_lines and the player_pressure_template stats if proximity
+
+    Input:
+        direction_series, quickness_carry: For a chunk of a match (see pipeline.summarise_wide_stats)
+
+    Returns:
+        Same as summarise_player_stats_long with the extra stats
+    """
+    stat_summary_df = pd.concat([
+        summarise_player_stats_long(frames_df, tracks_df),
+        summarise_quickness_long(frames_df, tracks_df, time_per_frame_rate=time_per_frame_rate,
+                                 quickness_carry=quickness_carry)], axis=1)
+    if tactical_lines:
+        stat_summary_df = stat_summary_df.join(summarise_lines_long(frames_df, tracks_df, match_info,
+                                                                    direction_series=direction_series))
+    if proximity:
+        stat_summary_df = stat_summary_df.join(summarise_pressure_long(frames_df, tracks_df))
+    return stat_summary_df
+
+def summarise_match_long(match_struc_data_df: pd.DataFrame,
+                         match_info: dict,
+                         frame_rate_smoothing_threshold: int=1,
+                         time_per_frame_rate: float=0.10,
+                         num_owned_frames: int=None,
+                         tactical_lines: bool=False,
+                         proximity: bool=False,
+                         direction_series: pd.Series=None,
+                         quickness_carry: dict=None):
+    """
+    Run the prepared structured data of a match (or a chunk of it) through the long-format
+    distance and possession-split stats
+
+    Input:
+        num_owned_frames: If set, only the first num_owned_frames frames are summarised (see streaming.iter_frame_chunks)
+        tactical_lines: Whether to add the player_line_template stats
+        proximity: Whether to add the player_pressure_template stats
+        direction_series, quickness_carry: For a chunk of a match (see pipeline.summarise_wide_stats)
+
+    Returns:
+        Output of summarise_long_stats
+    """
+    frames_df, tracks_df = to_long_format(match_struc_data_df, match_info)
+    tracks_df = summarise_distance_time_long(frames_df, tracks_df,
+                                             frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+                                             time_per_frame_rate=time_per_frame_rate)
+    if num_owned_frames is not None:
+        frames_df = frames_df.iloc[:num_owned_frames]
+        tracks_df = tracks_df[tracks_df["row_idx"] < num_owned_frames]
+    return summarise_long_stats(frames_df, tracks_df, match_info,
+                                time_per_frame_rate=time_per_frame_rate,
+                                tactical_lines=tactical_lines, proximity=proximity,
+                                direction_series=direction_series, quickness_carry=quickness_carry)
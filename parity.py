@@ -0,0 +1,505 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is the parity checks of the analysis pipeline for the SkillCorner dataset found in the repo.
+The faster paths of the pipeline are run on synthetic matches (see synthetic.py) and checked against the
+original functions, so that a change to a kernel that breaks the results is caught before it reaches the stats
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+
+Usage:
+    python -m blue_crow_sports.parity
+    python -m blue_crow_sports.parity --check distance_kernels --period-minutes 1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.benchmark import explode_data_reference
+from blue_crow_sports.cache import compact_explode_data
+from blue_crow_sports.clock import parse_match_clock
+from blue_crow_sports.pipeline import (explode_structured_data,
+                                       prepare_structured_data,
+                                       read_structured_data, run_matches,
+                                       summarise_explode_data,
+                                       summarise_player_stats)
+from blue_crow_sports.pyramid import build_track_pyramid, query_player_stats
+from blue_crow_sports.quickness import (aggregate_quickness,
+                                        flush_quickness_carry,
+                                        start_quickness_carry,
+                                        summarise_quickness_wide)
+from blue_crow_sports.synthetic import match_clock, write_synthetic_season
+from blue_crow_sports.trajectory import (build_trajectory_index,
+                                         player_track_runs, player_trajectory,
+                                         present_flag)
+from blue_crow_sports.utils import (explode_data_batch,
+                                    extract_home_away_player_trackobj,
+                                    mt_to_sec,
+                                    player_line_template,
+                                    player_quickness_template,
+                                    player_stat_template,
+                                    summarise_distance_time,
+                                    summarise_distance_time_vectorised)
+
+## Tolerance of the float comparisons. The compact dtypes keep the coordinates in float32
+PARITY_RTOL = 1e-5
+PARITY_ATOL = 1e-6
+## Smoothing thresholds the distance kernels are checked at
+PARITY_THRESHOLD_LIST = [1, 3, 10]
+## Number of frames per chunk of the chunked runs. Small and odd so that the chunks do not line up with the periods
+PARITY_CHUNK_SIZE = 97
+## Distance in metres that write_drifting_match moves everything along x over each period
+PARITY_DRIFT = 120.0
+## Sprint and acceleration thresholds low enough for the random walk of the synthetic players to cross them
+PARITY_QUICKNESS_KWARGS = {"sprint_speed": 4.0, "min_sprint_seconds": 0.3, "accel_threshold": 1.0, "min_accel_seconds": 0.2}
+
+def assert_frame_close(expected_df: pd.DataFrame,
+                       actual_df: pd.DataFrame,
+                       col_list: list,
+                       label: str,
+                       rtol: float=PARITY_RTOL,
+                       atol: float=PARITY_ATOL):
+    """
+    Assert that the col_list columns of two DataFrames with the same rows are equal within the tolerance,
+    NaN being equal to NaN
+    """
+    assert len(expected_df) == len(actual_df), f"{label}: {len(expected_df)} vs {len(actual_df)} rows"
+    for col in col_list:
+        expected_arr = expected_df[col].to_numpy(dtype=float, na_value=np.nan)
+        actual_arr = actual_df[col].to_numpy(dtype=float, na_value=np.nan)
+        if not np.allclose(expected_arr, actual_arr, rtol=rtol, atol=atol, equal_nan=True):
+            diff_arr = np.abs(np.nan_to_num(expected_arr) - np.nan_to_num(actual_arr))
+            raise AssertionError(f"{label}: {col} differs, max difference {diff_arr.max()} at row {diff_arr.argmax()}")
+
+def load_sample_match(in_data_dir: str,
+                      match_metadata: list):
+    """
+    match_data.json and the exploded structured_data.json of a sample match
+
+    Returns:
+        match_info_dict, match_explode_data_df
+    """
+    match_data_dir = os.path.join(in_data_dir, "matches", str(match_metadata[-1]))
+    with open(os.path.join(match_data_dir, "match_data.json"), "r") as f:
+        match_info_dict = json.load(f)
+    match_explode_data_df = explode_structured_data(read_structured_data(os.path.join(match_data_dir, "structured_data.json")),
+                                                    match_info_dict)
+    return match_info_dict, match_explode_data_df
+
+def summarise_sample_match(in_data_dir: str,
+                           match_metadata: list):
+    """
+    Distance of every player of a sample match from frame to frame (see pipeline.summarise_explode_data)
+
+    Returns:
+        match_player_stats_data_df and the trackable objects of the players
+    """
+    match_info_dict, match_explode_data_df = load_sample_match(in_data_dir, match_metadata)
+    home_player_trackobj_list, away_player_trackobj_list, _ = extract_home_away_player_trackobj(match_info_dict)
+    return summarise_explode_data(match_explode_data_df), home_player_trackobj_list + away_player_trackobj_list
+
+def check_match_clock(in_data_dir: str,
+                      match_metadata_list: list):
+    """
+    parse_match_clock against mt_to_sec (NaN for None) on the time of every frame of every sample match,
+    with a None and the times of extra time and beyond (over 90 and over 100 minutes) mixed in. The seconds must be
+    exactly the same, as the clock index compares them with ==
+    """
+    extra_time_list = match_clock(np.arange(90 * 60, 125 * 60, 37.01)) + ["90:00.00", "99:59.99", "100:00.00"]
+    for match_metadata in match_metadata_list:
+        _, frame_list = read_sample_frames(in_data_dir, match_metadata)
+        time_list = [frame["time"] for frame in frame_list]
+        ## In the middle, so that the extra times are not only at the end of the byte array
+        time_list = time_list[:len(time_list) // 2] + extra_time_list + [None] + time_list[len(time_list) // 2:]
+
+        expected_arr = np.array([np.nan if match_time is None else mt_to_sec(match_time) for match_time in time_list])
+        actual_arr = parse_match_clock(pd.Series(time_list, dtype=object)).to_numpy()
+        if not np.array_equal(expected_arr, actual_arr, equal_nan=True):
+            diff_idx = np.flatnonzero(~((expected_arr == actual_arr) | (np.isnan(expected_arr) & np.isnan(actual_arr))))[0]
+            raise AssertionError(f"match_clock (match {match_metadata[-1]}): {time_list[diff_idx]} is "
+                                 f"{actual_arr[diff_idx]!r} instead of {expected_arr[diff_idx]!r}")
+
+def check_explode_batch(in_data_dir: str,
+                        match_metadata_list: list):
+    """
+    explode_data_batch against explode_data run on every row, for every sample match: the same columns
+    in the same order, with the same dtypes and values. With compact_dtypes, against the reference cast
+    with compact_explode_data
+    """
+    for match_metadata in match_metadata_list:
+        match_data_dir = os.path.join(in_data_dir, "matches", str(match_metadata[-1]))
+        with open(os.path.join(match_data_dir, "match_data.json"), "r") as f:
+            match_info_dict = json.load(f)
+        prepared_df = prepare_structured_data(read_structured_data(os.path.join(match_data_dir, "structured_data.json")))
+        expected_df = explode_data_reference(prepared_df.copy(), match_info_dict)
+        actual_df = explode_data_batch(prepared_df.copy(), match_info_dict)
+        pd.testing.assert_frame_equal(expected_df, actual_df, check_exact=True,
+                                      obj=f"explode_batch (match {match_metadata[-1]})")
+
+        ## num_player_captured goes where explode_data_batch puts it, right after the prepared columns
+        expected_df.insert(len(prepared_df.columns), "num_player_captured", expected_df["player_trackobj_captured"].apply(len))
+        expected_df = compact_explode_data(expected_df)
+        actual_df = explode_data_batch(prepared_df.copy(), match_info_dict, compact_dtypes=True)
+        ## The prepared columns (possession_*, data_length) are only cast later by compact_explode_data
+        explode_col_list = list(actual_df.columns[len(prepared_df.columns) - len(["data", "player_trackobj_captured"]):])
+        pd.testing.assert_frame_equal(expected_df[explode_col_list], actual_df[explode_col_list], check_exact=True,
+                                      obj=f"explode_batch (compact, match {match_metadata[-1]})")
+        pd.testing.assert_frame_equal(expected_df, compact_explode_data(actual_df), check_exact=True,
+                                      obj=f"explode_batch (compact, match {match_metadata[-1]})")
+
+def check_distance_kernels(in_data_dir: str,
+                           match_metadata_list: list,
+                           threshold_list: list=PARITY_THRESHOLD_LIST,
+                           time_per_frame_rate: float=0.10):
+    """
+    summarise_distance_time_vectorised against the original row-by-row summarise_distance_time
+    on the first match, at every smoothing threshold of threshold_list
+    """
+    _, match_explode_data_df = load_sample_match(in_data_dir, match_metadata_list[0])
+    for frame_rate_smoothing_threshold in threshold_list:
+        label = f"distance_kernels (threshold {frame_rate_smoothing_threshold})"
+        expected_df = summarise_distance_time(match_explode_data_df, frame_rate_smoothing_threshold, time_per_frame_rate)
+        actual_df = summarise_distance_time_vectorised(match_explode_data_df, frame_rate_smoothing_threshold, time_per_frame_rate)
+        dist_time_col_list = sorted(col for col in expected_df.columns if col.endswith(("_dist", "_time")))
+        assert dist_time_col_list == sorted(col for col in actual_df.columns if col.endswith(("_dist", "_time"))), \
+            f"{label}: the players with a distance differ"
+        assert_frame_close(expected_df, actual_df, ["time_seconds"] + dist_time_col_list, label)
+
+def run_match_stats(in_data_dir: str,
+                    match_metadata_list: list,
+                    **run_kwargs):
+    """
+    pipeline.run_matches in this process without its progress output, sorted by match and player
+
+    Returns:
+        DataFrame of the player stat summary of all the matches
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        stat_summary_df = run_matches(match_metadata_list, in_data_dir, num_workers=1, **run_kwargs)
+    return stat_summary_df.sort_values(["match_id", "player_id"]).reset_index(drop=True)
+
+def read_sample_frames(in_data_dir: str,
+                       match_metadata: list):
+    """
+    match_data.json and the frames of structured_data.json of a sample match
+
+    Returns:
+        match_info_dict, frame_list
+    """
+    match_data_dir = os.path.join(in_data_dir, "matches", str(match_metadata[-1]))
+    with open(os.path.join(match_data_dir, "match_data.json"), "r") as f:
+        match_info_dict = json.load(f)
+    with open(os.path.join(match_data_dir, "structured_data.json"), "r") as f:
+        frame_list = json.load(f)
+    return match_info_dict, frame_list
+
+def write_sample_frames(in_data_dir: str,
+                        match_metadata: list,
+                        out_data_dir: str,
+                        frame_list: list):
+    """
+    Copy a sample match into out_data_dir with frame_list as its structured_data.json
+
+    Returns:
+        Rows of matches.json of out_data_dir
+    """
+    match_id = match_metadata[-1]
+    out_match_data_dir = os.path.join(out_data_dir, "matches", str(match_id))
+    os.makedirs(out_match_data_dir, exist_ok=True)
+    shutil.copy(os.path.join(in_data_dir, "matches", str(match_id), "match_data.json"), out_match_data_dir)
+    with open(os.path.join(out_match_data_dir, "structured_data.json"), "w") as f:
+        json.dump(frame_list, f)
+    shutil.copy(os.path.join(in_data_dir, "matches.json"), out_data_dir)
+    return [match_metadata]
+
+def write_drifting_match(in_data_dir: str,
+                         match_metadata: list,
+                         out_data_dir: str,
+                         drift: float=PARITY_DRIFT):
+    """
+    Copy a match into out_data_dir with everything on the pitch moved along x from -drift / 2 to +drift / 2
+    over each period, so that the side of the pitch a team is on in a chunk is not the side it is on over the period
+
+    Returns:
+        Rows of matches.json of out_data_dir
+    """
+    _, frame_list = read_sample_frames(in_data_dir, match_metadata)
+    period_arr = np.array([frame["period"] for frame in frame_list])
+    for period in np.unique(period_arr):
+        period_idx_arr = np.flatnonzero(period_arr == period)
+        for frame_idx, shift in zip(period_idx_arr, np.linspace(-drift / 2, drift / 2, len(period_idx_arr))):
+            for tracked in frame_list[frame_idx]["data"]:
+                tracked["x"] += shift
+    return write_sample_frames(in_data_dir, match_metadata, out_data_dir, frame_list)
+
+def check_chunked_vs_full(in_data_dir: str,
+                          match_metadata_list: list,
+                          threshold_list: list=PARITY_THRESHOLD_LIST):
+    """
+    The player stats of structured_data.json streamed in chunks against the stats of the whole file,
+    at every smoothing threshold of threshold_list, in both layouts with the tactical lines on.
+    The synthetic players rarely sprint, so the quickness stats are also checked chunk by chunk
+    at the lower thresholds of PARITY_QUICKNESS_KWARGS
+    """
+    stat_col_list = list(player_stat_template) + list(player_quickness_template) + list(player_line_template)
+    for frame_rate_smoothing_threshold in threshold_list:
+        for layout in ["wide", "long"]:
+            run_kwargs = {"frame_rate_smoothing_threshold": frame_rate_smoothing_threshold, "layout": layout,
+                          "tactical_lines": True}
+            expected_df = run_match_stats(in_data_dir, match_metadata_list, **run_kwargs)
+            actual_df = run_match_stats(in_data_dir, match_metadata_list, chunk_size=PARITY_CHUNK_SIZE, **run_kwargs)
+            assert_frame_close(expected_df, actual_df, stat_col_list,
+                               f"chunked_vs_full ({layout}, threshold {frame_rate_smoothing_threshold})")
+
+    ## The synthetic players hardly leave their half in a short period, which a direction inferred chunk by chunk gets right
+    with tempfile.TemporaryDirectory() as out_data_dir:
+        drifting_match_metadata_list = write_drifting_match(in_data_dir, match_metadata_list[0], out_data_dir)
+        for layout in ["wide", "long"]:
+            expected_df = run_match_stats(out_data_dir, drifting_match_metadata_list, layout=layout, tactical_lines=True)
+            actual_df = run_match_stats(out_data_dir, drifting_match_metadata_list, layout=layout, tactical_lines=True,
+                                        chunk_size=PARITY_CHUNK_SIZE)
+            assert_frame_close(expected_df, actual_df, list(player_line_template), f"chunked_vs_full ({layout}, drifting match)")
+
+    for match_metadata in match_metadata_list:
+        match_player_stats_data_df, player_trackobj_list = summarise_sample_match(in_data_dir, match_metadata)
+        expected_df = summarise_quickness_wide(match_player_stats_data_df, player_trackobj_list, **PARITY_QUICKNESS_KWARGS)
+        quickness_carry = start_quickness_carry()
+        quickness_df_list = [summarise_quickness_wide(match_player_stats_data_df.iloc[chunk_start:chunk_start + PARITY_CHUNK_SIZE],
+                                                      player_trackobj_list, quickness_carry=quickness_carry,
+                                                      **PARITY_QUICKNESS_KWARGS)
+                             for chunk_start in range(0, len(match_player_stats_data_df), PARITY_CHUNK_SIZE)]
+        quickness_df_list.append(flush_quickness_carry(quickness_carry, **PARITY_QUICKNESS_KWARGS))
+        quickness_df = pd.concat(quickness_df_list, axis=0)
+        actual_df = aggregate_quickness(quickness_df, quickness_df.index).reindex(expected_df.index)
+        assert expected_df["num_sprints"].sum() > 0, "chunked_vs_full: no sprints to check the quickness with"
+        assert_frame_close(expected_df, actual_df, list(player_quickness_template),
+                           f"chunked_vs_full (quickness, match {match_metadata[-1]})")
+
+def check_cached_vs_uncached(in_data_dir: str,
+                             match_metadata_list: list):
+    """
+    The player stats of the runs with the explode cache against the runs without it:
+    when the cache is written (cold) and when it is read (warm), whole and in chunks.
+    The cache is always in the compact dtypes, so the stats without it are in the compact dtypes as well
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for chunk_size in [None, PARITY_CHUNK_SIZE]:
+            expected_df = run_match_stats(in_data_dir, match_metadata_list, chunk_size=chunk_size, compact_dtypes=True)
+            stat_col_list = [col for col in expected_df.columns if col not in ["team", "name", "player_id", "match_id"]]
+            for cache_state in ["cold", "warm"]:
+                actual_df = run_match_stats(in_data_dir, match_metadata_list, chunk_size=chunk_size, cache_dir=cache_dir)
+                assert_frame_close(expected_df, actual_df, stat_col_list,
+                                   f"cached_vs_uncached ({cache_state}, chunk_size {chunk_size})")
+            shutil.rmtree(cache_dir)
+            os.makedirs(cache_dir)
+
+def check_long_vs_wide(in_data_dir: str,
+                       match_metadata_list: list,
+                       threshold_list: list=PARITY_THRESHOLD_LIST):
+    """
+    The player stats of the long layout against the wide layout, whole and in chunks, at every
+    smoothing threshold of threshold_list, with the tactical line and pressure stats on
+    """
+    for frame_rate_smoothing_threshold in threshold_list:
+        for chunk_size in [None, PARITY_CHUNK_SIZE]:
+            run_kwargs = {"frame_rate_smoothing_threshold": frame_rate_smoothing_threshold, "chunk_size": chunk_size,
+                          "tactical_lines": True, "proximity": True}
+            expected_df = run_match_stats(in_data_dir, match_metadata_list, layout="wide", **run_kwargs)
+            actual_df = run_match_stats(in_data_dir, match_metadata_list, layout="long", **run_kwargs)
+            stat_col_list = [col for col in expected_df.columns if col not in ["team", "name", "player_id", "match_id"]]
+            assert sorted(stat_col_list) == sorted(col for col in actual_df.columns if col not in ["team", "name", "player_id", "match_id"]), \
+                "long_vs_wide: the stat columns differ"
+            assert_frame_close(expected_df, actual_df, stat_col_list,
+                               f"long_vs_wide (threshold {frame_rate_smoothing_threshold}, chunk_size {chunk_size})")
+
+def write_unpaired_player_match(in_data_dir: str,
+                                match_metadata: list,
+                                out_data_dir: str):
+    """
+    Copy a match into out_data_dir with a substitute added to a single isolated frame, so that the substitute has
+    {trackobj}_x but never moves between two frames and gets no {trackobj}_dist (e.g. a substitute at a chunk tail)
+
+    Returns:
+        Rows of matches.json of out_data_dir
+    """
+    match_info_dict, frame_list = read_sample_frames(in_data_dir, match_metadata)
+    substitute = [player for player in match_info_dict["players"] if player["start_time"] is None][0]
+    frame_idx = [idx for idx, frame in enumerate(frame_list) if frame["time"] is not None][len(frame_list) // 3]
+    frame_list[frame_idx]["data"].append({"track_id": 999998, "trackable_object": substitute["trackable_object"],
+                                          "x": 0.0, "y": 0.0})
+    return write_sample_frames(in_data_dir, match_metadata, out_data_dir, frame_list)
+
+def check_track_pyramid(in_data_dir: str,
+                        match_metadata_list: list):
+    """
+    query_player_stats of the track pyramid against summarise_player_stats on the frames of the same window,
+    for every sample match. A window that starts and ends on the bucket edges gives the same distance and time,
+    any other window stays within its query_error_bound
+    """
+    for match_metadata in match_metadata_list:
+        match_info_dict, match_explode_data_df = load_sample_match(in_data_dir, match_metadata)
+        match_player_stats_data_df = summarise_explode_data(match_explode_data_df)
+        home_player_trackobj_list, away_player_trackobj_list, _ = extract_home_away_player_trackobj(match_info_dict)
+        pyramid = build_track_pyramid(match_player_stats_data_df, match_info_dict)
+
+        ## (resolution, period, start_seconds, end_seconds). The windows are from a whole second of the period
+        ## so that the 2hz and 10hz ones line up with the buckets, except for the last two
+        window_list = [(resolution, None, None, None) for resolution in pyramid]
+        for period, period_start_seconds in match_player_stats_data_df.groupby("period")["time_seconds"].min().items():
+            period_start_seconds = np.ceil(period_start_seconds)
+            window_list += [("2hz", period, None, None),
+                            ("2hz", period, period_start_seconds + 5, period_start_seconds + 15),
+                            ("10hz", period, period_start_seconds + 5.3, period_start_seconds + 12.1),
+                            ("2hz", period, period_start_seconds + 5.25, period_start_seconds + 14.8),
+                            ("1min", period, period_start_seconds + 5, period_start_seconds + 25)]
+
+        for resolution, period, start_seconds, end_seconds in window_list:
+            label = f"track_pyramid (match {match_metadata[-1]}, {resolution}, period {period}, {start_seconds}-{end_seconds})"
+            window_flag = np.ones(len(match_player_stats_data_df), dtype=bool)
+            if period is not None:
+                window_flag &= (match_player_stats_data_df["period"] == period).to_numpy()
+            if start_seconds is not None:
+                window_flag &= (match_player_stats_data_df["time_seconds"] >= start_seconds - 1e-9).to_numpy()
+            if end_seconds is not None:
+                window_flag &= (match_player_stats_data_df["time_seconds"] < end_seconds - 1e-9).to_numpy()
+            expected_df = summarise_player_stats(match_player_stats_data_df[window_flag],
+                                                 home_player_trackobj_list, away_player_trackobj_list)
+            query_df, error_bound = query_player_stats(pyramid, resolution=resolution, period=period,
+                                                       start_seconds=start_seconds, end_seconds=end_seconds)
+            actual_df = query_df.set_index("trackable_object")
+
+            if error_bound["time_error_seconds"] == 0:
+                assert_frame_close(expected_df, actual_df.reindex(expected_df.index), ["dist", "time", "speed"], label)
+                continue
+            trackobj_index = expected_df.index.union(actual_df.index)
+            for col, max_error in [("dist", error_bound["dist_error_m"]), ("time", error_bound["time_error_seconds"])]:
+                error_arr = np.abs(expected_df[col].reindex(trackobj_index).fillna(0).to_numpy(dtype=float) -
+                                   actual_df[col].reindex(trackobj_index).fillna(0).to_numpy(dtype=float))
+                assert (error_arr <= max_error + PARITY_ATOL).all(), \
+                    f"{label}: {col} is off by {error_arr.max()}, more than the error bound of {max_error}"
+
+def check_trajectory_index(in_data_dir: str,
+                           match_metadata_list: list):
+    """
+    build_trajectory_index against a plain pandas filter of the exploded frames of every sample match,
+    in both the full and the compact dtypes: the offsets and entries of every player (and period),
+    the track_id runs and the bit-packed bitmap of the players in view
+    """
+    num_churned_players = 0
+    for match_metadata in match_metadata_list:
+        match_info_dict, match_explode_data_df = load_sample_match(in_data_dir, match_metadata)
+        for explode_df in [match_explode_data_df, compact_explode_data(match_explode_data_df)]:
+            trajectory_index = build_trajectory_index(explode_df, match_info_dict)
+            label = f"trajectory_index (match {match_metadata[-1]}, {explode_df['possession_homeaway'].dtype})"
+            present_df = explode_df[[f"{player_trackobj}_homeaway" for player_trackobj in trajectory_index["trackobj"]]].notna()
+            assert (present_flag(trajectory_index) == present_df.to_numpy()).all(), f"{label}: present_bitmap differs"
+            assert (np.diff(trajectory_index["offsets"]) == present_df.sum(axis=0).to_numpy()).all(), f"{label}: offsets differ"
+
+            for player_trackobj in trajectory_index["trackobj"].tolist():
+                player_df = explode_df.loc[present_df[f"{player_trackobj}_homeaway"].to_numpy()]
+                expected_df = pd.DataFrame({
+                    "row": player_df.index.to_numpy(),
+                    "frame": player_df["frame"].to_numpy(),
+                    "x": player_df[f"{player_trackobj}_x"].to_numpy(dtype=float),
+                    "y": player_df[f"{player_trackobj}_y"].to_numpy(dtype=float),
+                    "track_id": player_df[f"{player_trackobj}_track_id"].to_numpy(dtype=float, na_value=np.nan),
+                    "onball": (player_df["possession_player_trackobj"] == player_trackobj).to_numpy(),
+                })
+                pd.testing.assert_frame_equal(expected_df, player_trajectory(trajectory_index, player_trackobj),
+                                              check_dtype=False, obj=f"{label}: player {player_trackobj}")
+                for period in explode_df["period"].unique():
+                    period_row_arr = player_df.index[player_df["period"] == period].to_numpy()
+                    assert np.array_equal(period_row_arr, player_trajectory(trajectory_index, player_trackobj, period=period)["row"]), \
+                        f"{label}: rows of player {player_trackobj} in period {period} differ"
+
+                ## A run ends where the track_id changes from one visible frame to the next
+                run_id = (expected_df["track_id"] != expected_df["track_id"].shift()).cumsum()
+                expected_run_df = expected_df.groupby(run_id).agg(track_id=("track_id", "first"), start_row=("row", "first"),
+                                                                  end_row=("row", "last"), num_frames=("row", "size"))
+                pd.testing.assert_frame_equal(expected_run_df.reset_index(drop=True), player_track_runs(trajectory_index, player_trackobj),
+                                              check_dtype=False, obj=f"{label}: runs of player {player_trackobj}")
+                num_churned_players += len(expected_run_df) > 1
+    assert num_churned_players > 0, "trajectory_index: no player changes track_id to check the runs with"
+
+def check_unpaired_player(in_data_dir: str,
+                          match_metadata_list: list):
+    """
+    A player seen in a single frame (no distance) with the tactical line and pressure stats on,
+    in both layouts, whole and in chunks. The layouts are checked against each other
+    """
+    with tempfile.TemporaryDirectory() as out_data_dir:
+        unpaired_match_metadata_list = write_unpaired_player_match(in_data_dir, match_metadata_list[0], out_data_dir)
+        for chunk_size in [None, PARITY_CHUNK_SIZE]:
+            run_kwargs = {"chunk_size": chunk_size, "tactical_lines": True, "proximity": True}
+            expected_df = run_match_stats(out_data_dir, unpaired_match_metadata_list, layout="wide", **run_kwargs)
+            actual_df = run_match_stats(out_data_dir, unpaired_match_metadata_list, layout="long", **run_kwargs)
+            stat_col_list = [col for col in expected_df.columns if col not in ["team", "name", "player_id", "match_id"]]
+            assert_frame_close(expected_df, actual_df, stat_col_list, f"unpaired_player (chunk_size {chunk_size})")
+
+## Name of the check to the check function. Every function takes (in_data_dir, match_metadata_list)
+parity_check_template = {
+    "match_clock": check_match_clock,
+    "explode_batch": check_explode_batch,
+    "distance_kernels": check_distance_kernels,
+    "chunked_vs_full": check_chunked_vs_full,
+    "cached_vs_uncached": check_cached_vs_uncached,
+    "long_vs_wide": check_long_vs_wide,
+    "unpaired_player": check_unpaired_player,
+    "track_pyramid": check_track_pyramid,
+    "trajectory_index": check_trajectory_index,
+}
+
+def run_parity_checks(check_list: list=None,
+                      data_dir: str=None,
+                      num_matches: int=1,
+                      period_minutes: float=0.5,
+                      seed: int=0):
+    """
+    Run the parity checks on a synthetic season. The matches are short by default,
+    as the original row-by-row functions are slow
+
+    Input:
+        check_list: Keys of parity_check_template to run. None runs all of them
+        data_dir: Directory to write the synthetic matches to. None writes them to a temporary directory
+        num_matches: Number of synthetic matches
+        period_minutes: Length of each period of the synthetic matches in minutes
+        seed: Seed of the synthetic matches
+
+    Returns:
+        List of the checks that were run. An AssertionError is raised by the first check that fails
+    """
+    check_list = list(parity_check_template) if check_list is None else check_list
+    with contextlib.ExitStack() as stack:
+        if data_dir is None:
+            data_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        match_metadata_list = write_synthetic_season(data_dir, num_matches=num_matches, seed=seed,
+                                                     period_minutes=period_minutes)
+        match_metadata_list = [list(match_metadata.values()) for match_metadata in match_metadata_list]
+        for check in check_list:
+            print(f"Checking {check}")
+            parity_check_template[check](data_dir, match_metadata_list)
+    return check_list
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the faster paths of the pipeline against the original ones on synthetic matches")
+    parser.add_argument("--check", nargs="+", default=None, choices=list(parity_check_template))
+    parser.add_argument("--data-dir", default=None, help="Directory to keep the synthetic matches in between runs")
+    parser.add_argument("--num-matches", type=int, default=1)
+    parser.add_argument("--period-minutes", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    check_list = run_parity_checks(check_list=args.check, data_dir=args.data_dir, num_matches=args.num_matches,
+                                   period_minutes=args.period_minutes, seed=args.seed)
+    print(f"All {len(check_list)} parity checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,645 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for the per-match pipeline used in the analysis for SkillCorner dataset found in the repo
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.cache import (clear_explode_cache,
+                                    compact_explode_data,
+                                    iter_explode_cache, read_explode_cache,
+                                    source_fingerprint,
+                                    write_explode_cache_meta,
+                                    write_explode_cache_part)
+from blue_crow_sports.utils import (aggregate_player_stats,
+                                    explode_data_batch,
+                                    extract_home_away_player_trackobj,
+                                    get_team_name,
+                                    player_stat_template,
+                                    summarise_distance_time_vectorised)
+from blue_crow_sports.long_format import (summarise_distance_time_long,
+                                          summarise_long_stats,
+                                          summarise_match_long,
+                                          wide_to_long)
+from blue_crow_sports.clock import parse_match_clock
+from blue_crow_sports.profiling import (clear_profile_dir, profile_iter,
+                                        profile_stage, profiled,
+                                        profile_state, set_profile_match,
+                                        start_profiling, stop_profiling)
+from blue_crow_sports.proximity import aggregate_pressure, summarise_pressure_wide
+from blue_crow_sports.quickness import (aggregate_quickness,
+                                        flush_quickness_carry,
+                                        start_quickness_carry,
+                                        summarise_quickness_wide)
+from blue_crow_sports.streaming import (iter_frame_chunks,
+                                        iter_overlapping_chunks)
+from blue_crow_sports.tactical import (aggregate_lines, attack_direction,
+                                       attack_x_sums_wide, summarise_lines_wide)
+
+@profiled("json_load")
+def read_structured_data(match_structured_data_json_path: str):
+    """
+    Load the whole structured_data.json of a match
+    """
+    return pd.read_json(match_structured_data_json_path)
+
+def prepare_structured_data(match_struc_data_df: pd.DataFrame):
+    """
+    Normalise the possession column, drop the frames without time and add the
+    time_seconds, data_length and player_trackobj_captured columns
+    """
+    with profile_stage("possession_normalisation", num_frames=len(match_struc_data_df)) as stage_record:
+        match_struc_data_df[["possession_player_trackobj", "possession_homeaway"]] = pd.json_normalize(match_struc_data_df["possession"])
+        match_struc_data_df.drop(["possession"], axis=1, inplace=True)
+        match_struc_data_df["possession_homeaway"] = match_struc_data_df["possession_homeaway"].apply(lambda x: x.replace(" ", "_") if x else x)
+        stage_record["df"] = match_struc_data_df
+
+    ## There are certain frames where the group is None. Drop those rows where time == None
+    match_struc_data_df = match_struc_data_df[~match_struc_data_df["time"].isna()]
+    match_struc_data_df = match_struc_data_df.reset_index(drop=True)
+
+    with profile_stage("mt_to_sec", num_frames=len(match_struc_data_df)):
+        match_struc_data_df["time_seconds"] = parse_match_clock(match_struc_data_df["time"])
+    match_struc_data_df["data_length"] = match_struc_data_df["data"].apply(lambda x: len(x))
+    match_struc_data_df["player_trackobj_captured"] = [[]] * len(match_struc_data_df)
+    return match_struc_data_df
+
+def explode_structured_data(match_struc_data_df: pd.DataFrame,
+                            match_info: dict,
+                            compact_dtypes: bool=False):
+    """
+    Run the raw structured data of a match (or a chunk of it) through the
+    preparation and explode stages
+
+    Input:
+        compact_dtypes: Whether to explode into the compact dtypes (see explode_data_batch)
+
+    Returns:
+        Output of explode_data_batch with num_player_captured and the columns sorted
+    """
+    match_struc_data_df = prepare_structured_data(match_struc_data_df)
+
+    ## Explode the data column into individual column for each player using the trackable object id
+    with profile_stage("explode_data", num_frames=len(match_struc_data_df)) as stage_record:
+        match_explode_data_df = explode_data_batch(df=match_struc_data_df,
+                                                   match_info=match_info,
+                                                   compact_dtypes=compact_dtypes)
+        stage_record["df"] = match_explode_data_df
+    if not compact_dtypes:
+        match_explode_data_df["num_player_captured"] = match_explode_data_df["player_trackobj_captured"].apply(lambda x: len(x))
+    match_explode_data_df = match_explode_data_df.reindex(
+        sorted(match_explode_data_df.columns), axis=1)
+
+    ## There are some duplicated rows in the data. We will remove those rows
+    # match_explode_data_df[match_explode_data_df["time"].duplicated()]
+    # match_explode_data_df[match_explode_data_df["time"] == "45:00.00"]
+    return match_explode_data_df
+
+@profiled("summarise_distance_time")
+def summarise_explode_data(match_explode_data_df: pd.DataFrame,
+                           frame_rate_smoothing_threshold: int=1,
+                           time_per_frame_rate: float=0.10):
+    """
+    Summarise the distance travelled by each player from frame to frame
+
+    Returns:
+        Output of summarise_distance_time_vectorised with the columns sorted
+    """
+    match_player_stats_data_df = summarise_distance_time_vectorised(
+        df=match_explode_data_df,
+        frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+        time_per_frame_rate=time_per_frame_rate)
+    match_player_stats_data_df = match_player_stats_data_df.reindex(
+        sorted(match_player_stats_data_df.columns), axis=1)
+    return match_player_stats_data_df
+
+def summarise_structured_data(match_struc_data_df: pd.DataFrame,
+                              match_info: dict,
+                              frame_rate_smoothing_threshold: int=1,
+                              time_per_frame_rate: float=0.10,
+                              compact_dtypes: bool=False):
+    """
+    Run the raw structured data of a match (or a chunk of it) through the
+    preparation, explode and distance stages
+
+    Returns:
+        Output of summarise_distance_time_vectorised with the columns sorted
+    """
+    match_explode_data_df = explode_structured_data(match_struc_data_df, match_info, compact_dtypes=compact_dtypes)
+    return summarise_explode_data(match_explode_data_df,
+                                  frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+                                  time_per_frame_rate=time_per_frame_rate)
+
+@profiled("player_aggregation")
+def summarise_player_stats(match_player_stats_data_df: pd.DataFrame,
+                           home_player_trackobj_list: list,
+                           away_player_trackobj_list: list,
+                           check_tally: bool=False):
+    """
+    Summarise the distance, time and speed of each player into the keys of player_stat_template.
+    The {trackobj}_dist / {trackobj}_time columns of all the players are stacked into
+    (frames x players) arrays, the onball and team possession flags are computed as boolean
+    masks and every stat is aggregated with a single groupby (see aggregate_player_stats)
+
+    Calculate:
+        1. Distance: Total, Onball, Offball
+        2. Distance when team in possession: Total, Onball, Offball
+        3. Distance when team NOT in possession: Total, Offball
+
+    Input:
+        match_player_stats_data_df: Output of summarise_distance_time
+        home_player_trackobj_list: Trackable objects of the home players
+        away_player_trackobj_list: Trackable objects of the away players
+        check_tally: Whether to check that the onball/offball and teampos/teamnopos splits add up to the totals
+
+    Returns:
+        DataFrame indexed by the player's trackable object with the player_stat_template stats and team
+    """
+    player_trackobj_list, team_pos_list = [], []
+    for team_pos, team_player_trackobj_list in zip(["home_team", "away_team"],
+                                                   [home_player_trackobj_list, away_player_trackobj_list]):
+        for player_trackobj in team_player_trackobj_list:
+            if f"{player_trackobj}_dist" in match_player_stats_data_df.columns:
+                player_trackobj_list.append(player_trackobj)
+                team_pos_list.append(team_pos)
+    player_trackobj_arr = np.array(player_trackobj_list)
+    team_pos_arr = np.array(team_pos_list, dtype=object)
+
+    dist_arr = match_player_stats_data_df[[f"{player_trackobj}_dist" for player_trackobj in player_trackobj_list]].to_numpy(dtype=float)
+    time_arr = match_player_stats_data_df[[f"{player_trackobj}_time" for player_trackobj in player_trackobj_list]].to_numpy(dtype=float)
+    home_away_arr = match_player_stats_data_df[[f"{player_trackobj}_homeaway" for player_trackobj in player_trackobj_list]].astype(object).to_numpy()
+
+    ## Filter for the frames where the player is in view
+    frame_idx, player_idx = np.nonzero(~np.isnan(dist_arr))
+
+    possession_player_trackobj = match_player_stats_data_df["possession_player_trackobj"].to_numpy(dtype=float, na_value=np.nan)
+    possession_homeaway = match_player_stats_data_df["possession_homeaway"].astype(object).to_numpy()
+    onball = possession_player_trackobj[frame_idx] == player_trackobj_arr[player_idx]
+    teampos = (possession_homeaway[frame_idx] == team_pos_arr[player_idx]) & \
+        (home_away_arr[frame_idx, player_idx] == team_pos_arr[player_idx])
+
+    stat_summary_df = aggregate_player_stats(pd.DataFrame({"trackable_object": player_trackobj_arr[player_idx]}),
+                                             dist=dist_arr[frame_idx, player_idx],
+                                             time=time_arr[frame_idx, player_idx],
+                                             onball=onball, teampos=teampos)
+    stat_summary_df.index.name = None
+    stat_summary_df["team"] = pd.Series(team_pos_list, index=player_trackobj_list)
+    if check_tally:
+        check_player_stats_tally(stat_summary_df)
+    return stat_summary_df
+
+def summarise_wide_stats(match_player_stats_data_df: pd.DataFrame,
+                         match_info: dict,
+                         home_player_trackobj_list: list,
+                         away_player_trackobj_list: list,
+                         time_per_frame_rate: float=0.10,
+                         tactical_lines: bool=False,
+                         proximity: bool=False,
+                         direction_series: pd.Series=None,
+                         quickness_carry: dict=None):
+    """
+    All the per-player stats of a match (or a chunk of it) from the output of summarise_distance_time:
+    the player_stat_template and player_quickness_template stats, the
+    player_line_template stats if tactical_lines and the player_pressure_template stats if proximity
+
+    Input:
+        direction_series: Attack direction of the whole match for the tactical lines of a chunk (see match_attack_direction)
+        quickness_carry: Tail of the chunks before for the quickness stats of a chunk (see quickness.summarise_quickness)
+
+    Returns:
+        Same as summarise_player_stats with the extra stats. With quickness_carry, the players that are only
+        in the tail of the chunk before have a row with the quickness stats alone
+    """
+    stat_summary_df = pd.concat([
+        summarise_player_stats(match_player_stats_data_df, home_player_trackobj_list, away_player_trackobj_list),
+        summarise_quickness_wide(match_player_stats_data_df, home_player_trackobj_list + away_player_trackobj_list,
+                                 time_per_frame_rate=time_per_frame_rate, quickness_carry=quickness_carry)], axis=1)
+    if tactical_lines:
+        stat_summary_df = stat_summary_df.join(summarise_lines_wide(match_player_stats_data_df, match_info,
+                                                                    direction_series=direction_series))
+    if proximity:
+        stat_summary_df = stat_summary_df.join(summarise_pressure_wide(match_player_stats_data_df, match_info))
+    return stat_summary_df
+
+def check_player_stats_tally(stat_summary_df: pd.DataFrame):
+    """
+    Counter check that the onball / offball and the team in possession / not in possession
+    splits of every player add up to the totals
+    """
+    for player_trackobj, player_stat in stat_summary_df.iterrows():
+        dist, time = player_stat["dist"], player_stat["time"]
+        dist_onball, dist_offball = player_stat["dist_onball"], player_stat["dist_offball"]
+        time_onball, time_offball = player_stat["time_onball"], player_stat["time_offball"]
+        assert abs(dist - dist_onball - dist_offball) <= 1, f"Distance for {player_trackobj} doesn't tally: {dist_onball} vs {dist_offball} vs {dist}"
+        assert abs(time - time_onball - time_offball) <= 1, f"Time for {player_trackobj} doesn't tally: {time_onball} vs {time_offball} vs {time}"
+
+        dist_teampos, time_teampos = player_stat["dist_teampos"], player_stat["time_teampos"]
+        dist_teampos_onball, dist_teampos_offball = player_stat["dist_teampos_onball"], player_stat["dist_teampos_offball"]
+        time_teampos_onball, time_teampos_offball = player_stat["time_teampos_onball"], player_stat["time_teampos_offball"]
+        dist_diff = abs(dist_teampos - dist_teampos_onball - dist_teampos_offball)
+        time_diff = abs(time_teampos - time_teampos_onball - time_teampos_offball)
+        assert dist_diff <= 1 , f"Distance in possession for {player_trackobj} doesn't tally: {dist_diff}. {dist_teampos_onball} vs {dist_teampos_offball} vs {dist_teampos}"
+        assert time_diff <= 1, f"Time in possession for {player_trackobj} doesn't tally: {time_diff}. {time_teampos_onball} vs {time_teampos_offball} vs {time_teampos}"
+
+        dist_teamnopos, time_teamnopos = player_stat["dist_teamnopos"], player_stat["time_teamnopos"]
+        assert  abs(dist - dist_teamnopos - dist_teampos) <= 1e-1, f"Distance when team not in posession is wrong. {player_trackobj}: {dist} {dist_teamnopos} + {dist_teampos}"
+        assert  abs(time - time_teamnopos - time_teampos) <= 1e-1, f"Time when team not in posession is wrong. {player_trackobj}: {time} {time_teamnopos} + {time_teampos}"
+
+def combine_player_stats(stat_summary_df_list: list):
+    """
+    Combine the player stats that were summarised over different parts of a match
+    by summing the distance and time, and recomputing the speed.
+    The quickness stats are combined with aggregate_quickness (the parts carry their tails into each other,
+    see quickness.summarise_quickness), the tactical line shares with aggregate_lines and the pressure stats
+    with aggregate_pressure
+    """
+    ## The empty parts (e.g. a chunk without players or an empty quickness flush) are left out,
+    ## as concatenating them is deprecated in pandas. One is kept if they are all empty
+    stat_summary_df = pd.concat([df for df in stat_summary_df_list if not df.empty] or stat_summary_df_list[:1], axis=0)
+    team_series = stat_summary_df["team"].groupby(level=0).first()
+    quickness_df = aggregate_quickness(stat_summary_df, stat_summary_df.index)
+    if "line_frames" in stat_summary_df.columns:
+        quickness_df = quickness_df.join(aggregate_lines(stat_summary_df, stat_summary_df.index))
+    if "proximity_frames" in stat_summary_df.columns:
+        quickness_df = quickness_df.join(aggregate_pressure(stat_summary_df, stat_summary_df.index))
+    stat_summary_df = stat_summary_df[list(player_stat_template)].groupby(level=0).sum()
+    for speed_col in [col for col in player_stat_template if col.startswith("speed")]:
+        suffix = speed_col[len("speed"):]
+        stat_summary_df[speed_col] = stat_summary_df[f"dist{suffix}"] / stat_summary_df[f"time{suffix}"]
+    stat_summary_df = stat_summary_df.join(quickness_df)
+    stat_summary_df["team"] = team_series
+    return stat_summary_df
+
+def iter_explode_data(match_data_json_path: str,
+                      match_structured_data_json_path: str,
+                      match_info: dict,
+                      match_id: int,
+                      cache_dir: str,
+                      chunk_size: int=None):
+    """
+    Get the exploded tracking data of a match from the cache in cache_dir, chunk_size frames at a time.
+    If the cache is missing or out of date, structured_data.json is streamed and exploded chunk by chunk,
+    and every chunk is compacted and written to the cache as it is yielded, so the memory is bounded
+    by the chunk and not the match. None for chunk_size reads and explodes the match in one chunk
+
+    Returns:
+        Generator of the compacted output of explode_structured_data, one chunk at a time
+    """
+    fingerprint = source_fingerprint([match_data_json_path, match_structured_data_json_path])
+    with profile_stage("cache_read"):
+        if chunk_size:
+            match_explode_data_iter = iter_explode_cache(cache_dir, match_id, fingerprint, chunk_size=chunk_size)
+        else:
+            match_explode_data_df = read_explode_cache(cache_dir, match_id, fingerprint)
+            match_explode_data_iter = None if match_explode_data_df is None else iter([match_explode_data_df])
+    if match_explode_data_iter is not None:
+        yield from match_explode_data_iter
+        return
+
+    if chunk_size:
+        match_struc_data_iter = (match_struc_data_df for match_struc_data_df, _ in profile_iter("json_load", iter_frame_chunks(
+            match_structured_data_json_path, chunk_size=chunk_size, overlap=0)))
+    else:
+        match_struc_data_iter = iter([read_structured_data(match_structured_data_json_path)])
+    clear_explode_cache(cache_dir, match_id)
+    num_parts = 0
+    for match_struc_data_df in match_struc_data_iter:
+        match_explode_data_df = compact_explode_data(explode_structured_data(match_struc_data_df, match_info, compact_dtypes=True))
+        with profile_stage("cache_write", num_frames=len(match_explode_data_df)):
+            write_explode_cache_part(match_explode_data_df, cache_dir, match_id, num_parts)
+        num_parts += 1
+        yield match_explode_data_df
+    ## Only marked as complete once every part is written, so a run that stops half way leaves no cache
+    write_explode_cache_meta(cache_dir, match_id, fingerprint, num_parts)
+
+def load_explode_data(match_data_json_path: str,
+                      match_structured_data_json_path: str,
+                      match_info: dict,
+                      match_id: int,
+                      cache_dir: str,
+                      chunk_size: int=None):
+    """
+    Get the exploded tracking data of a match from the cache in cache_dir in full (see iter_explode_data)
+
+    Returns:
+        Compacted output of explode_structured_data
+    """
+    explode_df_list = list(iter_explode_data(match_data_json_path, match_structured_data_json_path,
+                                             match_info, match_id, cache_dir, chunk_size=chunk_size))
+    if len(explode_df_list) == 1:
+        return explode_df_list[0]
+    match_explode_data_df = pd.concat(explode_df_list, axis=0, ignore_index=True)
+    return compact_explode_data(match_explode_data_df.reindex(sorted(match_explode_data_df.columns), axis=1))
+
+def summarise_explode_chunk(match_explode_data_df: pd.DataFrame,
+                            match_info: dict,
+                            home_player_trackobj_list: list,
+                            away_player_trackobj_list: list,
+                            frame_rate_smoothing_threshold: int=1,
+                            time_per_frame_rate: float=0.10,
+                            layout: str="wide",
+                            num_owned_frames: int=None,
+                            tactical_lines: bool=False,
+                            proximity: bool=False,
+                            direction_series: pd.Series=None,
+                            quickness_carry: dict=None):
+    """
+    All the per-player stats of the exploded tracking data of a match (or a chunk of it), in the wide or long layout
+
+    Input:
+        num_owned_frames: If set, only the first num_owned_frames frames are summarised (see streaming.iter_overlapping_chunks)
+        direction_series, quickness_carry: For a chunk of a match (see summarise_wide_stats)
+
+    Returns:
+        Output of summarise_wide_stats or long_format.summarise_long_stats
+    """
+    if layout == "long":
+        frames_df, tracks_df = wide_to_long(match_explode_data_df, match_info)
+        tracks_df = summarise_distance_time_long(
+            frames_df, tracks_df,
+            frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+            time_per_frame_rate=time_per_frame_rate)
+        if num_owned_frames is not None:
+            frames_df = frames_df.iloc[:num_owned_frames]
+            tracks_df = tracks_df[tracks_df["row_idx"] < num_owned_frames]
+        return summarise_long_stats(frames_df, tracks_df, match_info,
+                                    time_per_frame_rate=time_per_frame_rate,
+                                    tactical_lines=tactical_lines, proximity=proximity,
+                                    direction_series=direction_series, quickness_carry=quickness_carry)
+
+    match_player_stats_data_df = summarise_explode_data(
+        match_explode_data_df,
+        frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+        time_per_frame_rate=time_per_frame_rate)
+    if num_owned_frames is not None:
+        match_player_stats_data_df = match_player_stats_data_df[match_player_stats_data_df["index"] < num_owned_frames]
+    return summarise_wide_stats(match_player_stats_data_df, match_info,
+                                home_player_trackobj_list, away_player_trackobj_list,
+                                time_per_frame_rate=time_per_frame_rate,
+                                tactical_lines=tactical_lines, proximity=proximity,
+                                direction_series=direction_series, quickness_carry=quickness_carry)
+
+def match_attack_direction(match_explode_data_iter,
+                           match_info: dict):
+    """
+    Attack direction of both teams in every period of a match from all of its chunks (see tactical.attack_direction).
+    The direction of a period needs all of its frames, so this is a first pass over a match that is summarised
+    chunk by chunk, which keeps its tactical lines the same whatever the chunk size
+
+    Input:
+        match_explode_data_iter: Iterable of the exploded tracking data of the match, one chunk at a time
+
+    Returns:
+        Output of attack_direction
+    """
+    return attack_direction(pd.concat([attack_x_sums_wide(match_explode_data_df, match_info)
+                                       for match_explode_data_df in match_explode_data_iter], axis=0))
+
+def process_match(match_metadata: list,
+                  in_data_dir: str,
+                  frame_rate_smoothing_threshold: int=1,
+                  time_per_frame_rate: float=0.10,
+                  chunk_size: int=None,
+                  cache_dir: str=None,
+                  layout: str="wide",
+                  check_tally: bool=False,
+                  tactical_lines: bool=False,
+                  proximity: bool=False,
+                  compact_dtypes: bool=False,
+                  profile_dir: str=None,
+                  profile_cprofile: bool=False):
+    """
+    Process a single match from matches.json into the per-player stat summary
+
+    Input:
+        match_metadata: Row of matches.json (status, date_time, home_team, away_team, id)
+        in_data_dir: Directory of the SkillCorner open data (the one that has matches.json)
+        frame_rate_smoothing_threshold: Number of frames to smooth in the calculation
+        time_per_frame_rate: Number of seconds for each frame
+        chunk_size: If set, structured_data.json (or the cache) is streamed in chunks of this many frames
+            instead of being loaded in full, which keeps the memory flat for long matches. The stats are the
+            same as on the full match, but with tactical_lines the match is read twice (see match_attack_direction)
+        cache_dir: If set, the exploded tracking data is cached in this directory (see cache.py)
+            so that later runs skip the JSON parsing and the explode stage
+        layout: "wide" for one column per player and metric, or "long" for the
+            (period, frame, trackable_object) table of long_format.py
+        check_tally: Whether to check that the stat splits of every player add up to the totals
+        tactical_lines: Whether to add the share of time each player spent in each tactical line (see tactical.py)
+        proximity: Whether to add the distance, time and speed under pressure from an opponent (see proximity.py)
+        compact_dtypes: Whether to explode the tracking data into compact dtypes (float32 coordinates, Int32 track ids,
+            categorical home/away and no per-frame lists), which cuts the memory of a match several times.
+            The cache is always written in the compact dtypes
+        profile_dir: If set, every stage is profiled and recorded in this directory (see profiling.py)
+        profile_cprofile: Whether to also keep a cProfile dump of the slowest stage
+
+    Returns:
+        DataFrame with one row per player with the player_stat_template and player_quickness_template stats
+        (and player_line_template stats if tactical_lines, player_pressure_template stats if proximity),
+        team, name, player_id and match_id
+    """
+    assert layout in ["wide", "long"], f'{layout} not in ["wide", "long"]'
+    print(f"Processing {match_metadata}")
+    match_status, match_dt, home_team, away_team, match_id = match_metadata
+    home_team = home_team["short_name"]
+    away_team = away_team["short_name"]
+    if profile_dir and profile_state["profile_dir"] != profile_dir:
+        start_profiling(profile_dir, cprofile=profile_cprofile)
+    set_profile_match(match_id)
+
+    match_data_dir = os.path.join(in_data_dir, "matches", str(match_id))
+    match_data_json_path = os.path.join(match_data_dir, "match_data.json")
+    match_structured_data_json_path = os.path.join(match_data_dir, "structured_data.json")
+
+    with open(match_data_json_path, "r") as f:
+        match_info_dict = json.load(f)
+    home_player_trackobj_list, away_player_trackobj_list, player_mapping_list = extract_home_away_player_trackobj(match_info=match_info_dict)
+
+    if cache_dir and chunk_size:
+        explode_kwargs = {"match_data_json_path": match_data_json_path,
+                          "match_structured_data_json_path": match_structured_data_json_path,
+                          "match_info": match_info_dict,
+                          "match_id": match_id,
+                          "cache_dir": cache_dir,
+                          "chunk_size": chunk_size}
+        direction_series = None
+        if tactical_lines:
+            ## On a cold cache the first pass writes the cache, which the pass below then reads
+            direction_series = match_attack_direction(iter_explode_data(**explode_kwargs), match_info_dict)
+        ## Same overlap as the chunks streamed from structured_data.json below. The chunks are compacted
+        ## again as the frames of the next chunk may not have the same players
+        quickness_carry = start_quickness_carry()
+        stat_summary_df_list = []
+        for match_explode_data_df, num_owned_frames in iter_overlapping_chunks(
+            iter_explode_data(**explode_kwargs), overlap=frame_rate_smoothing_threshold):
+            match_explode_data_df = compact_explode_data(match_explode_data_df.reindex(
+                sorted(match_explode_data_df.columns), axis=1))
+            stat_summary_df_list.append(summarise_explode_chunk(
+                match_explode_data_df, match_info_dict, home_player_trackobj_list, away_player_trackobj_list,
+                frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+                time_per_frame_rate=time_per_frame_rate, layout=layout, num_owned_frames=num_owned_frames,
+                tactical_lines=tactical_lines, proximity=proximity,
+                direction_series=direction_series, quickness_carry=quickness_carry))
+        stat_summary_df_list.append(flush_quickness_carry(quickness_carry, time_per_frame_rate=time_per_frame_rate))
+        stat_summary_df = combine_player_stats(stat_summary_df_list)
+    elif cache_dir:
+        match_explode_data_df = load_explode_data(
+            match_data_json_path=match_data_json_path,
+            match_structured_data_json_path=match_structured_data_json_path,
+            match_info=match_info_dict,
+            match_id=match_id,
+            cache_dir=cache_dir)
+        stat_summary_df = summarise_explode_chunk(
+            match_explode_data_df, match_info_dict, home_player_trackobj_list, away_player_trackobj_list,
+            frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+            time_per_frame_rate=time_per_frame_rate, layout=layout,
+            tactical_lines=tactical_lines, proximity=proximity)
+    elif chunk_size:
+        direction_series = None
+        if tactical_lines:
+            ## A first pass over structured_data.json, which parses it twice
+            direction_series = match_attack_direction(
+                (explode_structured_data(match_struc_data_df, match_info_dict, compact_dtypes=compact_dtypes)
+                 for match_struc_data_df, _ in profile_iter("json_load", iter_frame_chunks(
+                     match_structured_data_json_path, chunk_size=chunk_size, overlap=0))),
+                match_info_dict)
+        ## Each chunk carries frame_rate_smoothing_threshold frames of the next chunk so that
+        ## the forward difference of its last frames is the same as on the full match
+        quickness_carry = start_quickness_carry()
+        stat_summary_df_list = []
+        for match_struc_data_df, num_owned_frames in profile_iter("json_load", iter_frame_chunks(
+            match_structured_data_json_path, chunk_size=chunk_size, overlap=frame_rate_smoothing_threshold)):
+            if layout == "long":
+                stat_summary_df_list.append(summarise_match_long(
+                    prepare_structured_data(match_struc_data_df),
+                    match_info=match_info_dict,
+                    frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+                    time_per_frame_rate=time_per_frame_rate,
+                    num_owned_frames=num_owned_frames,
+                    tactical_lines=tactical_lines, proximity=proximity,
+                    direction_series=direction_series, quickness_carry=quickness_carry))
+                continue
+            match_player_stats_data_df = summarise_structured_data(
+                match_struc_data_df=match_struc_data_df,
+                match_info=match_info_dict,
+                frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+                time_per_frame_rate=time_per_frame_rate,
+                compact_dtypes=compact_dtypes)
+            match_player_stats_data_df = match_player_stats_data_df[match_player_stats_data_df["index"] < num_owned_frames]
+            stat_summary_df_list.append(summarise_wide_stats(match_player_stats_data_df, match_info_dict,
+                                                             home_player_trackobj_list, away_player_trackobj_list,
+                                                             time_per_frame_rate=time_per_frame_rate,
+                                                             tactical_lines=tactical_lines, proximity=proximity,
+                                                             direction_series=direction_series,
+                                                             quickness_carry=quickness_carry))
+        stat_summary_df_list.append(flush_quickness_carry(quickness_carry, time_per_frame_rate=time_per_frame_rate))
+        stat_summary_df = combine_player_stats(stat_summary_df_list)
+    else:
+        match_struc_data_df = read_structured_data(match_structured_data_json_path)
+        if layout == "long":
+            stat_summary_df = summarise_match_long(
+                prepare_structured_data(match_struc_data_df),
+                match_info=match_info_dict,
+                frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+                time_per_frame_rate=time_per_frame_rate,
+                tactical_lines=tactical_lines, proximity=proximity)
+        else:
+            match_player_stats_data_df = summarise_structured_data(
+                match_struc_data_df=match_struc_data_df,
+                match_info=match_info_dict,
+                frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+                time_per_frame_rate=time_per_frame_rate,
+                compact_dtypes=compact_dtypes)
+            stat_summary_df = summarise_wide_stats(match_player_stats_data_df, match_info_dict,
+                                                   home_player_trackobj_list, away_player_trackobj_list,
+                                                   time_per_frame_rate=time_per_frame_rate,
+                                                   tactical_lines=tactical_lines, proximity=proximity)
+    if check_tally:
+        check_player_stats_tally(stat_summary_df)
+    stat_summary_df.sort_values(["speed"], ascending=False, inplace=True)
+
+    player_map_df = pd.DataFrame(player_mapping_list, columns=["track_id", "name", "player_id"])
+    player_map_df.set_index("track_id", inplace=True)
+    player_stats_summary_df = stat_summary_df.merge(player_map_df, left_index=True, right_index=True)
+
+    player_stats_summary_df["team"] = player_stats_summary_df["team"].apply(get_team_name, match_info=match_info_dict)
+    player_stats_summary_df["match_id"] = match_id
+    print(f"*" * 50)
+    return player_stats_summary_df
+
+def run_matches(match_metadata_list: list,
+                in_data_dir: str,
+                frame_rate_smoothing_threshold: int=1,
+                time_per_frame_rate: float=0.10,
+                num_workers: int=1,
+                chunk_size: int=None,
+                cache_dir: str=None,
+                layout: str="wide",
+                check_tally: bool=False,
+                tactical_lines: bool=False,
+                proximity: bool=False,
+                compact_dtypes: bool=False,
+                profile_dir: str=None,
+                profile_cprofile: bool=False):
+    """
+    Run process_match over a list of matches, spreading the matches across num_workers processes.
+    The results are merged in the same order as match_metadata_list regardless of which worker finishes first
+
+    Input:
+        match_metadata_list: Rows of matches.json
+        in_data_dir: Directory of the SkillCorner open data (the one that has matches.json)
+        frame_rate_smoothing_threshold: Number of frames to smooth in the calculation
+        time_per_frame_rate: Number of seconds for each frame
+        num_workers: Number of worker processes. 1 runs the matches in the current process
+        chunk_size: Number of frames per chunk when streaming structured_data.json. None loads it in full
+        cache_dir: Directory to cache the exploded tracking data in. None disables the cache
+        layout: "wide" or "long" tracking data layout (see process_match)
+        check_tally: Whether to check that the stat splits of every player add up to the totals
+        tactical_lines: Whether to add the tactical line stats (see process_match)
+        proximity: Whether to add the pressure stats (see process_match)
+        compact_dtypes: Whether to use the compact dtypes (see process_match)
+        profile_dir: If set, every stage is profiled and recorded in this directory (see profiling.py).
+            Records of a previous run in the directory are removed
+        profile_cprofile: Whether to also keep a cProfile dump of the slowest stage
+
+    Returns:
+        DataFrame of the player stat summary of all the matches
+    """
+    num_matches = len(match_metadata_list)
+    args = ([in_data_dir] * num_matches,
+            [frame_rate_smoothing_threshold] * num_matches,
+            [time_per_frame_rate] * num_matches,
+            [chunk_size] * num_matches,
+            [cache_dir] * num_matches,
+            [layout] * num_matches,
+            [check_tally] * num_matches,
+            [tactical_lines] * num_matches,
+            [proximity] * num_matches,
+            [compact_dtypes] * num_matches,
+            [profile_dir] * num_matches,
+            [profile_cprofile] * num_matches)
+    ## Profiling stays on after the run if it was already on for profile_dir (e.g. started by analysis.py)
+    stop_profiling_after = profile_dir is not None and profile_state["profile_dir"] != profile_dir
+    if profile_dir:
+        start_profiling(profile_dir, cprofile=profile_cprofile)
+        clear_profile_dir(profile_dir)
+
+    if num_workers is None or num_workers > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            player_stats_summary_df_list = list(executor.map(process_match, match_metadata_list, *args))
+    else:
+        player_stats_summary_df_list = list(map(process_match, match_metadata_list, *args))
+    if stop_profiling_after:
+        stop_profiling()
+
+    ## A single concat, as concatenating match by match copies the rows of the earlier matches every time
+    if not player_stats_summary_df_list:
+        return pd.DataFrame()
+    return pd.concat(player_stats_summary_df_list, axis=0).reset_index(drop=True)
@@ -0,0 +1,225 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for the stage-level profiling of the analysis pipeline for the SkillCorner dataset found in the repo.
+Every stage records its wall time, frames/sec, peak RSS and the rows/columns of its output
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import cProfile
+import functools
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    ## resource is not available on Windows, the peak RSS is not recorded there
+    resource = None
+
+## Profiling state of the current process. profile_dir is None while profiling is off
+profile_state = {
+    "profile_dir": None,
+    "cprofile": False,
+    "match_id": None,
+    "hottest_wall_time_s": 0.0,
+    "in_stage": False,
+}
+
+def start_profiling(profile_dir: str,
+                    cprofile: bool=False):
+    """
+    Turn on the stage profiling for the current process. The stage records are
+    appended to {profile_dir}/stages-{pid}.jsonl so that worker processes can record as well
+
+    Input:
+        profile_dir: Directory to write the stage records and the report to
+        cprofile: Whether to run every stage under cProfile and keep the dump of the slowest one
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+    profile_state["profile_dir"] = profile_dir
+    profile_state["cprofile"] = cprofile
+    profile_state["hottest_wall_time_s"] = 0.0
+
+def clear_profile_dir(profile_dir: str):
+    """
+    Remove the stage records, cProfile dumps and report of a previous run from profile_dir
+    """
+    for path in glob.glob(os.path.join(profile_dir, "stages-*.jsonl")) + \
+        glob.glob(os.path.join(profile_dir, "*.prof")) + \
+        glob.glob(os.path.join(profile_dir, "stage_report.*")):
+        os.remove(path)
+
+def stop_profiling():
+    """
+    Turn off the stage profiling for the current process
+    """
+    profile_state["profile_dir"] = None
+    profile_state["match_id"] = None
+
+def set_profile_match(match_id):
+    """
+    Set the match that the following stages belong to
+    """
+    profile_state["match_id"] = match_id
+
+def peak_rss_mb():
+    """
+    Peak resident set size of the current process in MB
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    ## ru_maxrss is in bytes on macOS and in KB on Linux
+    return peak_rss / (1 << 20) if sys.platform == "darwin" else peak_rss / (1 << 10)
+
+@contextmanager
+def profile_stage(stage: str,
+                  num_frames: int=None):
+    """
+    Record a stage of the pipeline. Does nothing if profiling is off.
+    The yielded dictionary can be updated inside the stage:
+        1. "df": Output DataFrame of the stage, to record its rows and columns
+        2. "num_frames": Number of frames the stage processed, if not known upfront
+        3. "skip": True to not record this run of the stage at all (e.g. the end of an iterator in profile_iter)
+
+    Example:
+        with profile_stage("explode_data", num_frames=len(df)) as stage_record:
+            explode_df = explode_data_batch(df, match_info)
+            stage_record["df"] = explode_df
+    """
+    stage_record = {"num_frames": num_frames}
+    profile_dir = profile_state["profile_dir"]
+    if profile_dir is None:
+        yield stage_record
+        return
+
+    ## Nested stages are timed but only the outermost one is run under cProfile
+    profiler = None
+    if profile_state["cprofile"] and not profile_state["in_stage"]:
+        profiler = cProfile.Profile()
+    in_stage = profile_state["in_stage"]
+    profile_state["in_stage"] = True
+
+    start_time = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield stage_record
+    finally:
+        if profiler:
+            profiler.disable()
+        wall_time_s = time.perf_counter() - start_time
+        profile_state["in_stage"] = in_stage
+        skip = stage_record.pop("skip", False)
+
+        output_df = stage_record.pop("df", None)
+        num_frames = stage_record.get("num_frames")
+        stage_record = {
+            "pid": os.getpid(),
+            "match_id": profile_state["match_id"],
+            "stage": stage,
+            "wall_time_s": wall_time_s,
+            "num_frames": num_frames,
+            "frames_per_s": num_frames / wall_time_s if num_frames and wall_time_s > 0 else None,
+            "peak_rss_mb": peak_rss_mb(),
+            "num_rows": output_df.shape[0] if output_df is not None else None,
+            "num_cols": output_df.shape[1] if output_df is not None and output_df.ndim == 2 else None,
+            "cprofile": False,
+        }
+        if profiler and not skip and wall_time_s > profile_state["hottest_wall_time_s"]:
+            profile_state["hottest_wall_time_s"] = wall_time_s
+            profiler.dump_stats(os.path.join(profile_dir, f"cprofile-{os.getpid()}.prof"))
+            stage_record["cprofile"] = True
+
+        if not skip:
+            with open(os.path.join(profile_dir, f"stages-{os.getpid()}.jsonl"), "a") as f:
+                f.write(json.dumps(stage_record, default=str) + "\n")
+
+def profiled(stage: str):
+    """
+    Decorator to record every call of a function as a stage. The number of frames is taken
+    from the first argument and the rows/columns from the output, if they are DataFrames
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_stage(stage) as stage_record:
+                output = func(*args, **kwargs)
+                input_df = args[0] if args else next(iter(kwargs.values()), None)
+                if isinstance(input_df, pd.DataFrame):
+                    stage_record["num_frames"] = len(input_df)
+                output_df = output[-1] if isinstance(output, tuple) else output
+                if isinstance(output_df, pd.DataFrame):
+                    stage_record["df"] = output_df
+            return output
+        return wrapper
+    return decorator
+
+def profile_iter(stage: str,
+                 iterable):
+    """
+    Record every step of an iterator (e.g. reading the next chunk of a file) as a stage.
+    If the items are DataFrames, or tuples that start with a DataFrame, their rows and columns are recorded.
+    The last call that finds the iterator exhausted is not recorded
+    """
+    iterator = iter(iterable)
+    end = object()
+    while True:
+        with profile_stage(stage) as stage_record:
+            item = next(iterator, end)
+            if item is end:
+                stage_record["skip"] = True
+            item_df = item[0] if isinstance(item, tuple) else item
+            if isinstance(item_df, pd.DataFrame):
+                stage_record["df"] = item_df
+                stage_record["num_frames"] = len(item_df)
+        if item is end:
+            return
+        yield item
+
+def write_profile_report(profile_dir: str):
+    """
+    Merge the stage records of all the processes into:
+        1. stage_report.csv: One row per stage run
+        2. stage_report.json: The stage runs and a summary per stage
+        3. hottest_stage.prof: cProfile dump of the slowest stage run, if it was profiled with cProfile
+
+    Returns:
+        DataFrame of the stage runs
+    """
+    record_list = []
+    for jsonl_path in sorted(glob.glob(os.path.join(profile_dir, "stages-*.jsonl"))):
+        with open(jsonl_path, "r") as f:
+            record_list.extend(json.loads(line) for line in f if line.strip())
+    stage_report_df = pd.DataFrame(record_list)
+    if stage_report_df.empty:
+        return stage_report_df
+
+    summary_df = stage_report_df.groupby("stage", sort=False).agg(
+        num_runs=("wall_time_s", "count"),
+        wall_time_s=("wall_time_s", "sum"),
+        num_frames=("num_frames", "sum"),
+        peak_rss_mb=("peak_rss_mb", "max"))
+    summary_df["frames_per_s"] = summary_df["num_frames"] / summary_df["wall_time_s"]
+    summary_df = summary_df.sort_values("wall_time_s", ascending=False).reset_index()
+
+    stage_report_df.to_csv(os.path.join(profile_dir, "stage_report.csv"), index=False)
+    with open(os.path.join(profile_dir, "stage_report.json"), "w") as f:
+        json.dump({"stages": json.loads(stage_report_df.to_json(orient="records")),
+                   "summary": json.loads(summary_df.to_json(orient="records"))}, f, indent=2)
+
+    cprofile_df = stage_report_df[stage_report_df["cprofile"]]
+    if not cprofile_df.empty:
+        hottest_record = cprofile_df.loc[cprofile_df["wall_time_s"].idxmax()]
+        shutil.copyfile(os.path.join(profile_dir, f"cprofile-{hottest_record['pid']}.prof"),
+                        os.path.join(profile_dir, "hottest_stage.prof"))
+    return stage_report_df
@@ -0,0 +1,229 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for the per-frame proximity metrics of the players in the SkillCorner dataset found in the repo
+(nearest opponent, nearest teammate and number of opponents within a radius), and for splitting the distance and
+time of the players by whether they were under pressure
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.profiling import profiled
+from blue_crow_sports.utils import (long_player_slots,
+                                    player_pressure_template,
+                                    stack_long_player_col, stack_player_cols,
+                                    wide_player_in_view, wide_player_trackobj)
+
+## A player is under pressure when an opponent is within PRESSURE_RADIUS metres
+PRESSURE_RADIUS = 3.0
+## Memory budget of the pairwise distances of a chunk of frames. The kernel holds up to
+## PROXIMITY_NUM_TEMPORARIES (chunk_size x players x players) float64 arrays at once
+## (dx, dy, squared distance, opponent and teammate distances), so with the default budget
+## a chunk is ~3700 frames of 30 players
+PROXIMITY_CHUNK_BYTES = 128 * 1024 ** 2
+PROXIMITY_NUM_TEMPORARIES = 5
+
+def proximity_chunk_size(num_players: int,
+                         chunk_bytes: int=PROXIMITY_CHUNK_BYTES):
+    """
+    Number of frames of pairwise distances that fit in chunk_bytes
+    """
+    return max(1, chunk_bytes // (PROXIMITY_NUM_TEMPORARIES * np.dtype(float).itemsize * max(num_players, 1) ** 2))
+
+@profiled("proximity")
+def pairwise_proximity(x_arr: np.ndarray,
+                       y_arr: np.ndarray,
+                       team_list: list,
+                       radius: float=PRESSURE_RADIUS,
+                       chunk_size: int=None):
+    """
+    Proximity metrics of every player in every frame from the pairwise distance matrices of the frames.
+    The frames are processed chunk_size at a time, so the memory is bounded by the chunk and not the match.
+    With at most ~30 objects per frame, the full distance matrix of a frame is cheaper than a spatial index
+
+    Input:
+        x_arr, y_arr: (frames x players) coordinates, NaN when the player is not in view
+        team_list: home_team / away_team of the columns of x_arr
+        radius: Distance in metres within which an opponent counts towards the pressure
+        chunk_size: Number of frames to compute the distance matrices of at a time. None sizes the chunks
+            to PROXIMITY_CHUNK_BYTES (see proximity_chunk_size)
+
+    Returns:
+        Dictionary of (frames x players) arrays, NaN / 0 where the player or every other player in question is not in view:
+            1. nearest_opponent: Distance to the nearest opponent
+            2. nearest_opponent_slot: Column of the nearest opponent, -1 if none
+            3. nearest_teammate: Distance to the nearest teammate
+            4. pressure_count: Number of opponents within radius (int8)
+            5. in_view: Whether the player is in view
+    """
+    num_frames, num_players = x_arr.shape
+    team_arr = np.array(team_list, dtype=object)
+    opponent_flag = team_arr[:, None] != team_arr[None, :]
+    teammate_flag = ~opponent_flag & ~np.eye(num_players, dtype=bool)
+
+    proximity_dict = {
+        "nearest_opponent": np.full((num_frames, num_players), np.nan),
+        "nearest_opponent_slot": np.full((num_frames, num_players), -1, dtype=np.int16),
+        "nearest_teammate": np.full((num_frames, num_players), np.nan),
+        "pressure_count": np.zeros((num_frames, num_players), dtype=np.int8),
+        "in_view": ~np.isnan(x_arr) & ~np.isnan(y_arr),
+    }
+    if not num_players:
+        return proximity_dict
+
+    chunk_size = chunk_size or proximity_chunk_size(num_players)
+    for start in range(0, num_frames, chunk_size):
+        end = min(start + chunk_size, num_frames)
+        ## (frames x players x players) squared distances, inf where either player is not in view.
+        ## The square root is only taken of the nearest ones
+        dx_arr = x_arr[start:end, :, None] - x_arr[start:end, None, :]
+        dy_arr = y_arr[start:end, :, None] - y_arr[start:end, None, :]
+        sq_dist_arr = dx_arr * dx_arr + dy_arr * dy_arr
+        sq_dist_arr[np.isnan(sq_dist_arr)] = np.inf
+
+        opponent_sq_dist_arr = np.where(opponent_flag, sq_dist_arr, np.inf)
+        nearest_slot_arr = opponent_sq_dist_arr.argmin(axis=2)
+        nearest_sq_dist_arr = np.take_along_axis(opponent_sq_dist_arr, nearest_slot_arr[:, :, None], axis=2)[:, :, 0]
+        found_flag = np.isfinite(nearest_sq_dist_arr)
+        proximity_dict["nearest_opponent"][start:end] = np.where(found_flag, np.sqrt(nearest_sq_dist_arr), np.nan)
+        proximity_dict["nearest_opponent_slot"][start:end] = np.where(found_flag, nearest_slot_arr, -1)
+
+        teammate_sq_dist_arr = np.where(teammate_flag, sq_dist_arr, np.inf).min(axis=2)
+        proximity_dict["nearest_teammate"][start:end] = np.where(np.isfinite(teammate_sq_dist_arr), np.sqrt(teammate_sq_dist_arr), np.nan)
+        proximity_dict["pressure_count"][start:end] = (opponent_sq_dist_arr <= radius * radius).sum(axis=2)
+    return proximity_dict
+
+def proximity_wide(match_explode_data_df: pd.DataFrame,
+                   match_info: dict,
+                   **proximity_kwargs):
+    """
+    pairwise_proximity on the exploded tracking data (wide layout). A player is in view in a frame
+    if its {trackobj}_homeaway is set
+
+    Returns:
+        trackobj_list, team_list and the output of pairwise_proximity
+    """
+    trackobj_list, team_list = wide_player_trackobj(match_explode_data_df, match_info)
+    in_view_arr = wide_player_in_view(match_explode_data_df, trackobj_list)
+    x_arr = stack_player_cols(match_explode_data_df, trackobj_list, "x")
+    y_arr = stack_player_cols(match_explode_data_df, trackobj_list, "y")
+    proximity_dict = pairwise_proximity(np.where(in_view_arr, x_arr, np.nan), np.where(in_view_arr, y_arr, np.nan),
+                                        team_list, **proximity_kwargs)
+    return trackobj_list, team_list, proximity_dict
+
+def proximity_long(frames_df: pd.DataFrame,
+                   tracks_df: pd.DataFrame,
+                   **proximity_kwargs):
+    """
+    pairwise_proximity on the long-format tracking data of a match (see long_format.py)
+
+    Returns:
+        Same as proximity_wide, the rows of the arrays being the rows of frames_df
+    """
+    player_tracks_df, trackobj_list, team_list, row_arr, slot_arr = long_player_slots(tracks_df)
+    x_arr = stack_long_player_col(player_tracks_df, "x", len(frames_df), row_arr, slot_arr, len(trackobj_list))
+    y_arr = stack_long_player_col(player_tracks_df, "y", len(frames_df), row_arr, slot_arr, len(trackobj_list))
+    return trackobj_list, team_list, pairwise_proximity(x_arr, y_arr, team_list, **proximity_kwargs)
+
+def summarise_pressure(proximity_dict: dict,
+                       trackobj_list: list,
+                       dist_arr: np.ndarray,
+                       time_arr: np.ndarray,
+                       onball_arr: np.ndarray):
+    """
+    Summarise the proximity metrics into the keys of player_pressure_template:
+    the distance, time and speed of each player split by whether an opponent was within the pressure radius,
+    and the average number of opponents within the radius
+
+    Input:
+        proximity_dict: Output of pairwise_proximity
+        trackobj_list: Trackable objects of the columns of the arrays
+        dist_arr, time_arr: (frames x players) frame to frame distance and time, NaN when not calculated
+        onball_arr: (frames x players) whether the player is on the ball
+
+    Returns:
+        DataFrame indexed by the player's trackable object with the player_pressure_template stats
+    """
+    pressed_arr = proximity_dict["pressure_count"] > 0
+    moved_arr = ~np.isnan(dist_arr)
+    dist_arr = np.where(moved_arr, dist_arr, 0)
+    time_arr = np.where(moved_arr, time_arr, 0)
+
+    pressure_col_dict = {}
+    for suffix, split_arr in [("_pressed", pressed_arr),
+                              ("_pressed_onball", pressed_arr & onball_arr),
+                              ("_notpressed", ~pressed_arr)]:
+        pressure_col_dict[f"dist{suffix}"] = np.where(split_arr, dist_arr, 0).sum(axis=0)
+        pressure_col_dict[f"time{suffix}"] = np.where(split_arr, time_arr, 0).sum(axis=0)
+        with np.errstate(all="ignore"):
+            pressure_col_dict[f"speed{suffix}"] = pressure_col_dict[f"dist{suffix}"] / pressure_col_dict[f"time{suffix}"]
+
+    in_view_arr = proximity_dict["in_view"]
+    pressure_col_dict["proximity_frames"] = in_view_arr.sum(axis=0)
+    pressure_col_dict["pressed_frames"] = (pressed_arr & in_view_arr).sum(axis=0)
+    with np.errstate(all="ignore"):
+        pressure_col_dict["pressure_count_mean"] = np.where(in_view_arr, proximity_dict["pressure_count"], 0).sum(axis=0) / \
+            pressure_col_dict["proximity_frames"]
+    return pd.DataFrame(pressure_col_dict, index=pd.Index(trackobj_list))[list(player_pressure_template)]
+
+def summarise_pressure_wide(match_player_stats_data_df: pd.DataFrame,
+                            match_info: dict,
+                            **proximity_kwargs):
+    """
+    summarise_pressure on the output of summarise_distance_time (wide layout).
+    The players in view without a single distance (no {trackobj}_dist column) get no distance or time
+    """
+    trackobj_list, _, proximity_dict = proximity_wide(match_player_stats_data_df, match_info, **proximity_kwargs)
+    dist_arr = stack_player_cols(match_player_stats_data_df, trackobj_list, "dist")
+    time_arr = stack_player_cols(match_player_stats_data_df, trackobj_list, "time")
+    possession_player_trackobj = match_player_stats_data_df["possession_player_trackobj"].to_numpy(dtype=float, na_value=np.nan)
+    onball_arr = possession_player_trackobj[:, None] == np.array(trackobj_list, dtype=float)[None, :]
+    return summarise_pressure(proximity_dict, trackobj_list, dist_arr, time_arr, onball_arr)
+
+def summarise_pressure_long(frames_df: pd.DataFrame,
+                            tracks_df: pd.DataFrame,
+                            **proximity_kwargs):
+    """
+    summarise_pressure on the output of long_format.summarise_distance_time_long (single match)
+    """
+    trackobj_list, _, proximity_dict = proximity_long(frames_df, tracks_df, **proximity_kwargs)
+    player_tracks_df, _, _, row_arr, slot_arr = long_player_slots(tracks_df)
+    dist_arr = stack_long_player_col(player_tracks_df, "dist", len(frames_df), row_arr, slot_arr, len(trackobj_list))
+    time_arr = stack_long_player_col(player_tracks_df, "time", len(frames_df), row_arr, slot_arr, len(trackobj_list))
+    possession_player_trackobj = frames_df["possession_player_trackobj"].to_numpy(dtype=float, na_value=np.nan)
+    onball_arr = possession_player_trackobj[:, None] == np.array(trackobj_list, dtype=float)[None, :]
+    return summarise_pressure(proximity_dict, trackobj_list, dist_arr, time_arr, onball_arr)
+
+def aggregate_pressure(stat_df: pd.DataFrame,
+                       group_by):
+    """
+    Combine the pressure stats of several rows per player (parts of a match, or matches of a season):
+    the distances, times and frame counts are summed, the speeds are recalculated from them
+    and pressure_count_mean is weighted by proximity_frames
+
+    Input:
+        stat_df: DataFrame with the player_pressure_template columns
+        group_by: List of the columns of stat_df to group by, or anything else DataFrame.groupby takes
+
+    Returns:
+        DataFrame indexed by the group keys with the player_pressure_template stats
+    """
+    sum_df = pd.DataFrame(index=stat_df.index)
+    for col in player_pressure_template:
+        if col.startswith(("dist", "time")) or col.endswith("_frames"):
+            sum_df[col] = stat_df[col]
+    sum_df["pressure_count_sum"] = stat_df["pressure_count_mean"].fillna(0) * stat_df["proximity_frames"]
+    if isinstance(group_by, list):
+        group_by = [stat_df[col] for col in group_by]
+    sum_df = sum_df.groupby(group_by).sum()
+
+    with np.errstate(all="ignore"):
+        for col in player_pressure_template:
+            if col.startswith("speed"):
+                suffix = col[len("speed"):]
+                sum_df[col] = sum_df[f"dist{suffix}"] / sum_df[f"time{suffix}"]
+        sum_df["pressure_count_mean"] = sum_df["pressure_count_sum"] / sum_df["proximity_frames"]
+    return sum_df[list(player_pressure_template)]
@@ -0,0 +1,328 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for the multi-resolution track pyramid of the matches in the SkillCorner dataset found in the repo.
+The tracks of a match are aggregated once into time buckets at several resolutions (every frame, 2 Hz and every minute),
+so that coarse questions (distance per half, average position per 5 minutes, possession share) are answered from
+a few thousand rows instead of the full 10 Hz frames
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.cache import source_fingerprint
+from blue_crow_sports.pipeline import (explode_structured_data,
+                                       load_explode_data, read_structured_data,
+                                       summarise_explode_data)
+from blue_crow_sports.utils import (stack_player_cols, wide_player_in_view,
+                                    wide_player_trackobj)
+
+## Bump this whenever the contents of the pyramid change so that the old files are not used
+PYRAMID_VERSION = 1
+## Resolution name to the length of its time buckets in seconds
+pyramid_level_template = {
+    "10hz": 0.1,
+    "2hz": 0.5,
+    "1min": 60.0,
+}
+## Top speed used for the distance error bound of the queries whose window is not aligned to the buckets
+MAX_PLAYER_SPEED = 12.0
+
+def time_bucket(time_seconds: np.ndarray,
+                bucket_seconds: float):
+    """
+    Bucket of every frame. The division is rounded first so that e.g. 0.3 / 0.1 lands in bucket 3 and not 2
+    """
+    return np.floor(np.round(np.asarray(time_seconds, dtype=float) / bucket_seconds, 6)).astype(np.int64)
+
+def build_track_pyramid(match_player_stats_data_df: pd.DataFrame,
+                        match_info: dict,
+                        level_dict: dict=pyramid_level_template):
+    """
+    Aggregate the tracks of a match into time buckets at every resolution of level_dict.
+    The distances and times are sums of the per-frame ones, so they add up exactly at any resolution,
+    and the positions are means with the number of frames they are over, so they can be combined exactly too
+
+    Input:
+        match_player_stats_data_df: Output of summarise_distance_time (wide layout) of a whole match
+        match_info: Match information loaded from match_data.json
+        level_dict: Resolution name to bucket length in seconds
+
+    Returns:
+        Dictionary of resolution name to:
+            1. bucket_seconds: Length of the buckets
+            2. players: DataFrame with one row per (period, bucket, trackable_object) the player was in view or moved in:
+               start_seconds, team, num_frames (in view), x_mean, y_mean, dist, time, onball_frames, teampos_frames
+            3. frames: DataFrame with one row per (period, bucket): start_seconds, num_frames and the number of frames
+               each team had the ball (possession_home_team_frames, possession_away_team_frames)
+    """
+    trackobj_list, team_list = wide_player_trackobj(match_player_stats_data_df, match_info)
+    trackobj_arr = np.array(trackobj_list, dtype=np.int64)
+    team_arr = np.array(team_list, dtype=object)
+    num_players = len(trackobj_list)
+
+    x_arr = stack_player_cols(match_player_stats_data_df, trackobj_list, "x")
+    y_arr = stack_player_cols(match_player_stats_data_df, trackobj_list, "y")
+    in_view_arr = wide_player_in_view(match_player_stats_data_df, trackobj_list) & ~np.isnan(x_arr) & ~np.isnan(y_arr)
+    dist_arr = np.nan_to_num(stack_player_cols(match_player_stats_data_df, trackobj_list, "dist"))
+    time_arr = np.nan_to_num(stack_player_cols(match_player_stats_data_df, trackobj_list, "time"))
+    possession_player_trackobj = match_player_stats_data_df["possession_player_trackobj"].to_numpy(dtype=float, na_value=np.nan)
+    possession_homeaway = match_player_stats_data_df["possession_homeaway"].astype(object).to_numpy()
+    onball_arr = in_view_arr & (possession_player_trackobj[:, None] == trackobj_arr[None, :])
+    teampos_arr = in_view_arr & (possession_homeaway[:, None] == team_arr[None, :])
+    period_arr = match_player_stats_data_df["period"].to_numpy(dtype=np.int64)
+    time_seconds_arr = match_player_stats_data_df["time_seconds"].to_numpy(dtype=float)
+
+    pyramid = {}
+    for resolution, bucket_seconds in level_dict.items():
+        bucket_arr = time_bucket(time_seconds_arr, bucket_seconds)
+        key_arr, group_arr = np.unique(np.stack([period_arr, bucket_arr], axis=1), axis=0, return_inverse=True)
+        group_arr = group_arr.ravel()
+        num_groups = len(key_arr)
+
+        frames_df = pd.DataFrame({
+            "period": key_arr[:, 0],
+            "bucket": key_arr[:, 1],
+            "start_seconds": key_arr[:, 1] * bucket_seconds,
+            "num_frames": np.bincount(group_arr, minlength=num_groups),
+        })
+        for team_pos in ["home_team", "away_team"]:
+            frames_df[f"possession_{team_pos}_frames"] = np.bincount(group_arr, weights=possession_homeaway == team_pos,
+                                                                     minlength=num_groups).astype(np.int64)
+
+        ## Sum every (frames x players) array into (groups x players) in one bincount
+        flat_group_arr = (group_arr[:, None] * num_players + np.arange(num_players)[None, :]).ravel()
+
+        def bucket_sum(value_arr):
+            return np.bincount(flat_group_arr, weights=value_arr.ravel(), minlength=num_groups * num_players)
+
+        num_frames_arr = bucket_sum(in_view_arr)
+        dist_sum_arr = bucket_sum(dist_arr)
+        keep_flag = (num_frames_arr > 0) | (dist_sum_arr > 0)
+        with np.errstate(all="ignore"):
+            players_df = pd.DataFrame({
+                "period": np.repeat(key_arr[:, 0], num_players),
+                "bucket": np.repeat(key_arr[:, 1], num_players),
+                "start_seconds": np.repeat(key_arr[:, 1] * bucket_seconds, num_players),
+                "trackable_object": np.tile(trackobj_arr, num_groups),
+                "team": np.tile(team_arr, num_groups),
+                "num_frames": num_frames_arr.astype(np.int64),
+                "x_mean": bucket_sum(np.where(in_view_arr, x_arr, 0)) / num_frames_arr,
+                "y_mean": bucket_sum(np.where(in_view_arr, y_arr, 0)) / num_frames_arr,
+                "dist": dist_sum_arr,
+                "time": bucket_sum(time_arr),
+                "onball_frames": bucket_sum(onball_arr).astype(np.int64),
+                "teampos_frames": bucket_sum(teampos_arr).astype(np.int64),
+            })[keep_flag].reset_index(drop=True)
+        pyramid[resolution] = {"bucket_seconds": bucket_seconds, "players": players_df, "frames": frames_df}
+    return pyramid
+
+def window_buckets(level: dict,
+                   table: str,
+                   period: int=None,
+                   start_seconds: float=None,
+                   end_seconds: float=None):
+    """
+    Rows of a level table in the query window. A bucket is in the window if it starts in [start_seconds, end_seconds)
+
+    Returns:
+        (rows of the table, the number of seconds the buckets cover outside of or miss inside the window)
+    """
+    bucket_seconds = level["bucket_seconds"]
+    df = level[table]
+    if period is not None:
+        df = df[df["period"] == period]
+    edge_seconds = 0.0
+    ## Distance to the nearest bucket edge, as e.g. 5.3 / 0.1 is 52.99999 and not 53
+    if start_seconds is not None:
+        df = df[df["start_seconds"] >= start_seconds - 1e-9]
+        edge_seconds += bucket_seconds if abs(start_seconds / bucket_seconds - round(start_seconds / bucket_seconds)) > 1e-6 else 0.0
+    if end_seconds is not None:
+        df = df[df["start_seconds"] < end_seconds - 1e-9]
+        edge_seconds += bucket_seconds if abs(end_seconds / bucket_seconds - round(end_seconds / bucket_seconds)) > 1e-6 else 0.0
+    return df, edge_seconds
+
+def query_error_bound(level: dict,
+                      edge_seconds: float):
+    """
+    Error bounds of a query answered from a level, compared to the same query on the full 10 Hz frames.
+    The bucket sums are exact, so the only error comes from a window that does not start and end on bucket edges:
+        1. time_error_seconds: Most seconds of play per player that are counted outside of (or missed inside) the window
+        2. dist_error_m: Most metres per player that can be off, at MAX_PLAYER_SPEED
+        3. frame_error: Most frames per player that can be off
+    """
+    return {
+        "bucket_seconds": level["bucket_seconds"],
+        "time_error_seconds": edge_seconds,
+        "dist_error_m": edge_seconds * MAX_PLAYER_SPEED,
+        "frame_error": int(round(edge_seconds / pyramid_level_template["10hz"])),
+    }
+
+def query_player_stats(pyramid: dict,
+                       resolution: str="1min",
+                       period: int=None,
+                       start_seconds: float=None,
+                       end_seconds: float=None,
+                       block_seconds: float=None):
+    """
+    Distance, time, speed, average position and possession share of every player over a window,
+    answered from one resolution of the pyramid
+
+    Input:
+        pyramid: Output of build_track_pyramid or read_track_pyramid
+        resolution: Key of the pyramid to answer from. The coarser, the faster but the larger the error bound
+        period: Only this period if set
+        start_seconds, end_seconds: Match clock window in seconds, the whole match (or period) if None
+        block_seconds: If set, the stats are split into blocks of this many seconds of the match clock
+            (e.g. 300 for every 5 minutes). Must be a multiple of the bucket length
+
+    Returns:
+        (DataFrame with one row per player (and period and block if block_seconds), output of query_error_bound)
+    """
+    level = pyramid[resolution]
+    players_df, edge_seconds = window_buckets(level, "players", period=period,
+                                              start_seconds=start_seconds, end_seconds=end_seconds)
+    group_col_list = ["trackable_object", "team"]
+    if block_seconds is not None:
+        if abs(block_seconds / level["bucket_seconds"] - round(block_seconds / level["bucket_seconds"])) > 1e-6:
+            raise ValueError(f"block_seconds ({block_seconds}) is not a multiple of the {resolution} buckets ({level['bucket_seconds']})")
+        players_df = players_df.assign(block_start_seconds=time_bucket(players_df["start_seconds"], block_seconds) * block_seconds)
+        group_col_list = ["period", "block_start_seconds"] + group_col_list
+
+    sum_df = players_df.assign(x_sum=players_df["x_mean"].fillna(0) * players_df["num_frames"],
+                               y_sum=players_df["y_mean"].fillna(0) * players_df["num_frames"])
+    sum_df = sum_df.groupby(group_col_list, sort=True, observed=True)[
+        ["num_frames", "x_sum", "y_sum", "dist", "time", "onball_frames", "teampos_frames"]].sum()
+    with np.errstate(all="ignore"):
+        sum_df["speed"] = sum_df["dist"] / sum_df["time"]
+        sum_df["x_mean"] = sum_df["x_sum"] / sum_df["num_frames"]
+        sum_df["y_mean"] = sum_df["y_sum"] / sum_df["num_frames"]
+        sum_df["onball_share"] = sum_df["onball_frames"] / sum_df["num_frames"]
+        sum_df["teampos_share"] = sum_df["teampos_frames"] / sum_df["num_frames"]
+    sum_df = sum_df.drop(columns=["x_sum", "y_sum"]).reset_index()
+    return sum_df, query_error_bound(level, edge_seconds)
+
+def query_possession_share(pyramid: dict,
+                           resolution: str="1min",
+                           period: int=None,
+                           start_seconds: float=None,
+                           end_seconds: float=None):
+    """
+    Share of the frames each team had the ball over a window (the rest of the frames nobody had it)
+
+    Returns:
+        (Dictionary with num_frames and the share of each team, output of query_error_bound)
+    """
+    level = pyramid[resolution]
+    frames_df, edge_seconds = window_buckets(level, "frames", period=period,
+                                             start_seconds=start_seconds, end_seconds=end_seconds)
+    num_frames = int(frames_df["num_frames"].sum())
+    share_dict = {"num_frames": num_frames}
+    for team_pos in ["home_team", "away_team"]:
+        share_dict[team_pos] = frames_df[f"possession_{team_pos}_frames"].sum() / num_frames if num_frames else np.nan
+    return share_dict, query_error_bound(level, edge_seconds)
+
+def pyramid_paths(pyramid_dir: str,
+                  match_id: int):
+    """
+    Directory of the Parquet files of a match's pyramid and its metadata file
+    """
+    return (os.path.join(pyramid_dir, str(match_id)),
+            os.path.join(pyramid_dir, f"{match_id}.json"))
+
+def write_track_pyramid(pyramid: dict,
+                        pyramid_dir: str,
+                        match_id: int,
+                        fingerprint: dict):
+    """
+    Write the pyramid of a match as one Parquet file per resolution and table
+    """
+    match_pyramid_dir, meta_path = pyramid_paths(pyramid_dir, match_id)
+    os.makedirs(match_pyramid_dir, exist_ok=True)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    for resolution, level in pyramid.items():
+        for table in ["players", "frames"]:
+            level[table].to_parquet(os.path.join(match_pyramid_dir, f"{resolution}-{table}.parquet"), index=False)
+    ## The metadata is written last so that a crash never leaves a half written pyramid that looks complete
+    with open(meta_path, "w") as f:
+        json.dump({"version": PYRAMID_VERSION, "sources": fingerprint,
+                   "levels": {resolution: level["bucket_seconds"] for resolution, level in pyramid.items()}}, f)
+
+def read_track_pyramid(pyramid_dir: str,
+                       match_id: int,
+                       fingerprint: dict=None,
+                       resolution_list: list=None):
+    """
+    Read the pyramid of a match
+
+    Input:
+        fingerprint: If set, the pyramid is only used if it was built from the same source files
+        resolution_list: Resolutions to read, all of them if None
+
+    Returns:
+        The pyramid, or None if there is none for the match or it is out of date
+    """
+    match_pyramid_dir, meta_path = pyramid_paths(pyramid_dir, match_id)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r") as f:
+        meta_dict = json.load(f)
+    if meta_dict.get("version") != PYRAMID_VERSION or (fingerprint is not None and meta_dict.get("sources") != fingerprint):
+        return None
+
+    pyramid = {}
+    for resolution, bucket_seconds in meta_dict["levels"].items():
+        if resolution_list is not None and resolution not in resolution_list:
+            continue
+        pyramid[resolution] = {"bucket_seconds": bucket_seconds}
+        for table in ["players", "frames"]:
+            pyramid[resolution][table] = pd.read_parquet(os.path.join(match_pyramid_dir, f"{resolution}-{table}.parquet"))
+    return pyramid
+
+def load_match_pyramid(match_id: int,
+                       in_data_dir: str,
+                       pyramid_dir: str,
+                       cache_dir: str=None,
+                       frame_rate_smoothing_threshold: int=1,
+                       time_per_frame_rate: float=0.10,
+                       resolution_list: list=None):
+    """
+    Get the pyramid of a match from pyramid_dir. If it is missing or out of date, it is built from the
+    exploded tracking data (from the cache in cache_dir if set) and written to pyramid_dir
+
+    Returns:
+        The pyramid (only the resolutions in resolution_list if set)
+    """
+    match_data_dir = os.path.join(in_data_dir, "matches", str(match_id))
+    match_data_json_path = os.path.join(match_data_dir, "match_data.json")
+    match_structured_data_json_path = os.path.join(match_data_dir, "structured_data.json")
+    ## The settings are part of the fingerprint as they change the distances
+    fingerprint = {"sources": source_fingerprint([match_data_json_path, match_structured_data_json_path]),
+                   "frame_rate_smoothing_threshold": frame_rate_smoothing_threshold,
+                   "time_per_frame_rate": time_per_frame_rate}
+    pyramid = read_track_pyramid(pyramid_dir, match_id, fingerprint=fingerprint, resolution_list=resolution_list)
+    if pyramid is not None:
+        return pyramid
+
+    with open(match_data_json_path, "r") as f:
+        match_info_dict = json.load(f)
+    if cache_dir:
+        match_explode_data_df = load_explode_data(match_data_json_path, match_structured_data_json_path,
+                                                  match_info_dict, match_id, cache_dir)
+    else:
+        match_explode_data_df = explode_structured_data(read_structured_data(match_structured_data_json_path),
+                                                        match_info_dict, compact_dtypes=True)
+    match_player_stats_data_df = summarise_explode_data(match_explode_data_df,
+                                                        frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+                                                        time_per_frame_rate=time_per_frame_rate)
+    pyramid = build_track_pyramid(match_player_stats_data_df, match_info_dict)
+    write_track_pyramid(pyramid, pyramid_dir, match_id, fingerprint)
+    if resolution_list is not None:
+        pyramid = {resolution: level for resolution, level in pyramid.items() if resolution in resolution_list}
+    return pyramid
@@ -0,0 +1,368 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for the per-frame speed and acceleration of the players in the SkillCorner dataset found in the repo,
+and for the peak quickness stats built from them (rolling peak speeds, sprints, accelerations and time to top speed)
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.clock import build_clock_index, same_segment_flag
+from blue_crow_sports.profiling import profiled
+from blue_crow_sports.utils import player_quickness_template
+
+## Windows (in seconds) of the rolling peak speeds
+WINDOW_SECONDS_LIST = [1, 3, 5]
+## A sprint is at least MIN_SPRINT_SECONDS at or above SPRINT_SPEED (m/s, about 25 km/h)
+SPRINT_SPEED = 7.0
+MIN_SPRINT_SECONDS = 1.0
+## An acceleration is at least MIN_ACCEL_SECONDS at or above ACCEL_THRESHOLD (m/s^2)
+ACCEL_THRESHOLD = 3.0
+MIN_ACCEL_SECONDS = 0.5
+
+def speed_accel_series(dist_arr: np.ndarray,
+                       clock_index: dict,
+                       time_per_frame_rate: float=0.10):
+    """
+    Per-frame speed and acceleration of the players from the distance of summarise_distance_time
+
+    Input:
+        dist_arr: (frames x players) array of the {trackobj}_dist columns, NaN where not calculated
+        clock_index: Output of clock.build_clock_index for the same frames
+        time_per_frame_rate: Number of seconds for each frame
+
+    Returns:
+        speed_arr: (frames x players) speed in m/s
+        accel_arr: (frames x players) change in speed from the frame before in m/s^2. NaN if either frame
+            has no speed or there is a gap in the clock between them
+    """
+    speed_arr = dist_arr / time_per_frame_rate
+    accel_arr = np.full(speed_arr.shape, np.nan)
+    step_flag = same_segment_flag(clock_index, 1)
+    accel_arr[1:] = np.where(step_flag[:-1, None], (speed_arr[1:] - speed_arr[:-1]) / time_per_frame_rate, np.nan)
+    return speed_arr, accel_arr
+
+def detect_runs(flag_arr: np.ndarray,
+                clock_index: dict,
+                min_frames: int=1):
+    """
+    Find the runs of consecutive frames where flag_arr is True for every player.
+    A run is broken by a gap in the clock
+
+    Returns:
+        slot, start_row, end_row (last row of the run) arrays of the runs of at least min_frames frames
+    """
+    step_flag = same_segment_flag(clock_index, 1)
+    continue_flag = flag_arr[:-1] & flag_arr[1:] & step_flag[:-1, None]
+    start_flag = flag_arr.copy()
+    start_flag[1:] &= ~continue_flag
+    end_flag = flag_arr.copy()
+    end_flag[:-1] &= ~continue_flag
+
+    ## Transposed so that the runs come out player by player, which pairs up every start with its end
+    start_slot, start_row = np.nonzero(start_flag.T)
+    _, end_row = np.nonzero(end_flag.T)
+    keep_flag = end_row - start_row + 1 >= min_frames
+    return start_slot[keep_flag], start_row[keep_flag], end_row[keep_flag]
+
+def rolling_peak_speed(speed_arr: np.ndarray,
+                       clock_index: dict,
+                       window_frames: int):
+    """
+    Best average speed over window_frames consecutive frames of every player.
+    Only windows where the speed is known in every frame and the clock has no gap are used
+
+    Returns:
+        Array with one entry per player, NaN if the player has no such window
+    """
+    num_frames = len(speed_arr)
+    if window_frames > num_frames:
+        return np.full(speed_arr.shape[1], np.nan)
+    valid_arr = ~np.isnan(speed_arr)
+    speed_cumsum_arr = np.zeros((num_frames + 1, speed_arr.shape[1]))
+    speed_cumsum_arr[1:] = np.cumsum(np.where(valid_arr, speed_arr, 0), axis=0)
+    valid_cumsum_arr = np.zeros((num_frames + 1, speed_arr.shape[1]), dtype=np.int64)
+    valid_cumsum_arr[1:] = np.cumsum(valid_arr, axis=0)
+
+    num_windows = num_frames - window_frames + 1
+    window_mean_arr = (speed_cumsum_arr[window_frames:] - speed_cumsum_arr[:num_windows]) / window_frames
+    window_flag = (valid_cumsum_arr[window_frames:] - valid_cumsum_arr[:num_windows] == window_frames) & \
+        same_segment_flag(clock_index, window_frames - 1)[:num_windows, None]
+    peak_arr = np.where(window_flag, window_mean_arr, -np.inf).max(axis=0)
+    return np.where(np.isinf(peak_arr), np.nan, peak_arr)
+
+def accel_start_rows(accel_arr: np.ndarray):
+    """
+    Latest frame up to each frame where the speed did not go up, i.e. the start of the acceleration
+    that each frame is part of (accel_arr is NaN across clock gaps)
+
+    Returns:
+        (frames x players) array of rows
+    """
+    return np.maximum.accumulate(np.where(accel_arr > 0, -1, np.arange(len(accel_arr))[:, None]), axis=0)
+
+def open_run_start(flag_arr: np.ndarray,
+                   clock_index: dict):
+    """
+    First frame of the run of flag_arr that is still going on at the last frame, for every player
+
+    Returns:
+        Array with one entry per player, the number of frames if the player has no such run
+    """
+    num_frames = len(flag_arr)
+    slot_arr, start_row_arr, end_row_arr = detect_runs(flag_arr, clock_index)
+    open_flag = end_row_arr == num_frames - 1
+    open_start_arr = np.full(flag_arr.shape[1], num_frames)
+    open_start_arr[slot_arr[open_flag]] = start_row_arr[open_flag]
+    return open_start_arr
+
+def start_quickness_carry():
+    """
+    State that carries the tail of every chunk of a match into the next one (see summarise_quickness):
+        1. tail_df: period, time_seconds and one distance column per player of the frames carried over
+        2. last_chunk: Whether the runs still going on at the last frame are over (set by flush_quickness_carry)
+    """
+    return {"tail_df": None, "last_chunk": False}
+
+def carry_quickness_frames(quickness_carry: dict,
+                           period_time_df: pd.DataFrame,
+                           dist_arr: np.ndarray,
+                           player_trackobj_list: list):
+    """
+    Put the tail of the chunk before (quickness_carry["tail_df"]) in front of the frames of a chunk
+
+    Returns:
+        DataFrame with period, time_seconds and one distance column per player, and the number of frames carried over
+    """
+    frame_df = pd.concat([period_time_df[["period", "time_seconds"]].reset_index(drop=True),
+                          pd.DataFrame(dist_arr, columns=player_trackobj_list)], axis=1)
+    if quickness_carry["tail_df"] is None:
+        return frame_df, 0
+    return pd.concat([quickness_carry["tail_df"], frame_df], axis=0, ignore_index=True), len(quickness_carry["tail_df"])
+
+def quickness_tail_start(speed_arr: np.ndarray,
+                         accel_arr: np.ndarray,
+                         clock_index: dict,
+                         window_frames: int,
+                         sprint_speed: float=SPRINT_SPEED,
+                         accel_threshold: float=ACCEL_THRESHOLD):
+    """
+    First frame of a chunk that has to be carried into the next chunk so that the stats of the frames
+    around the cut are the same as on the whole match: the last window_frames - 1 frames for the rolling
+    windows (at least one for the acceleration), the sprints and accelerations that are still going on
+    with the frame before them, and the accelerations still going on, as the time to top speed
+    of a sprint is counted from their start
+
+    Returns:
+        Row of the first frame to carry over
+    """
+    num_frames = len(speed_arr)
+    accel_start_arr = accel_start_rows(accel_arr)
+    sprint_start_arr = open_run_start(speed_arr >= sprint_speed, clock_index)
+    accel_run_start_arr = open_run_start(accel_arr >= accel_threshold, clock_index)
+    open_sprint_slot_arr = np.flatnonzero(sprint_start_arr < num_frames)
+    tail_start = min([num_frames - max(window_frames - 1, 1),
+                      accel_start_arr[-1].min(initial=num_frames),
+                      accel_start_arr[sprint_start_arr[open_sprint_slot_arr], open_sprint_slot_arr].min(initial=num_frames),
+                      sprint_start_arr.min(initial=num_frames) - 1,
+                      accel_run_start_arr.min(initial=num_frames) - 1])
+    return max(tail_start, 0)
+
+def detect_sprints(speed_arr: np.ndarray,
+                   accel_arr: np.ndarray,
+                   clock_index: dict,
+                   time_per_frame_rate: float=0.10,
+                   sprint_speed: float=SPRINT_SPEED,
+                   min_sprint_seconds: float=MIN_SPRINT_SECONDS):
+    """
+    Find the sprints of every player and the time it took to reach the top speed of each of them.
+    The top speed of a sprint is its highest speed and the time to top speed is counted from the start
+    of the acceleration that led into it (the last frame before the top speed where the speed did not go up)
+
+    Returns:
+        DataFrame with one row per sprint: slot, start_row, end_row, peak_row, peak_speed and time_to_top_speed
+    """
+    min_frames = max(int(round(min_sprint_seconds / time_per_frame_rate)), 1)
+    slot_arr, start_row_arr, end_row_arr = detect_runs(speed_arr >= sprint_speed, clock_index, min_frames=min_frames)
+    if not len(slot_arr):
+        return pd.DataFrame({"slot": slot_arr, "start_row": start_row_arr, "end_row": end_row_arr,
+                             "peak_row": end_row_arr, "peak_speed": np.zeros(0), "time_to_top_speed": np.zeros(0)})
+
+    ## Lay the frames of all the sprints end to end to find the first frame of the top speed of each of them
+    num_frames = len(speed_arr)
+    length_arr = end_row_arr - start_row_arr + 1
+    sprint_id_arr = np.repeat(np.arange(len(slot_arr)), length_arr)
+    sprint_offset_arr = np.cumsum(length_arr) - length_arr
+    row_arr = start_row_arr[sprint_id_arr] + np.arange(length_arr.sum()) - sprint_offset_arr[sprint_id_arr]
+    sprint_speed_arr = speed_arr.T.ravel()[slot_arr[sprint_id_arr] * num_frames + row_arr]
+    peak_speed_arr = np.maximum.reduceat(sprint_speed_arr, sprint_offset_arr)
+    peak_pos_arr = np.flatnonzero(sprint_speed_arr == peak_speed_arr[sprint_id_arr])
+    peak_pos_arr = peak_pos_arr[np.r_[True, sprint_id_arr[peak_pos_arr][1:] != sprint_id_arr[peak_pos_arr][:-1]]]
+    peak_row_arr = row_arr[peak_pos_arr]
+
+    accel_start_arr = accel_start_rows(accel_arr)
+    time_to_top_speed_arr = (peak_row_arr - accel_start_arr[peak_row_arr, slot_arr]) * time_per_frame_rate
+
+    sprint_df = pd.DataFrame({"slot": slot_arr, "start_row": start_row_arr, "end_row": end_row_arr,
+                              "peak_row": peak_row_arr, "peak_speed": peak_speed_arr,
+                              "time_to_top_speed": time_to_top_speed_arr})
+    return sprint_df
+
+@profiled("quickness")
+def summarise_quickness(period_time_df: pd.DataFrame,
+                        dist_arr: np.ndarray,
+                        player_trackobj_list: list,
+                        time_per_frame_rate: float=0.10,
+                        window_seconds_list: list=WINDOW_SECONDS_LIST,
+                        sprint_speed: float=SPRINT_SPEED,
+                        min_sprint_seconds: float=MIN_SPRINT_SECONDS,
+                        accel_threshold: float=ACCEL_THRESHOLD,
+                        min_accel_seconds: float=MIN_ACCEL_SECONDS,
+                        quickness_carry: dict=None):
+    """
+    Summarise the peak quickness of every player into the keys of player_quickness_template
+
+    Calculate:
+        1. peak_speed: Highest speed in a single frame
+        2. peak_speed_{w}s: Best average speed over w seconds, for w in window_seconds_list
+        3. peak_accel: Highest acceleration
+        4. num_sprints: Number of sprints (see detect_sprints)
+        5. num_accels: Number of accelerations of at least min_accel_seconds at or above accel_threshold
+        6. time_to_top_speed: Average time to reach the top speed of a sprint. NaN if the player did not sprint
+
+    Input:
+        period_time_df: DataFrame with the period and time_seconds of every frame, in frame order
+        dist_arr: (frames x players) array of the {trackobj}_dist columns
+        player_trackobj_list: Trackable objects of the columns of dist_arr
+        time_per_frame_rate: Number of seconds for each frame
+        quickness_carry: If set, the frames are a chunk of a match (see start_quickness_carry). The tail of the
+            chunk before is put in front of them and a sprint or acceleration is only counted in the chunk it ends in,
+            so that the stats combined with aggregate_quickness are the same as on the whole match.
+            flush_quickness_carry has to be called after the last chunk
+
+    Returns:
+        DataFrame indexed by the player's trackable object with the quickness stats
+    """
+    num_carried_frames, last_chunk = 0, True
+    if quickness_carry is not None:
+        frame_df, num_carried_frames = carry_quickness_frames(quickness_carry, period_time_df, dist_arr, player_trackobj_list)
+        period_time_df = frame_df[["period", "time_seconds"]]
+        player_trackobj_list = frame_df.columns[2:].tolist()
+        dist_arr = frame_df[player_trackobj_list].to_numpy(dtype=float)
+        last_chunk = quickness_carry["last_chunk"]
+
+    clock_index = build_clock_index(period_time_df, time_per_frame_rate=time_per_frame_rate)
+    speed_arr, accel_arr = speed_accel_series(dist_arr, clock_index, time_per_frame_rate=time_per_frame_rate)
+    num_frames, num_players = len(speed_arr), len(player_trackobj_list)
+
+    def counted_flag(end_row_arr):
+        ## The runs that ended in the chunk before were counted there, the runs still going on are counted in the next chunk
+        return (end_row_arr >= num_carried_frames - 1) & ((end_row_arr < num_frames - 1) | last_chunk)
+
+    quickness_col_dict = {}
+    quickness_col_dict["peak_speed"] = np.where(np.isnan(speed_arr).all(axis=0), np.nan,
+                                                np.where(np.isnan(speed_arr), -np.inf, speed_arr).max(axis=0, initial=-np.inf))
+    window_frames_list = [max(int(round(window_seconds / time_per_frame_rate)), 1) for window_seconds in window_seconds_list]
+    for window_seconds, window_frames in zip(window_seconds_list, window_frames_list):
+        quickness_col_dict[f"peak_speed_{window_seconds}s"] = rolling_peak_speed(speed_arr, clock_index, window_frames)
+    quickness_col_dict["peak_accel"] = np.where(np.isnan(accel_arr).all(axis=0), np.nan,
+                                                np.where(np.isnan(accel_arr), -np.inf, accel_arr).max(axis=0, initial=-np.inf))
+
+    sprint_df = detect_sprints(speed_arr, accel_arr, clock_index, time_per_frame_rate=time_per_frame_rate,
+                               sprint_speed=sprint_speed, min_sprint_seconds=min_sprint_seconds)
+    sprint_df = sprint_df[counted_flag(sprint_df["end_row"].to_numpy())]
+    num_sprints_arr = np.bincount(sprint_df["slot"], minlength=num_players)
+    quickness_col_dict["num_sprints"] = num_sprints_arr
+    min_accel_frames = max(int(round(min_accel_seconds / time_per_frame_rate)), 1)
+    accel_slot_arr, _, accel_end_row_arr = detect_runs(accel_arr >= accel_threshold, clock_index, min_frames=min_accel_frames)
+    quickness_col_dict["num_accels"] = np.bincount(accel_slot_arr[counted_flag(accel_end_row_arr)], minlength=num_players)
+    with np.errstate(all="ignore"):
+        quickness_col_dict["time_to_top_speed"] = np.bincount(
+            sprint_df["slot"], weights=sprint_df["time_to_top_speed"], minlength=num_players) / num_sprints_arr
+
+    if quickness_carry is not None and not last_chunk and num_frames:
+        tail_start = quickness_tail_start(speed_arr, accel_arr, clock_index, max(window_frames_list, default=1),
+                                          sprint_speed=sprint_speed, accel_threshold=accel_threshold)
+        quickness_carry["tail_df"] = frame_df.iloc[tail_start:].reset_index(drop=True)
+    return pd.DataFrame(quickness_col_dict, index=pd.Index(player_trackobj_list))
+
+def flush_quickness_carry(quickness_carry: dict,
+                          time_per_frame_rate: float=0.10,
+                          **quickness_kwargs):
+    """
+    Count the sprints and accelerations still going on at the end of the last chunk of a match,
+    once all the chunks have been through summarise_quickness with quickness_carry
+
+    Returns:
+        Output of summarise_quickness for the players of the tail of the last chunk
+    """
+    quickness_carry["last_chunk"] = True
+    return summarise_quickness(pd.DataFrame({"period": [], "time_seconds": []}), np.zeros((0, 0)), [],
+                               time_per_frame_rate=time_per_frame_rate, quickness_carry=quickness_carry, **quickness_kwargs)
+
+def summarise_quickness_wide(match_player_stats_data_df: pd.DataFrame,
+                             player_trackobj_list: list,
+                             time_per_frame_rate: float=0.10,
+                             **quickness_kwargs):
+    """
+    summarise_quickness on the output of summarise_distance_time (wide layout).
+    The players without a {trackobj}_dist column are left out
+    """
+    player_trackobj_list = [player_trackobj for player_trackobj in player_trackobj_list
+                            if f"{player_trackobj}_dist" in match_player_stats_data_df.columns]
+    dist_arr = match_player_stats_data_df[[f"{player_trackobj}_dist" for player_trackobj in player_trackobj_list]].to_numpy(dtype=float)
+    return summarise_quickness(match_player_stats_data_df[["period", "time_seconds"]], dist_arr, player_trackobj_list,
+                               time_per_frame_rate=time_per_frame_rate, **quickness_kwargs)
+
+def summarise_quickness_long(frames_df: pd.DataFrame,
+                             tracks_df: pd.DataFrame,
+                             time_per_frame_rate: float=0.10,
+                             **quickness_kwargs):
+    """
+    summarise_quickness on the output of long_format.summarise_distance_time_long (single match).
+    The players without any distance are left out, the same as in summarise_player_stats_long
+    """
+    player_tracks_df = tracks_df[tracks_df["dist"].notna()]
+    trackobj_arr = player_tracks_df.index.get_level_values("trackable_object").to_numpy()
+    player_trackobj_list, slot_arr = np.unique(trackobj_arr, return_inverse=True)
+    dist_arr = np.full((len(frames_df), len(player_trackobj_list)), np.nan)
+    dist_arr[player_tracks_df["row_idx"].to_numpy(), slot_arr] = player_tracks_df["dist"].to_numpy(dtype=float)
+    return summarise_quickness(frames_df[["period", "time_seconds"]], dist_arr, player_trackobj_list.tolist(),
+                               time_per_frame_rate=time_per_frame_rate, **quickness_kwargs)
+
+def aggregate_quickness(stat_df: pd.DataFrame,
+                        group_by,
+                        average_counts: bool=False):
+    """
+    Combine the quickness stats of several rows per player (parts of a match, or matches of a season):
+    the peaks are the maximum, the counts are summed (or averaged over the rows if average_counts)
+    and time_to_top_speed is averaged over all the sprints
+
+    Input:
+        stat_df: DataFrame with the quickness columns
+        group_by: List of the columns of stat_df to group by, or anything else DataFrame.groupby takes
+
+    Returns:
+        DataFrame indexed by the group keys with the quickness columns of stat_df
+    """
+    quickness_col_list = [col for col in stat_df.columns
+                          if col.startswith("peak_") or col in player_quickness_template]
+    peak_col_list = [col for col in quickness_col_list if col.startswith("peak_")]
+    count_col_list = [col for col in quickness_col_list if col.startswith("num_")]
+
+    quickness_df = stat_df[quickness_col_list].assign(
+        sprint_time_sum=stat_df["time_to_top_speed"].fillna(0) * stat_df["num_sprints"])
+    if isinstance(group_by, list):
+        group_by = [stat_df[col] for col in group_by]
+    group_by = quickness_df.groupby(group_by)
+    combined_df = group_by[peak_col_list].max()
+    count_df = group_by[count_col_list + ["sprint_time_sum"]].sum()
+    with np.errstate(all="ignore"):
+        combined_df["time_to_top_speed"] = count_df["sprint_time_sum"] / count_df["num_sprints"]
+    if average_counts:
+        count_df[count_col_list] = count_df[count_col_list].div(group_by.size(), axis=0)
+    combined_df[count_col_list] = count_df[count_col_list]
+    return combined_df[quickness_col_list]
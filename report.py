@@ -0,0 +1,173 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for rendering the Plotly charts of the season player stats of the SkillCorner dataset found in the repo.
+The charts are rendered headless and in parallel, and share a single copy of plotly.js
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import plotly.express as px
+
+## Output modes of render_report:
+##     1. directory: One HTML file per chart, all referencing a single plotly-{version}.min.js in the output directory
+##     2. dashboard: A single HTML page with all the charts and one embedded copy of plotly.js
+##     3. inline: One HTML file per chart, each embedding the full plotly.js (the original output, several MB per chart)
+REPORT_MODE_LIST = ["directory", "dashboard", "inline"]
+DASHBOARD_FILE_NAME = "dashboard.html"
+## Number of decimals of the stats embedded in the charts. Plotly embeds most of the float arrays as base64,
+## which rounding does not shorten, so this only saves about 7-10% of the chart files
+## (measured on the directory mode charts of 300 and 600 players with plotly 7.1)
+REPORT_DECIMALS = 2
+
+def chart_col_set_list(stat_col_list: list):
+    """
+    Group the stat columns into (dist, time, speed) triples, one chart each.
+    Same as the charts of analysis.py: the last triple of stat_col_list is not plotted
+
+    Returns:
+        List of [x, z, y] column triples
+    """
+    charts_to_plot_list = []
+    col_set = []
+    for idx, col in enumerate(stat_col_list):
+        if idx % 3 == 0 and idx > 0:
+            charts_to_plot_list.append(col_set)
+            col_set = []
+        col_set.append(col)
+    return charts_to_plot_list
+
+def build_scatter_chart(stat_summary_df: pd.DataFrame,
+                        col_set: list):
+    """
+    Scatter chart of one (dist, time, speed) triple: x is the distance, y the speed and the size of the marker the time
+
+    Input:
+        stat_summary_df: Output of season_store.summarise_season
+        col_set: [x, z, y] columns
+
+    Returns:
+        Plotly figure
+    """
+    x, z, y = col_set
+    fig = px.scatter(stat_summary_df,
+                     x=x, y=y, size=z, color="team",
+                     title=f"{y} (y-axis) vs {x} (x-axis)",
+                     text="name", symbol="match_count",
+                     hover_data={
+                        "name": True, "player_id": True, "team": True,
+                        x:":.2f", y:":.2f", z:":.2f",
+                        "match_count": True
+                     })
+    fig.update_traces(textposition='middle right', textfont={"size": 8})
+    fig.update_layout(hoverlabel={"bgcolor": "white",
+                                  "font_size": 12})
+    return fig
+
+def chart_file_name(col_set: list):
+    """
+    File name of the chart of col_set, e.g. speed-vs-dist.html
+    """
+    x, _, y = col_set
+    return f"{y}-vs-{x}.html"
+
+def plotlyjs_file_name():
+    """
+    File name of plotly.js in directory mode, with its version in it so that charts rendered with
+    a different version of plotly never pick up an old copy
+    """
+    from plotly.offline import get_plotlyjs_version
+
+    return f"plotly-{get_plotlyjs_version()}.min.js"
+
+def render_chart(stat_summary_df: pd.DataFrame,
+                 col_set: list,
+                 out_dir: str,
+                 mode: str="directory"):
+    """
+    Build the chart of col_set and write it to out_dir, or return it as an HTML fragment in dashboard mode
+
+    Returns:
+        Path to the written file, or the HTML <div> of the chart in dashboard mode
+    """
+    fig = build_scatter_chart(stat_summary_df, col_set)
+    if mode == "dashboard":
+        return fig.to_html(full_html=False, include_plotlyjs=False)
+    out_path = os.path.join(out_dir, chart_file_name(col_set))
+    fig.write_html(out_path, include_plotlyjs=plotlyjs_file_name() if mode == "directory" else True)
+    return out_path
+
+def write_dashboard(chart_html_list: list,
+                    out_dir: str,
+                    title: str="Player stats"):
+    """
+    Write the chart fragments of render_chart into a single page with one copy of plotly.js
+
+    Returns:
+        Path to the dashboard
+    """
+    from plotly.offline import get_plotlyjs
+
+    dashboard_path = os.path.join(out_dir, DASHBOARD_FILE_NAME)
+    with open(dashboard_path, "w", encoding="utf-8") as f:
+        f.write(f'<html>\n<head><meta charset="utf-8" /><title>{title}</title></head>\n<body>\n')
+        f.write(f'<script type="text/javascript">{get_plotlyjs()}</script>\n')
+        for chart_html in chart_html_list:
+            f.write(f"{chart_html}\n")
+        f.write("</body>\n</html>\n")
+    return dashboard_path
+
+def render_report(stat_summary_df: pd.DataFrame,
+                  out_dir: str,
+                  stat_col_list: list,
+                  mode: str="directory",
+                  num_workers: int=None,
+                  decimals: int=REPORT_DECIMALS,
+                  show: bool=False):
+    """
+    Render the charts of the season player stats. Nothing is opened unless show is set,
+    so that the report can be rendered in headless batch runs
+
+    Input:
+        stat_summary_df: Output of season_store.summarise_season
+        out_dir: Directory to write the charts to
+        stat_col_list: Stat columns to chart, grouped into triples by chart_col_set_list
+        mode: One of REPORT_MODE_LIST
+        num_workers: Number of worker processes to render the charts in. None uses all the CPUs, 1 renders in this process
+        decimals: Number of decimals of the stats embedded in the charts. None keeps the full precision
+        show: Whether to also open every chart in the browser (fig.show())
+
+    Returns:
+        List of the paths written
+    """
+    if mode not in REPORT_MODE_LIST:
+        raise ValueError(f"mode must be one of {REPORT_MODE_LIST}, got {mode}")
+    os.makedirs(out_dir, exist_ok=True)
+    if decimals is not None:
+        stat_summary_df = stat_summary_df.round({col: decimals for col in stat_col_list if col in stat_summary_df.columns})
+    charts_to_plot_list = chart_col_set_list(stat_col_list)
+
+    ## Written once up front, as every worker would otherwise race to write it
+    if mode == "directory" and not os.path.exists(os.path.join(out_dir, plotlyjs_file_name())):
+        from plotly.offline import get_plotlyjs
+        with open(os.path.join(out_dir, plotlyjs_file_name()), "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+
+    num_charts = len(charts_to_plot_list)
+    args = ([stat_summary_df] * num_charts, charts_to_plot_list, [out_dir] * num_charts, [mode] * num_charts)
+    if (num_workers is None or num_workers > 1) and num_charts > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            rendered_list = list(executor.map(render_chart, *args))
+    else:
+        rendered_list = list(map(render_chart, *args))
+
+    if mode == "dashboard":
+        rendered_list = [write_dashboard(rendered_list, out_dir)]
+    if show:
+        for col_set in charts_to_plot_list:
+            build_scatter_chart(stat_summary_df, col_set).show()
+    return rendered_list
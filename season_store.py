@@ -0,0 +1,185 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for the persistent per-match player stat store of the season, so that a run of the
+analysis for the SkillCorner dataset found in the repo only processes the matches that are new or changed
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from blue_crow_sports.cache import source_fingerprint
+from blue_crow_sports.pipeline import run_matches
+from blue_crow_sports.proximity import aggregate_pressure
+from blue_crow_sports.quickness import aggregate_quickness
+from blue_crow_sports.tactical import aggregate_lines
+from blue_crow_sports.utils import (player_line_template,
+                                    player_pressure_template,
+                                    player_quickness_template,
+                                    player_stat_template)
+
+PLAYER_KEY_COL_LIST = ["player_id", "name", "team"]
+
+def season_store_paths(store_dir: str):
+    """
+    Path to the per-match player stats and the manifest of the store
+    """
+    return (os.path.join(store_dir, "match_stats.csv"),
+            os.path.join(store_dir, "manifest.json"))
+
+def load_season_store(store_dir: str):
+    """
+    Load the season store
+
+    Returns:
+        manifest_dict: {"settings": settings the stats were calculated with,
+                        "matches": {match_id: fingerprint of the source files}}
+        match_stats_df: One row per match and player with the match_id, the player_stat_template stats,
+            team, name and player_id
+    """
+    match_stats_path, manifest_path = season_store_paths(store_dir)
+    if not (os.path.exists(match_stats_path) and os.path.exists(manifest_path)):
+        return {"settings": None, "matches": {}}, pd.DataFrame()
+
+    with open(manifest_path, "r") as f:
+        manifest_dict = json.load(f)
+    match_stats_df = pd.read_csv(match_stats_path)
+    return manifest_dict, match_stats_df
+
+def save_season_store(store_dir: str,
+                      manifest_dict: dict,
+                      match_stats_df: pd.DataFrame):
+    """
+    Save the season store. The files are written to temporary files first
+    so that a crash never leaves the stats and the manifest out of sync
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    match_stats_path, manifest_path = season_store_paths(store_dir)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    match_stats_df.to_csv(f"{match_stats_path}.tmp", index=False)
+    os.replace(f"{match_stats_path}.tmp", match_stats_path)
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump(manifest_dict, f)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+def update_season_store(store_dir: str,
+                        match_metadata_list: list,
+                        in_data_dir: str,
+                        frame_rate_smoothing_threshold: int=1,
+                        time_per_frame_rate: float=0.10,
+                        **run_kwargs):
+    """
+    Bring the season store up to date with match_metadata_list:
+        1. Matches that are no longer in match_metadata_list are retracted
+        2. Matches that are new, or whose match_data.json / structured_data.json changed, are (re)processed
+        3. If the smoothing threshold, time per frame, layout, dtypes, chunk size or stat columns changed, every match is reprocessed
+
+    Input:
+        store_dir: Directory of the season store
+        match_metadata_list: Rows of matches.json
+        in_data_dir: Directory of the SkillCorner open data (the one that has matches.json)
+        frame_rate_smoothing_threshold: Number of frames to smooth in the calculation
+        time_per_frame_rate: Number of seconds for each frame
+        run_kwargs: Other arguments for pipeline.run_matches (num_workers, chunk_size, cache_dir, layout, ...).
+            layout, compact_dtypes, chunk_size, tactical_lines and proximity, and whether cache_dir is set, are part of
+            the settings of the store. A chunked match only differs from the full match by float rounding, but chunk_size
+            is tracked anyway so that the stored stats are always the ones a fresh run would give.
+            The others (num_workers, check_tally, profile_dir, ...) do not change the stats and are not tracked
+
+    Returns:
+        Per-match player stats of all the matches in match_metadata_list, in the order of match_metadata_list
+    """
+    manifest_dict, match_stats_df = load_season_store(store_dir)
+    ## The stat columns are part of the settings so that adding a stat reprocesses the stored matches.
+    ## The cache is always in the compact dtypes, so its stats are float32 based like with compact_dtypes
+    settings_dict = {"frame_rate_smoothing_threshold": frame_rate_smoothing_threshold,
+                     "time_per_frame_rate": time_per_frame_rate,
+                     "layout": run_kwargs.get("layout", "wide"),
+                     "compact_dtypes": bool(run_kwargs.get("compact_dtypes") or run_kwargs.get("cache_dir")),
+                     "chunk_size": run_kwargs.get("chunk_size"),
+                     "stat_col_list": list(player_stat_template) + list(player_quickness_template) +
+                        (list(player_line_template) if run_kwargs.get("tactical_lines") else []) +
+                        (list(player_pressure_template) if run_kwargs.get("proximity") else [])}
+    if manifest_dict["settings"] != settings_dict:
+        manifest_dict, match_stats_df = {"settings": settings_dict, "matches": {}}, pd.DataFrame()
+
+    fingerprint_dict = {}
+    for match_metadata in match_metadata_list:
+        match_id = match_metadata[-1]
+        match_data_dir = os.path.join(in_data_dir, "matches", str(match_id))
+        fingerprint_dict[str(match_id)] = source_fingerprint([os.path.join(match_data_dir, "match_data.json"),
+                                                              os.path.join(match_data_dir, "structured_data.json")])
+
+    stale_match_metadata_list = [match_metadata for match_metadata in match_metadata_list
+                                 if manifest_dict["matches"].get(str(match_metadata[-1])) != fingerprint_dict[str(match_metadata[-1])]]
+    stale_match_id_set = {str(match_metadata[-1]) for match_metadata in stale_match_metadata_list}
+
+    ## Retract the matches that were removed or are about to be replaced
+    if len(match_stats_df):
+        keep_match_id_set = set(fingerprint_dict) - stale_match_id_set
+        match_stats_df = match_stats_df[match_stats_df["match_id"].astype(str).isin(keep_match_id_set)]
+
+    if stale_match_metadata_list:
+        new_match_stats_df = run_matches(match_metadata_list=stale_match_metadata_list,
+                                         in_data_dir=in_data_dir,
+                                         frame_rate_smoothing_threshold=frame_rate_smoothing_threshold,
+                                         time_per_frame_rate=time_per_frame_rate,
+                                         **run_kwargs)
+        match_stats_df = pd.concat([match_stats_df, new_match_stats_df], axis=0)
+
+    ## Keep the matches in the same order as match_metadata_list
+    match_order_dict = {match_id: order for order, match_id in enumerate(fingerprint_dict)}
+    if len(match_stats_df):
+        match_stats_df = match_stats_df.sort_values(
+            "match_id", key=lambda match_id: match_id.astype(str).map(match_order_dict), kind="stable").reset_index(drop=True)
+
+    manifest_dict["matches"] = fingerprint_dict
+    save_season_store(store_dir, manifest_dict, match_stats_df)
+    return match_stats_df
+
+def summarise_season(match_stats_df: pd.DataFrame):
+    """
+    Summarise the per-match player stats over the season.
+    As some players played more than 1 match, the distance and time are averaged over
+    the number of matches they played (match_count) and the speed is recalculated from them.
+    The peak quickness stats are the best over the season and the sprint / acceleration counts are per match.
+    The pressure distances and times are averaged per match like the distance and time,
+    and the tactical line shares and the other pressure stats are over all the frames of the season
+
+    Returns:
+        DataFrame with one row per (player_id, name, team) with the player_stat_template stats,
+        the quickness, tactical line and pressure stats (if in match_stats_df) and match_count
+    """
+    stat_col_list = list(player_stat_template)
+    group_by = match_stats_df.groupby(PLAYER_KEY_COL_LIST)
+    season_stats_df = group_by[stat_col_list].sum()
+    season_stats_df["match_count"] = group_by["dist"].count()
+    season_stats_df = season_stats_df.reset_index()
+
+    for col in stat_col_list:
+        if col.startswith("speed"):
+            suffix = col[len("speed"):]
+            season_stats_df[f"dist{suffix}"] = season_stats_df[f"dist{suffix}"] / season_stats_df["match_count"]
+            season_stats_df[f"time{suffix}"] = season_stats_df[f"time{suffix}"] / season_stats_df["match_count"]
+            season_stats_df[col] = season_stats_df[f"dist{suffix}"] / season_stats_df[f"time{suffix}"]
+
+    if "num_sprints" in match_stats_df.columns:
+        quickness_df = aggregate_quickness(match_stats_df, PLAYER_KEY_COL_LIST, average_counts=True)
+        season_stats_df = season_stats_df.merge(quickness_df, left_on=PLAYER_KEY_COL_LIST, right_index=True)
+    if "line_frames" in match_stats_df.columns:
+        line_df = aggregate_lines(match_stats_df, PLAYER_KEY_COL_LIST)
+        season_stats_df = season_stats_df.merge(line_df, left_on=PLAYER_KEY_COL_LIST, right_index=True)
+    if "proximity_frames" in match_stats_df.columns:
+        pressure_df = aggregate_pressure(match_stats_df, PLAYER_KEY_COL_LIST)
+        season_stats_df = season_stats_df.merge(pressure_df, left_on=PLAYER_KEY_COL_LIST, right_index=True)
+        for col in player_pressure_template:
+            if col.startswith(("dist", "time")):
+                season_stats_df[col] = season_stats_df[col] / season_stats_df["match_count"]
+    season_stats_df = season_stats_df[[col for col in season_stats_df.columns if col != "match_count"] + ["match_count"]]
+    return season_stats_df
@@ -0,0 +1,117 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for reading the structured_data.json of the SkillCorner dataset found in the repo
+incrementally, so that a match never has to be held in memory in full
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import json
+import re
+
+import pandas as pd
+
+SEPARATOR_REGEX = re.compile(r"[\s,]*")
+
+def iter_frames(json_path: str,
+                read_size: int=1 << 20):
+    """
+    Yield the frames of structured_data.json one at a time.
+    The file is read in blocks of read_size characters and every frame is decoded
+    as soon as it is complete, so only one block and one frame are in memory at a time.
+    Frames where time == None are dropped
+
+    Input:
+        json_path: Path to structured_data.json
+        read_size: Number of characters to read from the file at a time
+
+    Returns:
+        Generator of the frame dictionaries
+    """
+    decoder = json.JSONDecoder()
+    with open(json_path, "r") as f:
+        buffer = f.read(read_size).lstrip()
+        assert buffer.startswith("["), f"{json_path} is not a list of frames"
+        pos = 1
+        end_of_file = False
+
+        while True:
+            pos = SEPARATOR_REGEX.match(buffer, pos).end()
+            if buffer.startswith("]", pos):
+                return
+            try:
+                frame, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                ## The frame is cut off at the end of the block. Read the next block and try again
+                if end_of_file:
+                    raise
+                next_block = f.read(read_size)
+                end_of_file = not next_block
+                buffer = buffer[pos:] + next_block
+                pos = 0
+                continue
+
+            if frame.get("time") is not None:
+                yield frame
+
+def iter_frame_chunks(json_path: str,
+                      chunk_size: int=6000,
+                      overlap: int=10,
+                      read_size: int=1 << 20):
+    """
+    Yield the frames of structured_data.json in chunks of chunk_size frames.
+    Every chunk also carries the first overlap frames of the next chunk so that
+    forward differences over overlap frames (e.g. summarise_distance_time with
+    frame_rate_smoothing_threshold=overlap) can be computed for all of its own frames
+
+    Input:
+        json_path: Path to structured_data.json
+        chunk_size: Number of frames that each chunk is responsible for
+        overlap: Number of frames of the next chunk to include at the end of each chunk
+        read_size: Number of characters to read from the file at a time
+
+    Returns:
+        Generator of (chunk_df, num_owned_frames), where chunk_df has the same columns as
+        pd.read_json on the file and only its first num_owned_frames rows belong to the chunk
+    """
+    frame_list = []
+    for frame in iter_frames(json_path, read_size=read_size):
+        frame_list.append(frame)
+        if len(frame_list) == chunk_size + overlap:
+            yield pd.DataFrame(frame_list), chunk_size
+            frame_list = frame_list[chunk_size:]
+
+    if frame_list:
+        yield pd.DataFrame(frame_list), len(frame_list)
+
+def iter_overlapping_chunks(df_iter,
+                            overlap: int=10):
+    """
+    Same as iter_frame_chunks, for chunks that are already DataFrames (e.g. the parts of the explode cache):
+    every chunk is yielded with the first overlap frames of the chunks after it appended
+
+    Input:
+        df_iter: Iterable of the chunks in frame order
+        overlap: Number of frames of the next chunks to include at the end of each chunk
+
+    Returns:
+        Generator of (chunk_df, num_owned_frames), where only the first num_owned_frames rows of chunk_df belong to the chunk
+    """
+    def overlap_chunk(queue_list):
+        owned_df = queue_list[0].reset_index(drop=True)
+        if len(queue_list) == 1 or overlap <= 0:
+            return owned_df, len(owned_df)
+        overlap_df = pd.concat(queue_list[1:], axis=0, ignore_index=True).head(overlap)
+        return pd.concat([owned_df, overlap_df], axis=0, ignore_index=True), len(owned_df)
+
+    ## A chunk is only yielded once the chunks queued after it have overlap frames, as the last chunks can be short
+    queue_list = []
+    for df in df_iter:
+        queue_list.append(df)
+        while len(queue_list) > 1 and sum(len(queued_df) for queued_df in queue_list[1:]) >= overlap:
+            yield overlap_chunk(queue_list)
+            queue_list.pop(0)
+    while queue_list:
+        yield overlap_chunk(queue_list)
+        queue_list.pop(0)
@@ -0,0 +1,246 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for generating synthetic matches in the schema of the SkillCorner dataset found in the repo
+(matches.json, match_data.json and structured_data.json), so that the pipeline can be benchmarked offline at any scale
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import json
+import os
+
+import numpy as np
+
+BALL_TRACKOBJ = 55
+PITCH_HALF_LENGTH = 52.5
+PITCH_HALF_WIDTH = 34.0
+
+synthetic_match_template = {
+    "period_minutes": 45,
+    "num_periods": 2,
+    "frame_rate": 10,
+    "num_players": 11,
+    "num_subs": 5,
+    "track_id_churn_rate": 0.002,
+    "missing_player_rate": 0.15,
+    "missing_ball_rate": 0.10,
+    "time_none_rate": 0.01,
+    "possession_change_rate": 0.02,
+}
+
+def match_clock(seconds: np.ndarray):
+    """
+    Convert seconds to the match time format (XX:XX.XX) of structured_data.json
+    """
+    centi_secs = np.round(np.asarray(seconds) * 100).astype(np.int64)
+    return [f"{mins:02d}:{secs:02d}.{centi:02d}" for mins, secs, centi in
+            zip(centi_secs // 6000, centi_secs % 6000 // 100, centi_secs % 100)]
+
+def make_match_data(match_id: int,
+                    num_players: int=11,
+                    num_subs: int=5,
+                    seed: int=0):
+    """
+    Generate the match_data.json of a synthetic match. Every team has num_players starters
+    (the first one being the goalkeeper) and num_subs substitutes who are never tracked
+
+    Returns:
+        Dictionary in the schema of match_data.json
+    """
+    rng = np.random.default_rng(seed)
+    home_team_id, away_team_id = 2 * match_id + 1, 2 * match_id + 2
+    player_list = []
+    for team_idx, team_id in enumerate([home_team_id, away_team_id]):
+        for player_idx in range(num_players + num_subs):
+            trackable_object = 1000 * (team_idx + 1) + player_idx
+            if player_idx == 0:
+                player_role = {"id": 0, "name": "Goalkeeper", "acronym": "GK"}
+            else:
+                player_role = {"id": 1, "name": "Outfield", "acronym": rng.choice(["CB", "CM", "CF"]).item()}
+            player_list.append({
+                "trackable_object": trackable_object,
+                "first_name": "" if player_idx == 1 else f"First{trackable_object}",
+                "last_name": f"Last{trackable_object}",
+                "id": 100000 + trackable_object,
+                "team_id": team_id,
+                "number": player_idx + 1,
+                "start_time": "00:00:00" if player_idx < num_players else None,
+                "player_role": player_role,
+            })
+
+    match_data_dict = {
+        "id": match_id,
+        "date_time": "2026-01-01T15:00:00Z",
+        "status": "closed",
+        "home_team": {"id": home_team_id, "name": f"Home {match_id}", "short_name": f"Home {match_id}"},
+        "away_team": {"id": away_team_id, "name": f"Away {match_id}", "short_name": f"Away {match_id}"},
+        "ball": {"trackable_object": BALL_TRACKOBJ},
+        "players": player_list,
+    }
+    return match_data_dict
+
+def make_structured_data(match_data: dict,
+                         period_minutes: float=45,
+                         num_periods: int=2,
+                         frame_rate: int=10,
+                         num_players: int=11,
+                         track_id_churn_rate: float=0.002,
+                         missing_player_rate: float=0.15,
+                         missing_ball_rate: float=0.10,
+                         time_none_rate: float=0.01,
+                         possession_change_rate: float=0.02,
+                         seed: int=0,
+                         **kwargs):
+    """
+    Generate the structured_data.json of a synthetic match.
+    The players and the ball do a random walk on the pitch, which is sampled for the whole match at once
+
+    Input:
+        match_data: Output of make_match_data
+        period_minutes: Length of each period in minutes
+        num_periods: Number of periods (1 for a half, 2 for a full match)
+        frame_rate: Number of frames per second
+        num_players: Number of starters of each team that are tracked
+        track_id_churn_rate: Probability that an object gets a new track_id in a frame
+        missing_player_rate: Probability that a player is not on screen in a frame
+        missing_ball_rate: Probability that the ball is not on screen in a frame
+        time_none_rate: Probability that a frame has time == None
+        possession_change_rate: Probability that the possession changes in a frame
+        seed: Seed of the random generator, the same seed always gives the same match
+
+    Returns:
+        List of frame dictionaries in the schema of structured_data.json
+    """
+    rng = np.random.default_rng(seed)
+    num_frames_per_period = int(period_minutes * 60 * frame_rate)
+    num_frames = num_frames_per_period * num_periods
+
+    home_team_id = match_data["home_team"]["id"]
+    team_trackobj_dict = {"home team": [], "away team": []}
+    for player in match_data["players"]:
+        if player["start_time"] is None:
+            continue
+        group = "home team" if player["team_id"] == home_team_id else "away team"
+        team_trackobj_dict[group].append(player["trackable_object"])
+    trackobj_arr = np.array(team_trackobj_dict["home team"][:num_players] +
+                            team_trackobj_dict["away team"][:num_players] + [BALL_TRACKOBJ])
+    num_objects = len(trackobj_arr)
+
+    ## Random walk of about 2 m/s for the players and 8 m/s for the ball
+    step_std_arr = np.full(num_objects, 2.0 / frame_rate)
+    step_std_arr[-1] = 8.0 / frame_rate
+    start_arr = rng.uniform([-PITCH_HALF_LENGTH, -PITCH_HALF_WIDTH], [PITCH_HALF_LENGTH, PITCH_HALF_WIDTH], (num_objects, 2))
+    walk_arr = start_arr + np.cumsum(rng.normal(0, 1, (num_frames, num_objects, 2)) * step_std_arr[None, :, None], axis=0)
+    ## Reflect the walk at the touchlines so that the objects stay on the pitch
+    pitch_arr = np.array([PITCH_HALF_LENGTH, PITCH_HALF_WIDTH])
+    walk_arr = np.abs((walk_arr + pitch_arr) % (4 * pitch_arr) - 2 * pitch_arr) - pitch_arr
+    walk_arr = np.round(walk_arr, 2)
+
+    track_id_arr = np.arange(num_objects) * 100000 + np.cumsum(rng.random((num_frames, num_objects)) < track_id_churn_rate, axis=0)
+    visible_arr = rng.random((num_frames, num_objects)) >= missing_player_rate
+    visible_arr[:, -1] = rng.random(num_frames) >= missing_ball_rate
+    time_none_arr = rng.random(num_frames) < time_none_rate
+
+    ## Possession spells that alternate between the teams
+    spell_arr = np.cumsum(rng.random(num_frames) < possession_change_rate)
+    group_arr = np.where(spell_arr % 3 == 0, None, np.where(spell_arr % 3 == 1, "home team", "away team"))
+    possession_player_arr = rng.integers(0, num_players, num_frames)
+
+    frame_list = []
+    for period in range(1, num_periods + 1):
+        period_start = (period - 1) * num_frames_per_period
+        period_seconds = (period - 1) * period_minutes * 60 + np.arange(num_frames_per_period) / frame_rate
+        for frame_idx, time in zip(range(period_start, period_start + num_frames_per_period), match_clock(period_seconds)):
+            if time_none_arr[frame_idx]:
+                frame_list.append({"period": period, "frame": frame_idx, "time": None,
+                                   "possession": {"trackable_object": None, "group": None}, "data": []})
+                continue
+
+            track_list = []
+            for slot in np.flatnonzero(visible_arr[frame_idx]):
+                tracked = {"track_id": int(track_id_arr[frame_idx, slot]),
+                           "trackable_object": int(trackobj_arr[slot]),
+                           "x": float(walk_arr[frame_idx, slot, 0]),
+                           "y": float(walk_arr[frame_idx, slot, 1])}
+                if slot == num_objects - 1:
+                    tracked["z"] = 0.5
+                track_list.append(tracked)
+            track_list.append({"track_id": 999999, "group_name": "referee", "x": 0.0, "y": 0.0})
+
+            group = group_arr[frame_idx]
+            possession_player = None
+            if group is not None:
+                possession_player = team_trackobj_dict[group][possession_player_arr[frame_idx]]
+            frame_list.append({"period": period, "frame": frame_idx, "time": time,
+                               "possession": {"trackable_object": possession_player, "group": group},
+                               "data": track_list})
+    return frame_list
+
+def write_synthetic_match(match_data_dir: str,
+                          match_id: int,
+                          seed: int=0,
+                          **match_kwargs):
+    """
+    Write match_data.json and structured_data.json of a synthetic match into match_data_dir
+
+    Returns:
+        The match_data.json dictionary
+    """
+    match_kwargs = {**synthetic_match_template, **match_kwargs}
+    match_data_dict = make_match_data(match_id, num_players=match_kwargs["num_players"],
+                                      num_subs=match_kwargs["num_subs"], seed=seed)
+    frame_list = make_structured_data(match_data_dict, seed=seed, **match_kwargs)
+
+    os.makedirs(match_data_dir, exist_ok=True)
+    with open(os.path.join(match_data_dir, "match_data.json"), "w") as f:
+        json.dump(match_data_dict, f)
+    with open(os.path.join(match_data_dir, "structured_data.json"), "w") as f:
+        json.dump(frame_list, f)
+    return match_data_dict
+
+def write_synthetic_season(in_data_dir: str,
+                           num_matches: int=9,
+                           seed: int=0,
+                           **match_kwargs):
+    """
+    Write a synthetic season in the layout of the SkillCorner open data:
+    {in_data_dir}/matches.json and {in_data_dir}/matches/{match_id}/*.json.
+    If in_data_dir already has a season generated with the same settings, it is reused
+
+    Input:
+        in_data_dir: Directory to write the season to
+        num_matches: Number of matches
+        seed: Seed of the season, match i is generated with seed + i
+        match_kwargs: Overrides of synthetic_match_template
+
+    Returns:
+        Rows of matches.json
+    """
+    settings_dict = {"num_matches": num_matches, "seed": seed, **synthetic_match_template, **match_kwargs}
+    settings_path = os.path.join(in_data_dir, "synthetic_settings.json")
+    matches_json_path = os.path.join(in_data_dir, "matches.json")
+    if os.path.exists(settings_path) and os.path.exists(matches_json_path):
+        with open(settings_path, "r") as f:
+            if json.load(f) == settings_dict:
+                with open(matches_json_path, "r") as f:
+                    return json.load(f)
+
+    match_metadata_list = []
+    for match_idx in range(num_matches):
+        match_id = 900000 + match_idx
+        match_data_dict = write_synthetic_match(os.path.join(in_data_dir, "matches", str(match_id)),
+                                                match_id, seed=seed + match_idx, **match_kwargs)
+        match_metadata_list.append({
+            "status": match_data_dict["status"],
+            "date_time": match_data_dict["date_time"],
+            "home_team": {"id": match_data_dict["home_team"]["id"], "short_name": match_data_dict["home_team"]["short_name"]},
+            "away_team": {"id": match_data_dict["away_team"]["id"], "short_name": match_data_dict["away_team"]["short_name"]},
+            "id": match_id,
+        })
+
+    with open(matches_json_path, "w") as f:
+        json.dump(match_metadata_list, f)
+    with open(settings_path, "w") as f:
+        json.dump(settings_dict, f)
+    return match_metadata_list
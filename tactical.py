@@ -0,0 +1,319 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for assigning the outfield players of the SkillCorner dataset found in the repo to a
+defensive, midfield or attacking line in every frame, and for summarising the share of time each player spent in each line
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.profiling import profiled
+from blue_crow_sports.utils import (long_player_slots, player_line_template,
+                                    stack_long_player_col, stack_player_cols,
+                                    wide_player_in_view, wide_player_trackobj)
+
+## Line labels of the per-frame line array. NO_LINE is for the goalkeepers, the players that are
+## not in view and the frames where fewer than len(LINE_NAME_LIST) outfield players of the team are in view
+LINE_NAME_LIST = ["defence", "midfield", "attack"]
+NO_LINE = -1
+
+def extract_goalkeeper_trackobj(match_info: dict):
+    """
+    Trackable objects of the goalkeepers, from the player_role in match_data.json.
+    If the player_role is not in match_data.json, no player is treated as a goalkeeper
+    """
+    goalkeeper_trackobj_set = set()
+    for player in match_info["players"]:
+        player_role = player.get("player_role") or {}
+        if player_role.get("acronym") == "GK" or player_role.get("name") == "Goalkeeper":
+            goalkeeper_trackobj_set.add(player["trackable_object"])
+    return goalkeeper_trackobj_set
+
+def period_key(period_arr: np.ndarray):
+    """
+    Period of every frame as a float, so that the periods of chunks read with different dtypes
+    (int, float with NaN or object with None) are the same keys. -1 if the frame has no period
+    """
+    return pd.to_numeric(pd.Series(period_arr), errors="coerce").fillna(-1).to_numpy(dtype=float)
+
+def attack_x_sums(x_arr: np.ndarray,
+                  team_list: list,
+                  period_arr: np.ndarray,
+                  goalkeeper_flag: np.ndarray):
+    """
+    Sum and count of the x coordinates of the players of every team in every period, for all the players
+    and for the goalkeepers alone. The sums of the chunks of a match add up to the sums of the whole match,
+    so the attack direction can be worked out once per match and period (see attack_direction)
+
+    Input:
+        x_arr: (frames x players) x coordinates, NaN when the player is not in view
+        team_list: home_team / away_team of the columns of x_arr
+        period_arr: Period of every frame
+        goalkeeper_flag: Boolean array, True for the columns of x_arr that are goalkeepers
+
+    Returns:
+        DataFrame indexed by (team, period) with x_sum, x_count, gk_x_sum and gk_x_count
+    """
+    team_arr = np.array(team_list, dtype=object)
+    x_sum_df_list = []
+    for team_pos in ["home_team", "away_team"]:
+        team_x_arr = x_arr[:, team_arr == team_pos]
+        gk_x_arr = x_arr[:, (team_arr == team_pos) & goalkeeper_flag]
+        x_sum_df_list.append(pd.DataFrame({
+            "team": team_pos,
+            "period": period_key(period_arr),
+            "x_sum": np.nansum(team_x_arr, axis=1),
+            "x_count": (~np.isnan(team_x_arr)).sum(axis=1),
+            "gk_x_sum": np.nansum(gk_x_arr, axis=1),
+            "gk_x_count": (~np.isnan(gk_x_arr)).sum(axis=1),
+        }))
+    return pd.concat(x_sum_df_list, axis=0).groupby(["team", "period"]).sum()
+
+def attack_direction(x_sum_df: pd.DataFrame):
+    """
+    Infer the direction each team attacks in every period from where its players are on average:
+    a team that is on average in the negative x half defends that half and attacks towards +x.
+    The goalkeeper alone is used if in view in the period, as goalkeepers rarely leave their half
+
+    Input:
+        x_sum_df: Output of attack_x_sums, or the sum of it over the chunks of a match
+
+    Returns:
+        Series indexed by (team, period) with +1 or -1
+    """
+    x_sum_df = x_sum_df.groupby(level=["team", "period"]).sum()
+    use_gk_flag = x_sum_df["gk_x_count"] > 0
+    x_sum_arr = np.where(use_gk_flag, x_sum_df["gk_x_sum"], x_sum_df["x_sum"])
+    x_count_arr = np.where(use_gk_flag, x_sum_df["gk_x_count"], x_sum_df["x_count"])
+    direction_arr = np.where(x_sum_arr <= 0, 1, -1)
+    ## A period without any player in view keeps +1
+    direction_arr[x_count_arr == 0] = 1
+    return pd.Series(direction_arr, index=x_sum_df.index)
+
+def cluster_lines(depth_arr: np.ndarray,
+                  num_lines: int=3):
+    """
+    Split the players of every frame into num_lines lines by their depth (how far up the pitch they are).
+    The depths of every frame are sorted and the lines are the optimal 1-D k-means split of them,
+    i.e. the cut points with the lowest total within-line variance. Every possible set of cut points
+    is scored for all the frames at once with prefix sums, so there is no loop over the frames
+
+    Input:
+        depth_arr: (frames x players) depth of the players, NaN when not in view
+
+    Returns:
+        (frames x players) int8 array of the line of every player (0 is the deepest line), NO_LINE if not in view
+    """
+    num_frames, num_players = depth_arr.shape
+    line_arr = np.full((num_frames, num_players), NO_LINE, dtype=np.int8)
+    if num_players < num_lines:
+        return line_arr
+
+    ## NaN is sorted to the end, so the players in view are the first num_visible of every row
+    order_arr = np.argsort(depth_arr, axis=1, kind="stable")
+    sorted_arr = np.take_along_axis(depth_arr, order_arr, axis=1)
+    num_visible_arr = (~np.isnan(depth_arr)).sum(axis=1)
+    sorted_arr = np.nan_to_num(sorted_arr)
+    cumsum_arr = np.zeros((num_frames, num_players + 1))
+    cumsum_arr[:, 1:] = np.cumsum(sorted_arr, axis=1)
+    cumsum_sq_arr = np.zeros((num_frames, num_players + 1))
+    cumsum_sq_arr[:, 1:] = np.cumsum(sorted_arr ** 2, axis=1)
+    row_arr = np.arange(num_frames)
+
+    def segment_sse(start, end):
+        seg_sum = cumsum_arr[row_arr, end] - cumsum_arr[row_arr, start]
+        seg_sq_sum = cumsum_sq_arr[row_arr, end] - cumsum_sq_arr[row_arr, start]
+        with np.errstate(all="ignore"):
+            return np.where(end > start, seg_sq_sum - seg_sum ** 2 / (end - start), 0)
+
+    cut_list = list(itertools.combinations(range(1, num_players), num_lines - 1))
+    cost_arr = np.full((num_frames, len(cut_list)), np.inf)
+    for cut_idx, cut in enumerate(cut_list):
+        bound_list = [np.zeros(num_frames, dtype=np.int64)] + [np.full(num_frames, c) for c in cut] + [num_visible_arr]
+        cost = sum(segment_sse(start, end) for start, end in zip(bound_list[:-1], bound_list[1:]))
+        cost_arr[:, cut_idx] = np.where(cut[-1] < num_visible_arr, cost, np.inf)
+
+    best_cut_arr = np.array(cut_list)[cost_arr.argmin(axis=1)]
+    position_arr = np.arange(num_players)
+    sorted_line_arr = (position_arr[None, :, None] >= best_cut_arr[:, None, :]).sum(axis=2).astype(np.int8)
+    sorted_line_arr[(position_arr[None, :] >= num_visible_arr[:, None]) | (num_visible_arr[:, None] < num_lines)] = NO_LINE
+    np.put_along_axis(line_arr, order_arr, sorted_line_arr, axis=1)
+    return line_arr
+
+def assign_tactical_lines(x_arr: np.ndarray,
+                          trackobj_list: list,
+                          team_list: list,
+                          period_arr: np.ndarray,
+                          goalkeeper_trackobj_set: set,
+                          direction_series: pd.Series=None):
+    """
+    Assign the outfield players of each team to a line in every frame
+
+    Input:
+        x_arr: (frames x players) x coordinates, NaN when the player is not in view
+        trackobj_list: Trackable objects of the columns of x_arr
+        team_list: home_team / away_team of the columns of x_arr
+        period_arr: Period of every frame
+        goalkeeper_trackobj_set: Trackable objects of the goalkeepers, who are left out of the lines
+        direction_series: Output of attack_direction for the whole match. If None, the direction is
+            inferred from the frames of x_arr, which is only right if they are the whole match
+
+    Returns:
+        (frames x players) int8 array of the index in LINE_NAME_LIST of the line of every player, NO_LINE if none
+    """
+    line_arr = np.full(x_arr.shape, NO_LINE, dtype=np.int8)
+    team_arr = np.array(team_list, dtype=object)
+    outfield_arr = ~np.isin(np.array(trackobj_list), list(goalkeeper_trackobj_set))
+    if direction_series is None:
+        direction_series = attack_direction(attack_x_sums(x_arr, team_list, period_arr, ~outfield_arr))
+    period_key_arr = period_key(period_arr)
+    for team_pos in ["home_team", "away_team"]:
+        outfield_slot_arr = np.flatnonzero((team_arr == team_pos) & outfield_arr)
+        if not len(outfield_slot_arr):
+            continue
+        ## A period that is not in direction_series had no player of the team in view and keeps +1
+        direction_arr = direction_series.reindex(pd.MultiIndex.from_arrays(
+            [np.full(len(period_key_arr), team_pos, dtype=object), period_key_arr])).fillna(1).to_numpy()
+        depth_arr = x_arr[:, outfield_slot_arr] * direction_arr[:, None]
+        line_arr[:, outfield_slot_arr] = cluster_lines(depth_arr, num_lines=len(LINE_NAME_LIST))
+    return line_arr
+
+def wide_line_x(match_explode_data_df: pd.DataFrame,
+                match_info: dict):
+    """
+    x coordinates of the players of the exploded tracking data (wide layout). A player is in view
+    in a frame if its {trackobj}_homeaway is set
+
+    Returns:
+        trackobj_list, team_list and the (frames x players) x array, NaN when the player is not in view
+    """
+    trackobj_list, team_list = wide_player_trackobj(match_explode_data_df, match_info)
+    x_arr = stack_player_cols(match_explode_data_df, trackobj_list, "x")
+    in_view_arr = wide_player_in_view(match_explode_data_df, trackobj_list)
+    return trackobj_list, team_list, np.where(in_view_arr, x_arr, np.nan)
+
+def attack_x_sums_wide(match_explode_data_df: pd.DataFrame,
+                       match_info: dict):
+    """
+    attack_x_sums on the exploded tracking data (wide layout) of a match or a chunk of it
+    """
+    trackobj_list, team_list, x_arr = wide_line_x(match_explode_data_df, match_info)
+    goalkeeper_flag = np.isin(np.array(trackobj_list), list(extract_goalkeeper_trackobj(match_info)))
+    return attack_x_sums(x_arr, team_list, match_explode_data_df["period"].to_numpy(), goalkeeper_flag)
+
+def tactical_lines_wide(match_explode_data_df: pd.DataFrame,
+                        match_info: dict,
+                        direction_series: pd.Series=None):
+    """
+    assign_tactical_lines on the exploded tracking data (wide layout)
+
+    Returns:
+        trackobj_list, team_list and the line array of assign_tactical_lines
+    """
+    trackobj_list, team_list, x_arr = wide_line_x(match_explode_data_df, match_info)
+    line_arr = assign_tactical_lines(x_arr, trackobj_list, team_list, match_explode_data_df["period"].to_numpy(),
+                                     extract_goalkeeper_trackobj(match_info), direction_series=direction_series)
+    return trackobj_list, team_list, line_arr
+
+def tactical_lines_long(frames_df: pd.DataFrame,
+                        tracks_df: pd.DataFrame,
+                        match_info: dict,
+                        direction_series: pd.Series=None):
+    """
+    assign_tactical_lines on the long-format tracking data of a match (see long_format.py)
+
+    Returns:
+        Same as tactical_lines_wide, the rows of the line array being the rows of frames_df
+    """
+    player_tracks_df, trackobj_list, team_list, row_arr, slot_arr = long_player_slots(tracks_df)
+    x_arr = stack_long_player_col(player_tracks_df, "x", len(frames_df), row_arr, slot_arr, len(trackobj_list))
+    line_arr = assign_tactical_lines(x_arr, trackobj_list, team_list, frames_df["period"].to_numpy(),
+                                     extract_goalkeeper_trackobj(match_info), direction_series=direction_series)
+    return trackobj_list, team_list, line_arr
+
+@profiled("tactical_lines")
+def summarise_lines(line_arr: np.ndarray,
+                    trackobj_list: list,
+                    team_list: list,
+                    possession_homeaway: np.ndarray):
+    """
+    Summarise the line array into the keys of player_line_template: the share of the frames
+    each player was assigned to each line, overall and split by whether the team was in possession
+
+    Input:
+        line_arr: Output of assign_tactical_lines
+        trackobj_list, team_list: Trackable object and home_team / away_team of the columns of line_arr
+        possession_homeaway: home_team / away_team / None of every frame
+
+    Returns:
+        DataFrame indexed by the player's trackable object with the player_line_template stats
+    """
+    assigned_arr = line_arr != NO_LINE
+    teampos_arr = np.asarray(possession_homeaway, dtype=object)[:, None] == np.array(team_list, dtype=object)[None, :]
+    line_col_dict = {}
+    for suffix, frame_flag in [("", assigned_arr),
+                               ("_teampos", assigned_arr & teampos_arr),
+                               ("_teamnopos", assigned_arr & ~teampos_arr)]:
+        num_frames_arr = frame_flag.sum(axis=0)
+        for line_idx, line_name in enumerate(LINE_NAME_LIST):
+            with np.errstate(all="ignore"):
+                line_col_dict[f"line_{line_name}{suffix}"] = ((line_arr == line_idx) & frame_flag).sum(axis=0) / num_frames_arr
+        line_col_dict[f"line_frames{suffix}"] = num_frames_arr
+    return pd.DataFrame(line_col_dict, index=pd.Index(trackobj_list))[list(player_line_template)]
+
+def summarise_lines_wide(match_explode_data_df: pd.DataFrame,
+                         match_info: dict,
+                         direction_series: pd.Series=None):
+    """
+    summarise_lines on the exploded tracking data (wide layout).
+    direction_series must be given for a chunk of a match (see assign_tactical_lines)
+    """
+    trackobj_list, team_list, line_arr = tactical_lines_wide(match_explode_data_df, match_info,
+                                                             direction_series=direction_series)
+    return summarise_lines(line_arr, trackobj_list, team_list,
+                           match_explode_data_df["possession_homeaway"].astype(object).to_numpy())
+
+def summarise_lines_long(frames_df: pd.DataFrame,
+                         tracks_df: pd.DataFrame,
+                         match_info: dict,
+                         direction_series: pd.Series=None):
+    """
+    summarise_lines on the long-format tracking data of a match.
+    direction_series must be given for a chunk of a match (see assign_tactical_lines)
+    """
+    trackobj_list, team_list, line_arr = tactical_lines_long(frames_df, tracks_df, match_info,
+                                                             direction_series=direction_series)
+    return summarise_lines(line_arr, trackobj_list, team_list,
+                           frames_df["possession_homeaway"].astype(object).to_numpy())
+
+def aggregate_lines(stat_df: pd.DataFrame,
+                    group_by):
+    """
+    Combine the line shares of several rows per player (parts of a match, or matches of a season),
+    weighting every row by the number of frames its shares are over
+
+    Input:
+        stat_df: DataFrame with the player_line_template columns
+        group_by: List of the columns of stat_df to group by, or anything else DataFrame.groupby takes
+
+    Returns:
+        DataFrame indexed by the group keys with the player_line_template columns
+    """
+    count_df = pd.DataFrame(index=stat_df.index)
+    for suffix in ["", "_teampos", "_teamnopos"]:
+        count_df[f"line_frames{suffix}"] = stat_df[f"line_frames{suffix}"]
+        for line_name in LINE_NAME_LIST:
+            count_df[f"line_{line_name}{suffix}"] = stat_df[f"line_{line_name}{suffix}"].fillna(0) * stat_df[f"line_frames{suffix}"]
+    if isinstance(group_by, list):
+        group_by = [stat_df[col] for col in group_by]
+    count_df = count_df.groupby(group_by).sum()
+    for suffix in ["", "_teampos", "_teamnopos"]:
+        for line_name in LINE_NAME_LIST:
+            with np.errstate(all="ignore"):
+                count_df[f"line_{line_name}{suffix}"] = count_df[f"line_{line_name}{suffix}"] / count_df[f"line_frames{suffix}"]
+    return count_df[list(player_line_template)]
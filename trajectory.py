@@ -0,0 +1,174 @@
+"""
+Init date: 17th Oct 2026
+Update date: 17th Oct 2026
+Description: This script is for the per-match trajectory index of the players in the SkillCorner dataset found in the repo,
+so that the track of a player (or a period of it) can be looked up without scanning the whole match
+SkillCorner/opendata: SkillCorner Open Data with 9 matches of broadcast tracking data. (github.com)
+Github link: https://github.com/SkillCorner/opendata
+"""
+
+import numpy as np
+import pandas as pd
+
+from blue_crow_sports.utils import extract_home_away_player_trackobj
+
+def build_trajectory_index(match_explode_data_df: pd.DataFrame,
+                           match_info: dict):
+    """
+    Build the trajectory index of a match from its exploded tracking data (output of
+    explode_data_batch or the explode cache). The entries of every player are stored one after the other,
+    in frame order, so that the track of a player is a contiguous slice given by its offsets
+
+    Input:
+        match_explode_data_df: Exploded tracking data of a match, in frame order
+        match_info: Match information loaded from match_data.json
+
+    Returns:
+        Dictionary with:
+            1. trackobj: Array of the trackable objects of the players that were tracked
+            2. slot: Dictionary of trackable object to its position in trackobj
+            3. offsets: Entries of trackobj[i] are [offsets[i], offsets[i + 1])
+            4. row, x, y, track_id, onball: Arrays with one entry per player per frame they are in
+            5. run_offsets: Start of every run of the same track_id, as positions in the entry arrays.
+               The runs of trackobj[i] are [run_offsets[i], run_offsets[i + 1]) of run_start
+            6. run_start: Entry position where every track_id run starts
+            7. present_bitmap: (frames x ceil(players / 8)) bit-packed array of the players in every frame
+            8. frame, period: Arrays with the frame and period of every row
+            9. period_bounds: Dictionary of period to its (start_row, end_row)
+    """
+    home_player_trackobj_list, away_player_trackobj_list, _ = extract_home_away_player_trackobj(match_info)
+    trackobj_arr = np.array([player_trackobj for player_trackobj in sorted(home_player_trackobj_list + away_player_trackobj_list)
+                             if f"{player_trackobj}_x" in match_explode_data_df.columns], dtype=np.int64)
+
+    present_arr = match_explode_data_df[[f"{player_trackobj}_homeaway" for player_trackobj in trackobj_arr]].notna().to_numpy()
+    x_arr = match_explode_data_df[[f"{player_trackobj}_x" for player_trackobj in trackobj_arr]].to_numpy(dtype=float, na_value=np.nan)
+    y_arr = match_explode_data_df[[f"{player_trackobj}_y" for player_trackobj in trackobj_arr]].to_numpy(dtype=float, na_value=np.nan)
+    track_id_arr = match_explode_data_df[[f"{player_trackobj}_track_id" for player_trackobj in trackobj_arr]].to_numpy(dtype=float, na_value=np.nan)
+    possession_arr = match_explode_data_df["possession_player_trackobj"].to_numpy(dtype=float, na_value=np.nan)
+
+    ## Transpose so that np.nonzero walks player by player and frame by frame within each player
+    slot_arr, row_arr = np.nonzero(present_arr.T)
+    offsets_arr = np.zeros(len(trackobj_arr) + 1, dtype=np.int64)
+    offsets_arr[1:] = np.cumsum(present_arr.sum(axis=0))
+    entry_track_id_arr = track_id_arr[row_arr, slot_arr]
+
+    ## A run of a player starts at its first entry and wherever its track_id changes
+    new_run_flag = np.ones(len(row_arr), dtype=bool)
+    new_run_flag[1:] = (slot_arr[1:] != slot_arr[:-1]) | \
+        ~((entry_track_id_arr[1:] == entry_track_id_arr[:-1]) |
+          (np.isnan(entry_track_id_arr[1:]) & np.isnan(entry_track_id_arr[:-1])))
+    run_start_arr = np.flatnonzero(new_run_flag)
+
+    period_arr = match_explode_data_df["period"].to_numpy()
+    period_bound_dict = {}
+    for period in pd.unique(period_arr):
+        period_row_arr = np.flatnonzero(period_arr == period)
+        period_bound_dict[period] = (period_row_arr[0], period_row_arr[-1] + 1)
+
+    trajectory_index = {
+        "trackobj": trackobj_arr,
+        "slot": {player_trackobj: slot for slot, player_trackobj in enumerate(trackobj_arr.tolist())},
+        "offsets": offsets_arr,
+        "row": row_arr,
+        "x": x_arr[row_arr, slot_arr],
+        "y": y_arr[row_arr, slot_arr],
+        "track_id": entry_track_id_arr,
+        "onball": possession_arr[row_arr] == trackobj_arr[slot_arr],
+        "run_offsets": np.searchsorted(run_start_arr, offsets_arr),
+        "run_start": run_start_arr,
+        "present_bitmap": np.packbits(present_arr, axis=1),
+        "frame": match_explode_data_df["frame"].to_numpy(),
+        "period": period_arr,
+        "period_bounds": period_bound_dict,
+    }
+    return trajectory_index
+
+def player_entry_bounds(trajectory_index: dict,
+                        player_trackobj: int,
+                        period: int=None):
+    """
+    Position of the first and past-the-last entry of a player (in a period if set),
+    found with a binary search in the rows of the player
+
+    Returns:
+        (start, end) positions in the entry arrays of the trajectory index
+    """
+    slot = trajectory_index["slot"].get(player_trackobj)
+    if slot is None:
+        return 0, 0
+    start, end = trajectory_index["offsets"][slot], trajectory_index["offsets"][slot + 1]
+    if period is not None:
+        if period not in trajectory_index["period_bounds"]:
+            return start, start
+        start_row, end_row = trajectory_index["period_bounds"][period]
+        player_row_arr = trajectory_index["row"][start:end]
+        start, end = start + np.searchsorted(player_row_arr, start_row), start + np.searchsorted(player_row_arr, end_row)
+    return start, end
+
+def player_trajectory(trajectory_index: dict,
+                      player_trackobj: int,
+                      period: int=None):
+    """
+    All the frames where a player is visible (in a period if set)
+
+    Returns:
+        DataFrame with the row, frame, x, y, track_id and onball of every visible frame
+    """
+    start, end = player_entry_bounds(trajectory_index, player_trackobj, period=period)
+    row_arr = trajectory_index["row"][start:end]
+    return pd.DataFrame({
+        "row": row_arr,
+        "frame": trajectory_index["frame"][row_arr],
+        "x": trajectory_index["x"][start:end],
+        "y": trajectory_index["y"][start:end],
+        "track_id": trajectory_index["track_id"][start:end],
+        "onball": trajectory_index["onball"][start:end],
+    })
+
+def player_onball_rows(trajectory_index: dict,
+                       player_trackobj: int,
+                       period: int=None):
+    """
+    Rows where a player is visible and on the ball (in a period if set)
+    """
+    start, end = player_entry_bounds(trajectory_index, player_trackobj, period=period)
+    return trajectory_index["row"][start:end][trajectory_index["onball"][start:end]]
+
+def player_track_runs(trajectory_index: dict,
+                      player_trackobj: int):
+    """
+    Runs of the same track_id of a player. A run ends when the track_id changes, not when the player
+    goes off screen, so a run can span frames where the player is not visible
+
+    Returns:
+        DataFrame with the track_id, start_row, end_row (last row of the run) and num_frames (visible frames) of every run
+    """
+    slot = trajectory_index["slot"].get(player_trackobj)
+    if slot is None:
+        return pd.DataFrame(columns=["track_id", "start_row", "end_row", "num_frames"])
+    run_start_arr = trajectory_index["run_start"][trajectory_index["run_offsets"][slot]:trajectory_index["run_offsets"][slot + 1]]
+    run_end_arr = np.append(run_start_arr[1:], trajectory_index["offsets"][slot + 1])
+    return pd.DataFrame({
+        "track_id": trajectory_index["track_id"][run_start_arr],
+        "start_row": trajectory_index["row"][run_start_arr],
+        "end_row": trajectory_index["row"][run_end_arr - 1],
+        "num_frames": run_end_arr - run_start_arr,
+    })
+
+def present_flag(trajectory_index: dict,
+                 rows=slice(None)):
+    """
+    Unpack the bitmap of the players in the frames of rows
+
+    Returns:
+        Boolean array of (frames x players), the columns in the order of trajectory_index["trackobj"]
+    """
+    return np.unpackbits(trajectory_index["present_bitmap"][rows], axis=-1,
+                         count=len(trajectory_index["trackobj"])).astype(bool)
+
+def frame_present_trackobj(trajectory_index: dict,
+                           row: int):
+    """
+    Trackable objects of the players that are visible in a frame
+    """
+    return trajectory_index["trackobj"][present_flag(trajectory_index, row)].tolist()
@@ -27,6 +27,31 @@ player_stat_template = {
     "dist_teamnopos_offball": 0, "time_teamnopos_offball": 0, "speed_teamnopos_offball": 0
 }
 
+## Peak quickness of a player (see quickness.py). peak_speed_{w}s is the best average speed over w seconds
+player_quickness_template = {
+    "peak_speed": 0, "peak_speed_1s": 0, "peak_speed_3s": 0, "peak_speed_5s": 0,
+    "peak_accel": 0, "num_sprints": 0, "num_accels": 0, "time_to_top_speed": 0
+}
+
+## Share of the frames a player spent in each tactical line (see tactical.py) and the number of frames it is over
+player_line_template = {
+    "line_defence": 0, "line_midfield": 0, "line_attack": 0, "line_frames": 0,
+    "line_defence_teampos": 0, "line_midfield_teampos": 0, "line_attack_teampos": 0, "line_frames_teampos": 0,
+    "line_defence_teamnopos": 0, "line_midfield_teamnopos": 0, "line_attack_teamnopos": 0, "line_frames_teamnopos": 0
+}
+
+## Distance, time and speed of a player split by whether an opponent was within the pressure radius (see proximity.py),
+## the number of frames in view / under pressure and the average number of opponents within the radius
+player_pressure_template = {
+    "dist_pressed": 0, "time_pressed": 0, "speed_pressed": 0,
+    "dist_pressed_onball": 0, "time_pressed_onball": 0, "speed_pressed_onball": 0,
+    "dist_notpressed": 0, "time_notpressed": 0, "speed_notpressed": 0,
+    "proximity_frames": 0, "pressed_frames": 0, "pressure_count_mean": 0
+}
+
+## Categories of the {trackobj}_homeaway / possession_homeaway columns in the compact dtypes
+HOMEAWAY_DTYPE = pd.CategoricalDtype(["home_team", "away_team"])
+
 def extract_home_away_player_trackobj(match_info: dict):
     """
     Function to extract a list of the player ids and
@@ -61,6 +86,71 @@ def extract_home_away_player_trackobj(match_info: dict):
 
     return home_team_trackobj_list, away_team_trackobj_list, player_mapping_list
 
+def wide_player_trackobj(df: pd.DataFrame,
+                         match_info: dict,
+                         col_suffix: str="_x"):
+    """
+    Players of the wide tracking data (the output of explode_data_batch or summarise_distance_time):
+    the players of match_info that have a {trackobj}{col_suffix} column, home players first
+
+    Returns:
+        (list of the trackable objects, list of home_team / away_team of each)
+    """
+    home_player_trackobj_list, away_player_trackobj_list, _ = extract_home_away_player_trackobj(match_info)
+    trackobj_list, team_list = [], []
+    for team_pos, team_player_trackobj_list in zip(["home_team", "away_team"],
+                                                   [home_player_trackobj_list, away_player_trackobj_list]):
+        for player_trackobj in team_player_trackobj_list:
+            if f"{player_trackobj}{col_suffix}" in df.columns:
+                trackobj_list.append(player_trackobj)
+                team_list.append(team_pos)
+    return trackobj_list, team_list
+
+def stack_player_cols(df: pd.DataFrame,
+                      trackobj_list: list,
+                      metric: str):
+    """
+    Stack the {trackobj}_{metric} columns of the players into a (frames x players) float array.
+    A player without the column (e.g. no {trackobj}_dist as they never moved between two frames) is all NaN
+    """
+    col_list = [f"{player_trackobj}_{metric}" for player_trackobj in trackobj_list]
+    return df.reindex(columns=col_list).to_numpy(dtype=float, na_value=np.nan)
+
+def wide_player_in_view(df: pd.DataFrame,
+                        trackobj_list: list):
+    """
+    (frames x players) flag of the frames the players are in view, i.e. their {trackobj}_homeaway is set
+    """
+    return df.reindex(columns=[f"{player_trackobj}_homeaway" for player_trackobj in trackobj_list]).notna().to_numpy()
+
+def long_player_slots(tracks_df: pd.DataFrame):
+    """
+    Players of the long-format tracking data of a match (see long_format.py), to stack their rows into
+    (frames x players) arrays: array[row_arr, slot_arr] = player_tracks_df[col]
+
+    Returns:
+        (rows of tracks_df of the players, sorted list of the trackable objects, list of home_team / away_team of each,
+        row of frames_df of every player row, column of every player row)
+    """
+    player_tracks_df = tracks_df[tracks_df["homeaway"].notna()]
+    trackobj_arr = player_tracks_df.index.get_level_values("trackable_object").to_numpy()
+    trackobj_list, slot_arr = np.unique(trackobj_arr, return_inverse=True)
+    team_list = player_tracks_df["homeaway"].astype(object).groupby(trackobj_arr).first().reindex(trackobj_list).tolist()
+    return player_tracks_df, trackobj_list.tolist(), team_list, player_tracks_df["row_idx"].to_numpy(), slot_arr.ravel()
+
+def stack_long_player_col(player_tracks_df: pd.DataFrame,
+                          col: str,
+                          num_frames: int,
+                          row_arr: np.ndarray,
+                          slot_arr: np.ndarray,
+                          num_players: int):
+    """
+    Stack a column of the player rows of long_player_slots into a (frames x players) float array, NaN where there is no row
+    """
+    stack_arr = np.full((num_frames, num_players), np.nan)
+    stack_arr[row_arr, slot_arr] = player_tracks_df[col].to_numpy(dtype=float, na_value=np.nan)
+    return stack_arr
+
 def explode_data(df: pd.DataFrame,
                  match_info: dict,
                  row_idx: int,
@@ -69,12 +159,15 @@ def explode_data(df: pd.DataFrame,
     Explode the list of dictionaries that are in the "data" column in the dataframe
     """
     home_player_trackobj_list, away_player_trackobj_list, _ = extract_home_away_player_trackobj(match_info)
-    full_player_trackobj_list = sorted(home_player_trackobj_list + away_player_trackobj_list)
+    ## Sets so that the membership tests below do not scan the lists for every tracked object
+    home_player_trackobj_set = set(home_player_trackobj_list)
+    away_player_trackobj_set = set(away_player_trackobj_list)
+    full_player_trackobj_set = home_player_trackobj_set | away_player_trackobj_set
     player_trackobj_in_frame_list = []
 
     for tracked in track_list:
         player_trackobj = tracked.get("trackable_object")
-        if player_trackobj in full_player_trackobj_list:
+        if player_trackobj in full_player_trackobj_set:
             if player_trackobj == str(match_info["ball"]["trackable_object"]):
                 df.at[row_idx, f"{player_trackobj}_z"] = tracked.get("z")
             player_trackobj_in_frame_list.append(player_trackobj)
@@ -88,9 +181,9 @@ def explode_data(df: pd.DataFrame,
         df.at[row_idx, f"{player_trackobj}_x"] = x
         df.at[row_idx, f"{player_trackobj}_y"] = y
         df.at[row_idx, f"{player_trackobj}_track_id"] = track_id
-        if player_trackobj in home_player_trackobj_list:
+        if player_trackobj in home_player_trackobj_set:
             home_away_none = "home_team"
-        elif player_trackobj in away_player_trackobj_list:
+        elif player_trackobj in away_player_trackobj_set:
             home_away_none = "away_team"
         else:
             home_away_none = np.nan
@@ -100,6 +193,115 @@ def explode_data(df: pd.DataFrame,
         # print(f'{track_id}, {x}, {y}, {player_trackobj_in_frame_list}')
     return df
 
+def explode_data_batch(df: pd.DataFrame,
+                       match_info: dict,
+                       compact_dtypes: bool=False):
+    """
+    Batched version of explode_data that explodes every frame of the match in one go.
+    The "data" lists are walked once and the values are written into preallocated
+    (frames x trackable objects) arrays, which are then turned into the wide columns
+    {trackobj}_x, {trackobj}_y, {trackobj}_track_id and {trackobj}_homeaway
+
+    Input:
+        df: DataFrame of the structured data with the "data" column
+        match_info: Match information loaded from match_data.json
+        compact_dtypes: Whether to build the columns in compact dtypes instead:
+            1. {trackobj}_x, {trackobj}_y: float32
+            2. {trackobj}_track_id: nullable Int32
+            3. {trackobj}_homeaway: HOMEAWAY_DTYPE categorical (int8 codes)
+            4. The "data" and player_trackobj_captured lists are dropped, as a player is captured
+               in a frame exactly when its {trackobj}_homeaway is set. num_player_captured is added instead
+
+    Returns:
+        Copy of the input dataframe with the same columns as calling explode_data on every row
+        (or the compact columns above if compact_dtypes)
+    """
+    home_player_trackobj_list, away_player_trackobj_list, _ = extract_home_away_player_trackobj(match_info)
+    home_player_trackobj_set = set(home_player_trackobj_list)
+    away_player_trackobj_set = set(away_player_trackobj_list)
+    full_player_trackobj_set = home_player_trackobj_set | away_player_trackobj_set
+
+    num_frames = len(df)
+    capacity = len(full_player_trackobj_set) + 8
+    coord_dtype = np.float32 if compact_dtypes else float
+    x_arr = np.full((num_frames, capacity), np.nan, dtype=coord_dtype)
+    y_arr = np.full((num_frames, capacity), np.nan, dtype=coord_dtype)
+    track_id_arr = np.full((num_frames, capacity), np.nan)
+    in_frame_arr = np.zeros((num_frames, capacity), dtype=bool)
+    trackobj_slot_dict = {}
+
+    if compact_dtypes:
+        player_trackobj_captured = None
+    elif "player_trackobj_captured" in df.columns:
+        player_trackobj_captured = df["player_trackobj_captured"].tolist()
+    else:
+        player_trackobj_captured = [[] for _ in range(num_frames)]
+
+    for row_idx, track_list in enumerate(df["data"]):
+        player_trackobj_in_frame_list = []
+        for tracked in track_list:
+            player_trackobj = tracked.get("trackable_object")
+            if player_trackobj in full_player_trackobj_set:
+                player_trackobj_in_frame_list.append(player_trackobj)
+            elif not player_trackobj:
+                player_trackobj = tracked.get("group_name").replace(" ", "_").lower()
+
+            slot = trackobj_slot_dict.get(player_trackobj)
+            if slot is None:
+                slot = len(trackobj_slot_dict)
+                if slot == capacity:
+                    ## More trackable objects than expected (e.g. referees). Double the arrays
+                    x_arr = np.pad(x_arr, ((0, 0), (0, capacity)), constant_values=np.nan)
+                    y_arr = np.pad(y_arr, ((0, 0), (0, capacity)), constant_values=np.nan)
+                    track_id_arr = np.pad(track_id_arr, ((0, 0), (0, capacity)), constant_values=np.nan)
+                    in_frame_arr = np.pad(in_frame_arr, ((0, 0), (0, capacity)), constant_values=False)
+                    capacity *= 2
+                trackobj_slot_dict[player_trackobj] = slot
+
+            x_arr[row_idx, slot] = tracked.get("x")
+            y_arr[row_idx, slot] = tracked.get("y")
+            track_id_arr[row_idx, slot] = tracked.get("track_id")
+            in_frame_arr[row_idx, slot] = True
+        if track_list and player_trackobj_captured is not None:
+            player_trackobj_captured[row_idx] = list(set(player_trackobj_in_frame_list))
+
+    explode_col_dict = {}
+    for player_trackobj, slot in trackobj_slot_dict.items():
+        explode_col_dict[f"{player_trackobj}_x"] = x_arr[:, slot]
+        explode_col_dict[f"{player_trackobj}_y"] = y_arr[:, slot]
+        if player_trackobj in home_player_trackobj_set:
+            home_away_none = "home_team"
+        elif player_trackobj in away_player_trackobj_set:
+            home_away_none = "away_team"
+        else:
+            home_away_none = None
+
+        if compact_dtypes:
+            track_id_missing = np.isnan(track_id_arr[:, slot])
+            explode_col_dict[f"{player_trackobj}_track_id"] = pd.arrays.IntegerArray(
+                np.where(track_id_missing, 0, track_id_arr[:, slot]).astype(np.int32), track_id_missing)
+            code = HOMEAWAY_DTYPE.categories.get_loc(home_away_none) if home_away_none else -1
+            explode_col_dict[f"{player_trackobj}_homeaway"] = pd.Categorical.from_codes(
+                np.where(in_frame_arr[:, slot], code, -1).astype(np.int8), dtype=HOMEAWAY_DTYPE)
+            continue
+        explode_col_dict[f"{player_trackobj}_track_id"] = track_id_arr[:, slot]
+        if home_away_none:
+            home_away_arr = np.full(num_frames, np.nan, dtype=object)
+            home_away_arr[in_frame_arr[:, slot]] = home_away_none
+            explode_col_dict[f"{player_trackobj}_homeaway"] = home_away_arr
+        else:
+            explode_col_dict[f"{player_trackobj}_homeaway"] = np.full(num_frames, np.nan)
+
+    if compact_dtypes:
+        player_slot_list = [slot for player_trackobj, slot in trackobj_slot_dict.items() if player_trackobj in full_player_trackobj_set]
+        explode_df = df.drop(columns=["data", "player_trackobj_captured"], errors="ignore")
+        explode_df["num_player_captured"] = in_frame_arr[:, player_slot_list].sum(axis=1).astype(np.int16)
+    else:
+        explode_df = df.copy()
+        explode_df["player_trackobj_captured"] = player_trackobj_captured
+    explode_df = pd.concat([explode_df, pd.DataFrame(explode_col_dict, index=df.index)], axis=1)
+    return explode_df
+
 def mt_to_sec(match_time: str):
     """
     Convert the match time from format (XX:XX.XX) to seconds
@@ -182,3 +384,147 @@ def summarise_distance_time(df: pd.DataFrame,
         summary_df = pd.concat([summary_df, copy_df], axis=0).reset_index(drop=True)
 
     return summary_df
+
+def captured_player_trackobj(df: pd.DataFrame):
+    """
+    Trackable objects of the players captured in the frames of df, and a (frames x players) flag of the frames
+    they are captured in. Taken from the player_trackobj_captured lists, or from the {trackobj}_homeaway
+    columns of the players when the lists were dropped (compact dtypes)
+
+    Returns:
+        (sorted list of the trackable objects, boolean array)
+    """
+    if "player_trackobj_captured" in df.columns:
+        captured_series = df["player_trackobj_captured"].reset_index(drop=True).explode().dropna()
+        player_trackobj_list = sorted(captured_series.unique())
+        player_slot_dict = {player_trackobj: slot for slot, player_trackobj in enumerate(player_trackobj_list)}
+        in_frame_arr = np.zeros((len(df), len(player_trackobj_list)), dtype=bool)
+        in_frame_arr[captured_series.index.to_numpy(), captured_series.map(player_slot_dict).to_numpy(dtype=int)] = True
+        return player_trackobj_list, in_frame_arr
+
+    ## Only the players have home_team / away_team, the ball and the referees are always NaN
+    player_col_list = sorted((col for col in df.columns
+                              if col.endswith("_homeaway") and col[:-len("_homeaway")].isdigit()),
+                             key=lambda col: int(col[:-len("_homeaway")]))
+    in_frame_arr = df[player_col_list].notna().to_numpy()
+    captured_flag = in_frame_arr.any(axis=0)
+    player_trackobj_list = [int(col[:-len("_homeaway")]) for col, captured in zip(player_col_list, captured_flag) if captured]
+    return player_trackobj_list, in_frame_arr[:, captured_flag]
+
+def summarise_distance_time_vectorised(df: pd.DataFrame,
+                                       frame_rate_smoothing_threshold: int=10,
+                                       time_per_frame_rate: float=0.10):
+    """
+    Vectorised version of summarise_distance_time. Instead of looping over every frame and player,
+    the x, y and track_id columns of all the captured players are stacked into (frames x players)
+    arrays and shifted by frame_rate_smoothing_threshold within each period.
+    The track_id continuity and time gap rules are applied as boolean masks.
+    The distance and time of both periods are written into preallocated (frames x players) arrays,
+    so the frames are copied once and not once per period.
+    summarise_distance_time is kept so that the results can be checked against each other (see parity.py)
+
+    Input:
+        df: DataFrame that consists of each player's x, y coordinates
+        frame_smoothing_threshold: Number of frames to smooth in the calculation
+        frame_rate: Number of seconds for each frame
+
+    Returns:
+        Copy of the input dataframe (frames of period 1, then period 2) with the following additional columns:
+            1. {player_trackobj}_dist: Distance travelled
+            2. {player_trackobj}_time: Number of seconds travelled
+    """
+    period_arr = df["period"].to_numpy()
+    period_row_list = [np.flatnonzero(period_arr == period) for period in [1, 2]]
+    summary_df = df.take(np.concatenate(period_row_list)).reset_index()
+
+    player_trackobj_list, in_frame_arr = captured_player_trackobj(summary_df)
+    num_rows, num_players = in_frame_arr.shape
+    dist_arr = np.full((num_rows, num_players), np.nan)
+    time_arr = np.full((num_rows, num_players), np.nan)
+    valid_player_flag = np.zeros(num_players, dtype=bool)
+
+    period_start = 0
+    for period_row_arr in period_row_list:
+        total_time_record = len(period_row_arr)
+        period_slice = slice(period_start, period_start + total_time_record)
+        period_start += total_time_record
+        num_pairs = total_time_record - frame_rate_smoothing_threshold
+        ## Only the players captured in this period, as on the per-period frames
+        period_player_slot_arr = np.flatnonzero(in_frame_arr[period_slice].any(axis=0))
+        if num_pairs <= 0 or not len(period_player_slot_arr):
+            continue
+
+        period_df = summary_df.iloc[period_slice]
+        period_player_trackobj_list = [player_trackobj_list[slot] for slot in period_player_slot_arr]
+        period_in_frame_arr = in_frame_arr[period_slice][:, period_player_slot_arr]
+        x_arr = period_df[[f"{player_trackobj}_x" for player_trackobj in period_player_trackobj_list]].to_numpy(dtype=float, na_value=np.nan)
+        y_arr = period_df[[f"{player_trackobj}_y" for player_trackobj in period_player_trackobj_list]].to_numpy(dtype=float, na_value=np.nan)
+        track_id_arr = period_df[[f"{player_trackobj}_track_id" for player_trackobj in period_player_trackobj_list]].to_numpy(dtype=float, na_value=np.nan)
+        seconds_arr = period_df["time_seconds"].to_numpy(dtype=float)
+
+        ## Current frame is [:num_pairs] and the forward frame is [frame_rate_smoothing_threshold:]
+        track_id_same_flag = track_id_arr[:num_pairs] == track_id_arr[frame_rate_smoothing_threshold:]
+        time_smoothing_same_flag = seconds_arr[:num_pairs] + frame_rate_smoothing_threshold * time_per_frame_rate <= \
+            seconds_arr[frame_rate_smoothing_threshold:]
+        valid_flag = period_in_frame_arr[:num_pairs] & period_in_frame_arr[frame_rate_smoothing_threshold:] & \
+            (track_id_same_flag | time_smoothing_same_flag[:, None])
+
+        distance_arr = np.sqrt((x_arr[:num_pairs] - x_arr[frame_rate_smoothing_threshold:]) ** 2 + \
+            (y_arr[:num_pairs] - y_arr[frame_rate_smoothing_threshold:]) ** 2) / frame_rate_smoothing_threshold
+
+        period_dist_arr = dist_arr[period_slice][:num_pairs]
+        period_time_arr = time_arr[period_slice][:num_pairs]
+        period_dist_arr[:, period_player_slot_arr] = np.where(valid_flag, distance_arr, np.nan)
+        period_time_arr[:, period_player_slot_arr] = np.where(valid_flag, time_per_frame_rate, np.nan)
+        valid_player_flag[period_player_slot_arr] |= valid_flag.any(axis=0)
+
+    ## A player only gets the columns if they moved in at least one period
+    dist_time_col_dict = {}
+    for slot in np.flatnonzero(valid_player_flag):
+        dist_time_col_dict[f"{player_trackobj_list[slot]}_dist"] = dist_arr[:, slot]
+        dist_time_col_dict[f"{player_trackobj_list[slot]}_time"] = time_arr[:, slot]
+    summary_df = pd.concat([summary_df, pd.DataFrame(dist_time_col_dict, index=summary_df.index)], axis=1)
+    return summary_df
+
+def aggregate_player_stats(key_df: pd.DataFrame,
+                           dist: np.ndarray,
+                           time: np.ndarray,
+                           onball: np.ndarray,
+                           teampos: np.ndarray):
+    """
+    Aggregate the frame to frame distance and time of the players into the keys of
+    player_stat_template with a single groupby
+
+    Input:
+        key_df: DataFrame of the columns to group by (e.g. the player's trackable object),
+            with one row for every frame where the player's distance was calculated
+        dist: Distance travelled in each row
+        time: Number of seconds travelled in each row
+        onball: Whether the player is on the ball in each row
+        teampos: Whether the player's team is in possession in each row
+
+    Returns:
+        DataFrame indexed by the columns of key_df with the player_stat_template stats
+    """
+    onball = np.asarray(onball, dtype=bool)
+    teampos = np.asarray(teampos, dtype=bool)
+    sum_df = key_df.reset_index(drop=True)
+    for metric, values in zip(["dist", "time"], [np.asarray(dist, dtype=float), np.asarray(time, dtype=float)]):
+        sum_df[metric] = values
+        sum_df[f"{metric}_onball"] = np.where(onball, values, 0)
+        sum_df[f"{metric}_teampos"] = np.where(teampos, values, 0)
+        sum_df[f"{metric}_teampos_onball"] = np.where(teampos & onball, values, 0)
+    sum_df = sum_df.groupby(list(key_df.columns), sort=True).sum()
+
+    for metric in ["dist", "time"]:
+        sum_df[f"{metric}_offball"] = sum_df[metric] - sum_df[f"{metric}_onball"]
+        sum_df[f"{metric}_teampos_offball"] = sum_df[f"{metric}_teampos"] - sum_df[f"{metric}_teampos_onball"]
+        ## Note: When the team is not in possession, the player can only be offball
+        sum_df[f"{metric}_teamnopos"] = sum_df[metric] - sum_df[f"{metric}_teampos"]
+        sum_df[f"{metric}_teamnopos_offball"] = sum_df[f"{metric}_teamnopos"]
+
+    for col in player_stat_template:
+        if col.startswith("speed"):
+            suffix = col[len("speed"):]
+            sum_df[col] = sum_df[f"dist{suffix}"] / sum_df[f"time{suffix}"]
+    return sum_df[list(player_stat_template)]